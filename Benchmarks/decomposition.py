@@ -0,0 +1,64 @@
+#! /usr/bin/env python3
+"""Compares the decomposition mode with a monolithic solve.
+
+Generates synthetic CVRPTW instances and solves each one twice: as a single
+routing model and cluster by cluster with decomposition.solve_decomposed.
+Reports wall time (model build included), objective and unserved nodes.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from decomposition import METHODS, plan_cost, solve_decomposed
+from instance_generator import LAYOUTS, WINDOWS, generate_instance
+from routing_model import get_routes, load_variant
+
+
+def solve_monolithic(data, time_limit):
+    start = time.perf_counter()
+    module = load_variant('cvrptw')
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    search_parameters.time_limit.seconds = time_limit
+    solution = routing.SolveWithParameters(search_parameters)
+    seconds = time.perf_counter() - start
+    if not solution:
+        return None, seconds
+    return plan_cost(data, get_routes(manager, routing, solution)), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--layout', choices=LAYOUTS, default='clustered')
+    parser.add_argument('--windows', choices=WINDOWS, default='loose')
+    parser.add_argument('--method', choices=METHODS, default='sweep')
+    parser.add_argument('--nodes-per-cluster', type=int, default=150)
+    parser.add_argument('--time-limit', type=int, default=60,
+                        help='monolithic time limit; clusters get a share')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for num_nodes in args.nodes:
+        data = generate_instance(num_nodes, args.layout, args.windows)
+        clusters = max(2, num_nodes // args.nodes_per_cluster)
+        cost, seconds = solve_monolithic(data, args.time_limit)
+        print(f'{num_nodes:6d} nodes  monolithic: {seconds:7.1f}s  '
+              f'objective {cost if cost is not None else "-"}')
+
+        # Give the decomposition the same CPU budget as the monolithic solve.
+        rounds = -(-clusters // args.workers) + -(-(clusters // 2) // args.workers)
+        time_limit = max(1, args.time_limit // rounds)
+        result = solve_decomposed('cvrptw', data, clusters, args.method,
+                                  time_limit, workers=args.workers)
+        print(f'{num_nodes:6d} nodes  {clusters:3d} clusters: '
+              f'{result["seconds"]:7.1f}s  objective {result["cost"]} '
+              f'(stitched {result["stitched_cost"]}, '
+              f'{len(result["unserved"])} unserved)')
+
+
+if __name__ == '__main__':
+    main()
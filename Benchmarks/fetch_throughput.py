@@ -0,0 +1,46 @@
+#! /usr/bin/env python3
+"""Measures matrix fetch throughput against the local stand-in server."""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import matrix_stand_in
+from matrix_fetcher import MatrixFetcher
+from route_matrices import estimate_requests, get_route_matrices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--qps', type=float, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--throttle-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    server, base_url = matrix_stand_in.start(
+        latency=args.latency, throttle_rate=args.throttle_rate)
+    data = {'API_key': 'stand-in',
+            'locations': [f'Location+{i}' for i in range(args.locations)]}
+    num_requests, num_elements = estimate_requests(args.locations)
+    print(f'{args.locations} locations: {num_requests} requests, '
+          f'{num_elements} elements')
+
+    for workers in args.workers:
+        fetcher = MatrixFetcher(data['API_key'], base_url=base_url,
+                                qps=args.qps, workers=workers, backoff=0.05)
+        start = time.perf_counter()
+        get_route_matrices(data, fetcher)
+        elapsed = time.perf_counter() - start
+        print(f'workers={workers:3d}: {elapsed:7.2f}s '
+              f'{num_requests / elapsed:8.1f} req/s '
+              f'{num_elements / elapsed:10.1f} elements/s '
+              f'({fetcher.attempts - num_requests} retries)')
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
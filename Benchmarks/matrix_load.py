@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+"""Compares load time and peak RSS of the text and binary matrix paths.
+
+Each measurement runs in a fresh interpreter so peak RSS is not shared
+between the paths:
+
+    ./matrix_load.py --sizes 500 2000 5000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from matrix_store import convert_text, load_matrix
+
+
+def load_text_lists(path):
+    """The solvers' original parse into nested lists of Python ints."""
+    with open(path) as f:
+        return [[int(num) for num in line.split("\t")] for line in f]
+
+
+def measure(path_kind, name, directory):
+    """Loads one matrix and reads every cell; runs in the child process."""
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if path_kind == 'text':
+        matrix = load_text_lists(os.path.join(directory, name + '.txt'))
+        checksum = sum(map(sum, matrix))
+    else:
+        matrix = load_matrix(name, directory)
+        checksum = int(matrix.sum(dtype=np.int64))
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    print(f'{elapsed:.4f} {peak_rss} {checksum}')
+
+
+def run_child(path_kind, name, directory):
+    out = subprocess.run([sys.executable, __file__, '--child', path_kind,
+                          name, directory], capture_output=True, text=True,
+                         check=True).stdout.split()
+    return float(out[0]), int(out[1]) / 1024, int(out[2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measure(*args.child)
+        return
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f'{"nodes":>6} {"path":>6} {"load s":>9} {"peak MB":>9}')
+        for n in args.sizes:
+            name = f'matrix_{n}'
+            txt_path = os.path.join(directory, name + '.txt')
+            np.savetxt(txt_path, rng.integers(0, 50000, (n, n)),
+                       fmt='%d', delimiter='\t')
+            text = run_child('text', name, directory)
+            convert_text(txt_path, units='s')
+            binary = run_child('binary', name, directory)
+            assert text[2] == binary[2]
+            for kind, (elapsed, peak_mb, _) in (('text', text),
+                                                ('binary', binary)):
+                print(f'{n:6d} {kind:>6} {elapsed:9.4f} {peak_mb:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+"""Local stand-in for the Distance Matrix API.
+
+Answers `/distancematrix/json` requests with deterministic fake distances
+and durations after a simulated latency, and throttles a configurable share
+of requests with HTTP 429 so the fetcher's retry path gets exercised.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_element(origin, destination):
+    """Returns a deterministic route element for an address pair."""
+    seed = zlib.crc32(f'{origin}|{destination}'.encode())
+    distance = 1000 + seed % 20000
+    return {'status': 'OK',
+            'distance': {'value': distance},
+            'duration': {'value': distance // 10}}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    latency = 0.05
+    throttle_rate = 0.1
+    served = 0
+    throttled = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        cls = type(self)
+        if random.random() < self.throttle_rate:
+            with cls.lock:
+                cls.throttled += 1
+            self.reply(429, b'{"status": "OVER_QUERY_LIMIT"}')
+            return
+        query = parse_qs(urlparse(self.path).query)
+        origins = query['origins'][0].split('|')
+        destinations = query['destinations'][0].split('|')
+        body = json.dumps({
+            'status': 'OK',
+            'rows': [{'elements': [fake_element(o, d) for d in destinations]}
+                     for o in origins]}).encode()
+        with cls.lock:
+            cls.served += 1
+        self.reply(200, body)
+
+    def reply(self, code, body):
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port=0, latency=0.05, throttle_rate=0.1):
+    """Starts the stand-in in a daemon thread and returns (server, base_url)."""
+    StandInHandler.latency = latency
+    StandInHandler.throttle_rate = throttle_rate
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}/distancematrix/json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--throttle-rate', type=float, default=0.1)
+    args = parser.parse_args()
+    server, base_url = start(args.port, args.latency, args.throttle_rate)
+    print(f'Serving {base_url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+"""Benchmarks the road-graph matrix provider on a synthetic city grid.
+
+Writes a side x side street grid (two-way streets, random speeds, a few
+missing blocks) as an N/E edge-list file, then times graph loading, snapping
+and the many-to-many matrices for several location counts and worker counts.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from road_graph import get_road_matrices, load_road_graph
+
+BLOCK = 150  # meters between intersections
+ORIGIN = (30.70, 76.72)
+
+
+def write_grid_city(path, side, seed=0):
+    rng = np.random.default_rng(seed)
+    dlat = BLOCK / 111320
+    dlng = BLOCK / (111320 * np.cos(np.radians(ORIGIN[0])))
+    with open(path, 'w') as f:
+        for r in range(side):
+            for c in range(side):
+                f.write(f'N {r * side + c} {ORIGIN[0] + r * dlat:.6f} '
+                        f'{ORIGIN[1] + c * dlng:.6f}\n')
+        for r in range(side):
+            for c in range(side):
+                node = r * side + c
+                for neighbour, ok in ((node + 1, c + 1 < side),
+                                      (node + side, r + 1 < side)):
+                    if not ok or rng.random() < 0.05:
+                        continue
+                    speed = rng.choice([20, 30, 50])
+                    f.write(f'E {node} {neighbour} {BLOCK} {speed}\n')
+                    f.write(f'E {neighbour} {node} {BLOCK} {speed}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--side', type=int, default=300,
+                        help='intersections per side (300 -> 90k nodes)')
+    parser.add_argument('--locations', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, os.cpu_count()}))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'city.edges')
+        start = time.perf_counter()
+        write_grid_city(path, args.side)
+        print(f'wrote {args.side ** 2} node grid in {time.perf_counter() - start:.1f}s')
+        start = time.perf_counter()
+        graph = load_road_graph(path)
+        print(f'loaded {graph.lengths.nnz} edges in {time.perf_counter() - start:.1f}s')
+
+    rng = np.random.default_rng(1)
+    for count in args.locations:
+        lat = rng.uniform(graph.lat.min(), graph.lat.max(), count)
+        lng = rng.uniform(graph.lng.min(), graph.lng.max(), count)
+        for workers in args.workers:
+            start = time.perf_counter()
+            try:
+                get_road_matrices(graph, lat, lng, workers)
+                status = ''
+            except Exception as e:  # unreachable cells still cost a full run
+                status = f' ({e})'
+            elapsed = time.perf_counter() - start
+            print(f'{count:5d} locations, {workers:2d} workers: {elapsed:7.2f}s '
+                  f'{count * count / elapsed:10.0f} cells/s{status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+"""Compares the savings construction with the OR-tools first solution.
+
+For generated CVRP instances (time windows dropped) and, when a directory
+is given, every Solomon / Gehring-Homberger file in it (as CVRPTW), reports
+the time and cost of:
+
+- savings: savings.savings_routes alone (nodes no vehicle could take are
+  counted as unserved),
+- first solution: model build plus the solver's first solution strategy,
+  stopped at the first solution,
+
+and with --search SECONDS the cost after that much guided local search
+started from each.
+
+    ./savings.py --nodes 1000 3000
+    ./savings.py solomon/ --nodes --search 10
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ortools.constraint_solver import routing_enums_pb2
+
+from decomposition import plan_cost
+from instance_generator import generate_instance
+from presolve import InfeasibleInstance
+from routing_model import get_routes, load_variant, solve_model
+from savings import savings_routes
+from solomon import read_solomon
+
+
+def cvrp_instance(num_nodes):
+    data = generate_instance(num_nodes, 'random')
+    return {key: data[key] for key in ('distance_matrix', 'demands',
+                                       'vehicle_capacities', 'num_vehicles',
+                                       'depot')}
+
+
+def first_solution(module, data):
+    start = time.perf_counter()
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    search_parameters.solution_limit = 1
+    search_parameters.time_limit.seconds = 3600
+    solution = routing.SolveWithParameters(search_parameters)
+    seconds = time.perf_counter() - start
+    if not solution:
+        return seconds, None
+    return seconds, solution.ObjectiveValue()
+
+
+def search(module, data, seconds, plan=None):
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    search_parameters.time_limit.seconds = seconds
+    solution = solve_model(data, manager, routing, search_parameters, plan)
+    return plan_cost(data, get_routes(manager, routing, solution)) if solution else None
+
+
+def compare(label, variant, data, search_seconds):
+    module = load_variant(variant)
+    start = time.perf_counter()
+    routes, unassigned = savings_routes(
+        data, horizon=data.get('horizon', getattr(module, 'HORIZON', None)),
+        max_waiting=data.get('max_waiting', getattr(module, 'MAX_WAITING', None)))
+    savings_seconds = time.perf_counter() - start
+    first_seconds, first_cost = first_solution(module, data)
+    print(f'{label:>14}  savings {savings_seconds:7.3f}s cost {plan_cost(data, routes):>10} '
+          f'({len(unassigned)} unserved)  first solution {first_seconds:7.3f}s '
+          f'cost {first_cost if first_cost is not None else "-":>10}')
+    if search_seconds:
+        print(f'{"":>14}  after {search_seconds}s search: from savings '
+              f'{search(module, data, search_seconds, routes)}, from first solution '
+              f'{search(module, data, search_seconds)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', nargs='?', help='Solomon instance files')
+    parser.add_argument('--nodes', type=int, nargs='*', default=[1000, 3000],
+                        help='generated CVRP instance sizes')
+    parser.add_argument('--search', type=int, default=0, metavar='SECONDS')
+    args = parser.parse_args()
+
+    for num_nodes in args.nodes:
+        compare(f'cvrp {num_nodes}', 'cvrp', cvrp_instance(num_nodes), args.search)
+    if args.directory:
+        for path in sorted(glob.glob(os.path.join(args.directory, '*.txt'))):
+            data = read_solomon(path)
+            try:
+                compare(data['name'], 'cvrptw', data, args.search)
+            except InfeasibleInstance as e:
+                print(f"{data['name']:>14}  infeasible:\n{e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#! /usr/bin/env python3
+"""Quality and runtime benchmark on Solomon / Gehring-Homberger instances.
+
+Solves every instance file in a directory and appends one run record to a
+JSONL history file:
+
+    ./standard_suite.py run solomon/ --variant cvrptw --time-limit 60 \
+        --bks bks.json --label "native matrices"
+
+and compares a recorded run against a baseline run, flagging regressions:
+
+    ./standard_suite.py compare previous latest
+
+The best-known-solution file maps instance name to {"vehicles": ...,
+"distance": ...} in the instances' own units; gaps are computed on distance.
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+from routing_model import get_routes, load_variant
+from solomon import read_solomon
+
+HISTORY_FILE = 'benchmark_history.jsonl'
+VARIANTS = ('cvrptw', 'vrptw', 'cvrp')
+
+
+def solve_instance(variant, data, time_limit):
+    """Solves one instance, recording when each improving solution arrived."""
+    module = load_variant(variant)
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    search_parameters.time_limit.seconds = time_limit
+    search_parameters.solution_limit = (
+        pywrapcp.DefaultRoutingSearchParameters().solution_limit)
+
+    improvements = []
+    start = time.perf_counter()
+
+    def record():
+        objective = routing.CostVar().Max()
+        if not improvements or objective < improvements[-1][1]:
+            improvements.append((time.perf_counter() - start, objective))
+
+    routing.AddAtSolutionCallback(record)
+    solution = routing.SolveWithParameters(search_parameters)
+    record_ = {'instance': data['name'], 'nodes': len(data['demands']),
+               'seconds': round(time.perf_counter() - start, 3),
+               'objective': None}
+    if solution:
+        routes = get_routes(manager, routing, solution)
+        record_.update(
+            objective=solution.ObjectiveValue(),
+            distance=solution.ObjectiveValue() / data['scale'],
+            vehicles=sum(1 for route in routes if route),
+            first_solution_seconds=round(improvements[0][0], 3),
+            best_seconds=round(improvements[-1][0], 3))
+    return record_
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    bks = {}
+    if args.bks:
+        with open(args.bks) as f:
+            bks = json.load(f)
+    paths = sorted(glob.glob(os.path.join(args.directory, '*.txt')) +
+                   glob.glob(os.path.join(args.directory, '*.TXT')))
+    results = []
+    for path in paths:
+        data = read_solomon(path)
+        result = solve_instance(args.variant, data, args.time_limit)
+        best = bks.get(data['name'])
+        if best and result['objective'] is not None:
+            result['bks_distance'] = best['distance']
+            result['bks_vehicles'] = best.get('vehicles')
+            result['gap'] = round(100 * (result['distance'] - best['distance'])
+                                  / best['distance'], 3)
+        results.append(result)
+        print(json.dumps(result))
+
+    # Microseconds keep the ids of runs started within a second apart.
+    record = {'run_id': datetime.datetime.now().strftime('%Y%m%dT%H%M%S.%f'),
+              'label': args.label, 'commit': git_commit(),
+              'variant': args.variant, 'time_limit': args.time_limit,
+              'results': results}
+    with open(args.history, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"Recorded run {record['run_id']} in {args.history}")
+
+
+def load_run(history, run_id):
+    """Returns a run by id, or the 'latest' / 'previous' one."""
+    with open(history) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    if run_id == 'latest':
+        return runs[-1]
+    if run_id == 'previous':
+        return runs[-2]
+    for run in runs:
+        if run['run_id'] == run_id:
+            return run
+    sys.exit(f"No run {run_id} in {history}")
+
+
+def compare(args):
+    """Prints per-instance deltas of run B against baseline run A.
+
+    An instance regresses when B loses it, uses more vehicles, or its
+    objective is worse than A's by more than the tolerance (percent).
+    """
+    base = load_run(args.history, args.base)
+    new = load_run(args.history, args.new)
+    base_results = {r['instance']: r for r in base['results']}
+    regressions = 0
+    print(f"{base['run_id']} ({base['label']}) -> {new['run_id']} ({new['label']})")
+    print(f"{'instance':>12} {'objective':>12} {'delta %':>8} {'vehicles':>9} "
+          f"{'best s':>8} {'first s':>8}")
+    for result in new['results']:
+        before = base_results.get(result['instance'])
+        if before is None or before['objective'] is None:
+            continue
+        flag = ''
+        if result['objective'] is None:
+            print(f"{result['instance']:>12} {'none':>12}  REGRESSION")
+            regressions += 1
+            continue
+        delta = 100 * (result['objective'] - before['objective']) / before['objective']
+        if delta > args.tolerance or result['vehicles'] > before['vehicles']:
+            flag = 'REGRESSION'
+            regressions += 1
+        print(f"{result['instance']:>12} {result['objective']:>12} {delta:8.2f} "
+              f"{before['vehicles']:>4}->{result['vehicles']:<4} "
+              f"{result['best_seconds']:8.2f} {result['first_solution_seconds']:8.2f}"
+              f"  {flag}")
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', default=HISTORY_FILE)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='solve a directory of instances')
+    run_parser.add_argument('directory')
+    run_parser.add_argument('--variant', choices=VARIANTS, default='cvrptw')
+    run_parser.add_argument('--time-limit', type=int, default=60)
+    run_parser.add_argument('--bks', help='best-known solutions JSON file')
+    run_parser.add_argument('--label', default='')
+    compare_parser = commands.add_parser('compare', help='compare two runs')
+    compare_parser.add_argument('base', help="baseline run id, 'latest' or 'previous'")
+    compare_parser.add_argument('new', help="run id compared to the baseline, "
+                                            "'latest' or 'previous'")
+    compare_parser.add_argument('--tolerance', type=float, default=0.5,
+                                help='allowed objective increase in percent')
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
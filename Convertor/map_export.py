@@ -0,0 +1,228 @@
+#! /usr/bin/env python3
+"""Writes the map data payload for the Plotting pages.
+
+Reads a structured solver result, either in-process from
+solution_extract.extract_solution or from a file written with a solver's
+--save-solution flag, and streams it route by route as a compact payload
+for Plotting/map.js:
+
+    ./cvrptw.py --save-solution solution.json
+    ./Convertor/map_export.py solution.json --variant cvrptw
+
+writes Plotting/cvrptw_data.js. Stops are node indices into a single
+location name list, so the payload grows with the number of stops only.
+
+The payload also embeds the lat/lng of every location and, with
+--polylines, the encoded road geometry of every leg, so the page renders
+without a single geocoding or directions call. Both come from the travel
+cache, keyed by location address; only what is missing there is fetched,
+once (--coordinates gives a lat,lng CSV in location order instead, and
+seeds the cache with it). When the geometry cannot be resolved (offline,
+no API key, nodes without an address), the payload is written without it
+and the page geocodes and routes on the client as before.
+"""
+import argparse
+import json
+import os
+import sys
+from urllib.parse import unquote_plus
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from matrix_fetcher import MatrixFetcher, MatrixFetchError
+from route_matrices import ADDRESSES, LOCATION, create_data, read_coordinates
+from routing_model import VARIANTS
+from solution_extract import load_npz, read_json
+from travel_cache import CACHE_FILE, TravelCache
+
+PLOTTING = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'Plotting'))
+
+
+def route_payload(route, keys, polylines=None):
+    """Returns the payload of one route, or None if it serves no customer."""
+    if len(route['nodes']) <= 2:
+        return None
+    stops = route['nodes'].tolist()
+    payload = {'vehicle': int(route['vehicle']), 'stops': stops}
+    if polylines is not None:
+        payload['polylines'] = [polylines.get((keys[a], keys[b]))
+                                for a, b in zip(stops, stops[1:])]
+    if 'load' in route:
+        payload['load'] = route['load'].tolist()
+    if 'arrival_min' in route:
+        payload['arrival'] = [[int(early), int(late)] for early, late in
+                              zip(route['arrival_min'], route['arrival_max'])]
+    return payload
+
+
+def write_map_data(path, variant, result, names, coordinates=None,
+                   polylines=None, keys=None):
+    """Streams the payload of `result` to `path` one route at a time.
+
+    `coordinates` is a (lat, lng) per name and `polylines` maps (origin
+    key, destination key) legs to encoded polylines, `keys` being the cache
+    key of every node (the names by default); all are optional.
+    """
+    with open(path, 'w') as f:
+        f.write(f'window.MAP_DATA = {{"variant": {json.dumps(variant)},\n')
+        f.write(f'"names": {json.dumps(names, ensure_ascii=False)},\n')
+        if coordinates is not None:
+            f.write('"coordinates": %s,\n' % json.dumps(
+                [[round(lat, 6), round(lng, 6)] for lat, lng in coordinates],
+                separators=(',', ':')))
+        f.write('"routes": [')
+        separator = '\n'
+        for route in result['routes']:
+            payload = route_payload(route, keys or names, polylines)
+            if payload is None:
+                continue
+            f.write(separator + json.dumps(payload, separators=(',', ':')))
+            separator = ',\n'
+        f.write('\n]};\n')
+
+
+def location_names(result):
+    """Names every node in the result, falling back to the node index."""
+    num_nodes = max((int(route['nodes'].max()) for route in result['routes']),
+                    default=-1) + 1
+    return [LOCATION.get(node, str(node)) for node in range(num_nodes)]
+
+
+def location_addresses(num_nodes):
+    """Returns the plain-text address of every node, None for nodes that
+    have none; addresses key the geometry in the travel cache."""
+    return [unquote_plus(ADDRESSES[node]) if node < len(ADDRESSES) else None
+            for node in range(num_nodes)]
+
+
+def route_legs(result, keys):
+    """Returns the distinct (origin key, destination key) legs driven."""
+    legs = set()
+    for route in result['routes']:
+        stops = route['nodes'].tolist()
+        if len(stops) > 2:
+            legs.update((keys[a], keys[b]) for a, b in zip(stops, stops[1:])
+                        if a != b)
+    return legs
+
+
+def resolve_geometry(keys, legs, cache, fetcher=None, coordinates=None):
+    """Returns (coordinates, polylines) for the location keys and legs.
+
+    Keys are addresses. Cached entries are used as they are; missing ones
+    are fetched with `fetcher` and cached, or raise MatrixFetchError
+    without a fetcher. Known `coordinates` (one per key) are used as they
+    are. Pass legs=None to skip the polylines.
+    """
+    if coordinates is not None:
+        found = dict(zip(keys, coordinates))
+    else:
+        found = cache.coordinates(keys)
+    missing = [(key,) for key in set(keys) if key not in found]
+    failed = []
+    if missing and fetcher is not None:
+        fetched = {}
+        for (key,), location, reason in fetcher.fetch_each(fetcher.geocode,
+                                                            missing):
+            if location is None:
+                failed.append((key, None, reason))
+            else:
+                fetched[key] = location
+        cache.store_coordinates(fetched)
+        found.update(fetched)
+    elif missing:
+        failed.extend((key, None, 'not cached') for (key,) in missing)
+    if failed:
+        raise MatrixFetchError(failed)
+    coordinates = [found[key] for key in keys]
+    if legs is None:
+        return coordinates, None
+
+    polylines = cache.polylines(legs)
+    missing = {}
+    for o, d in legs:
+        if (o, d) not in polylines:
+            missing.setdefault((found[o], found[d]), []).append((o, d))
+    if missing and fetcher is not None:
+        fetched = {}
+        for points, polyline, reason in fetcher.fetch_each(fetcher.leg_polyline,
+                                                           missing):
+            for o, d in missing[points]:
+                if polyline is None:
+                    failed.append((o, d, reason))
+                else:
+                    fetched[o, d] = polyline
+        cache.store_polylines(fetched)
+        polylines.update(fetched)
+    elif missing:
+        failed.extend((o, d, 'not cached')
+                      for same_points in missing.values() for o, d in same_points)
+    if failed:
+        raise MatrixFetchError(failed)
+    return coordinates, polylines
+
+
+def read_result(path):
+    if path.endswith('.npz'):
+        return load_npz(path)
+    return read_json(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('solution', help='solution file (.json or .npz)')
+    parser.add_argument('--variant', choices=VARIANTS, required=True)
+    parser.add_argument('--out', help='payload file, default '
+                                      'Plotting/<variant>_data.js')
+    parser.add_argument('--coordinates', metavar='CSV',
+                        help='lat,lng per location, in location order')
+    parser.add_argument('--polylines', action='store_true',
+                        help='embed the road geometry of every leg')
+    parser.add_argument('--offline', action='store_true',
+                        help='use only cached geometry, never fetch')
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help='travel cache file (never created just to read it)')
+    args = parser.parse_args()
+
+    result = read_result(args.solution)
+    names = location_names(result)
+    keys = location_addresses(len(names))
+    coordinates = polylines = None
+    if args.coordinates:
+        lat, lng, _ = read_coordinates(args.coordinates)
+        coordinates = [(lat[node], lng[node]) for node in range(len(names))]
+    fetcher = None
+    if not args.offline and os.path.exists('API_KEY_HOLDER.env'):
+        fetcher = MatrixFetcher(create_data()['API_key'])
+
+    if None in keys:
+        print("Nodes without an address: the geometry is not cached or fetched")
+    elif fetcher is None and not os.path.exists(args.cache) and not args.coordinates:
+        print(f"No travel cache at {args.cache} and nothing to fetch with")
+    else:
+        cache = TravelCache(args.cache)
+        if coordinates is not None:
+            cache.store_coordinates(dict(zip(keys, coordinates)))
+        try:
+            coordinates = resolve_geometry(keys, None, cache, fetcher, coordinates)[0]
+            if args.polylines:
+                polylines = resolve_geometry(keys, route_legs(result, keys), cache,
+                                             fetcher, coordinates)[1]
+        except MatrixFetchError as e:
+            print("Could not resolve the map geometry of: " + ', '.join(
+                f'{o} -> {d} ({why})' if d else f'{o} ({why})'
+                for o, d, why in e.failed))
+        finally:
+            cache.close()
+    if coordinates is None:
+        print("Writing the payload without coordinates: the page geocodes "
+              "and routes on the client")
+
+    out = args.out or os.path.join(PLOTTING, f'{args.variant}_data.js')
+    write_map_data(out, args.variant, result, names, coordinates, polylines, keys)
+    print(f"{args.solution} -> {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+#! /usr/bin/env python3
+"""Exact CVRPTW as a mixed-integer program (PuLP + bundled CBC).
+
+Proves optimality on small instances (about 20 customers within minutes;
+at 30 with tight windows CBC usually stops at the time limit with the MIP
+start or better), which tells how far the OR-tools plans are from optimal.
+The model takes the same data dict as cvrptw.py (windows, demands,
+heterogeneous fleet, waiting limit and horizon) and the arcs cvrptw's
+presolve removes are never created:
+
+- x[i, j, k] = 1 if a vehicle of capacity class k drives from i to j.
+  Vehicles of equal capacity are interchangeable, so arcs are indexed by
+  class rather than by vehicle: this keeps the capacity of every route
+  exact without the symmetry of a per-vehicle formulation;
+- every customer is entered and left once, by the same class, and at most
+  as many vehicles of a class leave the depot as the fleet has;
+- MTZ constraints on the arrival time t[i] and the load l[i] enforce the
+  windows, the waiting limit and the capacities, and eliminate subtours;
+  arcs that increase neither (zero travel time into a zero-demand
+  customer, e.g. duplicate locations) get MTZ constraints on a visit
+  order u[i] as well, so they cannot close a subtour either.
+
+The objective is the arc cost of cvrptw.py (distance when the instance has
+a distance matrix, travel time otherwise). The OR-tools solution is passed
+to CBC as a MIP start.
+
+    ./MILP/cvrptw_milp.py --heuristic-seconds 10
+    ./MILP/cvrptw_milp.py --solomon C101.txt --customers 25 --time-limit 600
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pulp
+
+import cvrptw
+from bounds import optimality_gap
+from presolve import InfeasibleInstance, presolve
+from routing_model import cost_matrix, get_routes
+from solomon import read_solomon
+from solution_extract import extract_solution
+
+
+def capacity_classes(data):
+    """Returns (capacities, counts): the distinct capacities and how many
+    vehicles have each."""
+    capacities, counts = np.unique(data['vehicle_capacities'], return_counts=True)
+    return capacities.tolist(), counts.tolist()
+
+
+def build_milp(data, max_waiting=None, horizon=None):
+    """Builds the CVRPTW MILP.
+
+    Returns (problem, x, t, l) where x maps (i, j, k) to the arc variables
+    and t, l map each customer to its arrival time and load variables.
+    """
+    if max_waiting is None:
+        max_waiting = data.get('max_waiting', cvrptw.MAX_WAITING)
+    if horizon is None:
+        horizon = data.get('horizon', cvrptw.HORIZON)
+    windows, removed = presolve(data, max_waiting, horizon)
+    costs = np.asarray(cost_matrix(data), dtype=np.int64)
+    times = np.asarray(data['time_matrix'], dtype=np.int64)
+    demands = list(data['demands'])
+    depot = data['depot']
+    n = len(costs)
+    customers = [i for i in range(n) if i != depot]
+    capacities, counts = capacity_classes(data)
+    classes = range(len(capacities))
+    q_max = max(capacities)
+    depot_early, depot_late = data['time_windows'][depot]
+
+    allowed = np.ones((n, n), dtype=bool)
+    np.fill_diagonal(allowed, False)
+    for node, successors in removed:
+        allowed[node, successors] = False
+    arcs = list(zip(*np.nonzero(allowed)))
+
+    problem = pulp.LpProblem('CVRPTW', pulp.LpMinimize)
+    x = {(int(i), int(j), k): pulp.LpVariable(f'x_{i}_{j}_{k}', cat='Binary')
+         for i, j in arcs for k in classes}
+    t = {i: pulp.LpVariable(f't_{i}', windows[i][0], windows[i][1])
+         for i in customers}
+    l = {i: pulp.LpVariable(f'l_{i}', demands[i], q_max) for i in customers}
+    problem += pulp.lpSum(int(costs[i, j]) * var for (i, j, _), var in x.items())
+
+    entering = {(j, k): [] for j in range(n) for k in classes}
+    leaving = {(i, k): [] for i in range(n) for k in classes}
+    for (i, j, k), var in x.items():
+        leaving[i, k].append(var)
+        entering[j, k].append(var)
+
+    for i in customers:
+        problem += pulp.lpSum(entering[i, k] for k in classes) == 1, f'enter_{i}'
+        for k in classes:
+            problem += (pulp.lpSum(entering[i, k]) == pulp.lpSum(leaving[i, k]),
+                        f'flow_{i}_{k}')
+        # The load fits the class of the vehicle that visits the customer.
+        problem += (l[i] <= pulp.lpSum(capacities[k] * pulp.lpSum(entering[i, k])
+                                       for k in classes), f'capacity_{i}')
+    for k in classes:
+        problem += pulp.lpSum(leaving[depot, k]) <= counts[k], f'fleet_{k}'
+        problem += (pulp.lpSum(leaving[depot, k]) == pulp.lpSum(entering[depot, k]),
+                    f'return_{k}')
+
+    u = {}
+    for i, j in arcs:
+        i, j = int(i), int(j)
+        used = pulp.lpSum(x[i, j, k] for k in classes)
+        travel = int(times[i, j])
+        if i == depot:
+            # The vehicle leaves the depot within its window.
+            problem += t[j] >= (depot_early + travel) * used, f'leave_{j}'
+            slack = max(0, windows[j][1] - (depot_late + travel + max_waiting))
+            problem += (t[j] <= depot_late + travel + max_waiting + slack * (1 - used),
+                        f'start_wait_{j}')
+        elif j == depot:
+            over = max(0, windows[i][1] + travel - horizon)
+            problem += t[i] + travel <= horizon + over * (1 - used), f'back_{i}'
+        else:
+            late = max(0, windows[i][1] + travel - windows[j][0])
+            problem += t[j] >= t[i] + travel - late * (1 - used), f'time_{i}_{j}'
+            early = max(0, windows[j][1] - windows[i][0] - travel - max_waiting)
+            problem += (t[j] <= t[i] + travel + max_waiting + early * (1 - used),
+                        f'wait_{i}_{j}')
+            problem += (l[j] >= l[i] + demands[j] - q_max * (1 - used),
+                        f'load_{i}_{j}')
+            if travel == 0 and demands[j] == 0:
+                if i not in u:
+                    u[i] = pulp.LpVariable(f'u_{i}', 1, len(customers))
+                if j not in u:
+                    u[j] = pulp.LpVariable(f'u_{j}', 1, len(customers))
+                problem += (u[j] >= u[i] + 1 - len(customers) * (1 - used),
+                            f'order_{i}_{j}')
+    return problem, x, t, l
+
+
+def milp_routes(data, x):
+    """Returns [(capacity class, depot-less route), ...] from the solved x."""
+    depot = data['depot']
+    successor = {}
+    starts = []
+    for (i, j, k), var in x.items():
+        if var.varValue is not None and var.varValue > 0.5:
+            if i == depot:
+                starts.append((k, j))
+            else:
+                successor[i] = j
+    routes = []
+    for k, node in starts:
+        route = []
+        while node != depot:
+            route.append(node)
+            node = successor[node]
+        routes.append((k, route))
+    return routes
+
+
+def set_mip_start(data, x, t, l, routes, arrivals):
+    """Sets the initial values of every variable from a heuristic plan.
+
+    `routes` are depot-less node sequences per vehicle and `arrivals` the
+    arrival time at each node.
+    """
+    capacities, _ = capacity_classes(data)
+    depot = data['depot']
+    for var in x.values():
+        var.setInitialValue(0)
+    for vehicle_id, route in enumerate(routes):
+        if not route:
+            continue
+        k = capacities.index(data['vehicle_capacities'][vehicle_id])
+        stops = [depot] + route + [depot]
+        load = 0
+        for i, j in zip(stops, stops[1:]):
+            if (i, j, k) in x:
+                x[i, j, k].setInitialValue(1)
+        for node in route:
+            load += data['demands'][node]
+            l[node].setInitialValue(load)
+            t[node].setInitialValue(arrivals[node])
+
+
+def solve_heuristic(data, seconds):
+    """Solves with OR-tools; returns (objective, routes, arrivals) or None."""
+    manager, routing = cvrptw.build_model(data)
+    search_parameters = cvrptw.create_search_parameters()
+    search_parameters.time_limit.seconds = seconds
+    solution = routing.SolveWithParameters(search_parameters)
+    if not solution:
+        return None
+    arrivals = {}
+    for route in extract_solution(data, manager, routing, solution)['routes']:
+        for node, arrival in zip(route['nodes'], route['arrival_min']):
+            arrivals[int(node)] = int(arrival)
+    return (solution.ObjectiveValue(), get_routes(manager, routing, solution),
+            arrivals)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--solomon', metavar='FILE',
+                        help='solve a Solomon instance instead of cvrptw.py data')
+    parser.add_argument('--customers', type=int,
+                        help='keep only the first N customers of the instance')
+    parser.add_argument('--time-limit', type=int, default=600,
+                        help='CBC time limit in seconds')
+    parser.add_argument('--heuristic-seconds', type=int, default=10,
+                        help='OR-tools time limit for the MIP start')
+    parser.add_argument('--no-mip-start', action='store_true')
+    args = parser.parse_args()
+
+    if args.solomon:
+        data = read_solomon(args.solomon)
+    else:
+        data = cvrptw.create_data_model()
+    if args.customers:
+        keep = np.arange(args.customers + 1)
+        data = dict(data)
+        for key in ('distance_matrix', 'time_matrix'):
+            if key in data:
+                data[key] = np.asarray(data[key])[np.ix_(keep, keep)]
+        data['time_windows'] = data['time_windows'][:len(keep)]
+        data['demands'] = data['demands'][:len(keep)]
+
+    try:
+        problem, x, t, l = build_milp(data)
+    except InfeasibleInstance as e:
+        print(f"The instance is infeasible:\n{e}")
+        return
+    print(f"MILP: {len(problem.variables())} variables, "
+          f"{len(problem.constraints)} constraints")
+
+    heuristic = None
+    if not args.no_mip_start:
+        heuristic = solve_heuristic(data, args.heuristic_seconds)
+        if heuristic is None:
+            print("OR-tools found no solution: solving without a MIP start")
+        else:
+            print(f"OR-tools objective: {heuristic[0]}")
+            set_mip_start(data, x, t, l, heuristic[1], heuristic[2])
+
+    problem.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=args.time_limit,
+                                    warmStart=heuristic is not None))
+    if problem.sol_status == pulp.LpSolutionOptimal:
+        status = 'optimal'
+    elif problem.sol_status == pulp.LpSolutionIntegerFeasible:
+        status = 'feasible, not proven optimal within the time limit'
+    elif problem.status == pulp.LpStatusInfeasible:
+        print("The MILP is infeasible: the instance has no solution")
+        return
+    else:
+        print(f"No solution within the time limit ({pulp.LpStatus[problem.status]})")
+        return
+
+    objective = round(pulp.value(problem.objective))
+    print(f"MILP objective: {objective} ({status})")
+    if heuristic is not None and problem.sol_status == pulp.LpSolutionOptimal:
+        # Same definition as the gap every solver reports (bounds.py).
+        print(f"OR-tools gap to the optimum: "
+              f"{optimality_gap(heuristic[0], objective):.2f}%")
+    capacities, _ = capacity_classes(data)
+    for k, route in milp_routes(data, x):
+        print(f"Capacity {capacities[k]}: 0 -> "
+              + " -> ".join(f"{node}@{round(t[node].varValue)}" for node in route)
+              + " -> 0")
+
+
+if __name__ == '__main__':
+    main()
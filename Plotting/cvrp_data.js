@@ -0,0 +1,14 @@
+window.MAP_DATA = {"variant": "cvrp",
+"names": ["Dtdc Courier Service Aerocity mohali", "Mahendra Chaudhary Zoological Park, Chhat Bir Zoo, Zirakpur", "Radisson Hotel Chandigarh Zirakpur", "Plaksha University", "Bestech Square Mall", "JLPL Falcon View", "Mohali IT City Park", "Amity University, Mohali", "Sharon Resort", "La Palacio Luxury Banquet & Lawns - Wedding Palace in Zirakpur", "Strawberry Global Smart School", "Akm Resorts", "Gurdwara Dushat Daman Durali", "Jayant education", "The Mohali Club || Wyndham Chandigarh Mohali", "The Amaltas Farms", "Singh Sheeda Gurdwara Sahib"],
+"routes": [
+{"vehicle":0,"stops":[0,8,0],"load":[0,15,15]},
+{"vehicle":1,"stops":[0,13,11,0],"load":[0,13,29,29]},
+{"vehicle":2,"stops":[0,2,0],"load":[0,10,10]},
+{"vehicle":3,"stops":[0,4,14,0],"load":[0,12,24,24]},
+{"vehicle":4,"stops":[0,10,15,0],"load":[0,14,25,25]},
+{"vehicle":5,"stops":[0,3,16,0],"load":[0,20,40,40]},
+{"vehicle":6,"stops":[0,7,0],"load":[0,18,18]},
+{"vehicle":7,"stops":[0,1,9,0],"load":[0,12,24,24]},
+{"vehicle":8,"stops":[0,6,0],"load":[0,13,13]},
+{"vehicle":9,"stops":[0,12,5,0],"load":[0,12,27,27]}
+]};
@@ -0,0 +1,13 @@
+window.MAP_DATA = {"variant": "cvrptw",
+"names": ["Dtdc Courier Service Aerocity mohali", "Mahendra Chaudhary Zoological Park, Chhat Bir Zoo, Zirakpur", "Radisson Hotel Chandigarh Zirakpur", "Plaksha University", "Bestech Square Mall", "JLPL Falcon View", "Mohali IT City Park", "Amity University, Mohali", "Sharon Resort", "La Palacio Luxury Banquet & Lawns - Wedding Palace in Zirakpur", "Strawberry Global Smart School", "Akm Resorts", "Gurdwara Dushat Daman Durali", "Jayant education", "The Mohali Club || Wyndham Chandigarh Mohali", "The Amaltas Farms", "Singh Sheeda Gurdwara Sahib"],
+"routes": [
+{"vehicle":0,"stops":[0,9,1,8,0],"load":[0,4,8,16,16],"arrival":[[0,0],[447,447],[878,878],[1263,1263],[2271,2271]]},
+{"vehicle":1,"stops":[0,6,0],"load":[0,3,3],"arrival":[[0,0],[850,850],[1468,1468]]},
+{"vehicle":2,"stops":[0,11,13,0],"load":[0,1,4,4],"arrival":[[0,0],[627,627],[1196,1196],[2334,2334]]},
+{"vehicle":3,"stops":[0,3,16,12,0],"load":[0,9,11,17,17],"arrival":[[0,0],[533,533],[996,996],[1319,1319],[2471,2471]]},
+{"vehicle":4,"stops":[0,15,2,0],"load":[0,7,12,12],"arrival":[[0,0],[526,659],[1000,1000],[1704,1704]]},
+{"vehicle":5,"stops":[0,7,0],"load":[0,3,3],"arrival":[[0,0],[533,533],[1345,1345]]},
+{"vehicle":6,"stops":[0,10,0],"load":[0,8,8],"arrival":[[0,0],[816,816],[1637,1637]]},
+{"vehicle":7,"stops":[0,5,0],"load":[0,5,5],"arrival":[[0,0],[697,697],[1354,1354]]},
+{"vehicle":9,"stops":[0,4,14,0],"load":[0,5,7,7],"arrival":[[0,0],[850,850],[1141,1141],[2173,2173]]}
+]};
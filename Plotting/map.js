@@ -0,0 +1,222 @@
+// Static map template shared by every problem variant.
+//
+// The route data comes from the payload written by Convertor/map_export.py
+// (e.g. cvrptw_data.js), which sets window.MAP_DATA to
+//   {variant, names: [location name per node], coordinates?: [[lat, lng], ...],
+//    routes: [{vehicle, stops: [node, ...], load?: [...],
+//              arrival?: [[min, max], ...], polylines?: [encoded leg, ...]}]}
+// Only routes that visit at least one customer are exported.
+//
+// With coordinates the whole plan is drawn on one map from the payload
+// alone; without them every route is geocoded and routed on the client.
+
+// Google Directions accepts at most 25 waypoints per request.
+const MAX_WAYPOINTS = 25;
+const ROUTE_COLORS = [
+  "#e6194b", "#3cb44b", "#4363d8", "#f58231", "#911eb4",
+  "#42d4f4", "#f032e6", "#9a6324", "#800000", "#000075",
+];
+
+function initMap() {
+  const data = window.MAP_DATA;
+  if (data.coordinates) {
+    renderPlan(data);
+    return;
+  }
+  for (const route of data.routes) {
+    renderRoute(data, route);
+  }
+}
+
+function renderPlan(data) {
+  const mapContainer = document.createElement("div");
+  mapContainer.id = "map-plan";
+  mapContainer.className = "map-container plan-container";
+  document.getElementById("container").appendChild(mapContainer);
+
+  const map = new google.maps.Map(mapContainer, {
+    zoom: 13,
+    center: { lat: 30.7052, lng: 76.785 },
+  });
+  const points = data.coordinates.map(([lat, lng]) => ({ lat, lng }));
+  const bounds = new google.maps.LatLngBounds();
+
+  data.routes.forEach((route, r) => {
+    const color = ROUTE_COLORS[r % ROUTE_COLORS.length];
+    const path = [points[route.stops[0]]];
+    for (let i = 1; i < route.stops.length; i++) {
+      const encoded = route.polylines && route.polylines[i - 1];
+      if (encoded) {
+        path.push(...decodePolyline(encoded));
+      } else {
+        path.push(points[route.stops[i]]);
+      }
+    }
+    new google.maps.Polyline({
+      path,
+      map,
+      strokeColor: color,
+      strokeOpacity: 0.8,
+      strokeWeight: 3,
+    });
+    for (let i = 1; i < route.stops.length - 1; i++) {
+      createCustomMarker(points[route.stops[i]], `${i}`, color).setMap(map);
+    }
+    path.forEach((point) => bounds.extend(point));
+
+    const summaryPanel = createSummaryPanel(data, route);
+    summaryPanel.style.borderLeft = `6px solid ${color}`;
+  });
+
+  const depots = new Set(data.routes.map((route) => route.stops[0]));
+  depots.forEach((node) => createCustomMarker(points[node], "DEPOT").setMap(map));
+  if (!bounds.isEmpty()) {
+    map.fitBounds(bounds);
+  }
+}
+
+// Decodes an encoded polyline (Google's polyline algorithm) to points.
+function decodePolyline(encoded) {
+  const points = [];
+  let index = 0;
+  let lat = 0;
+  let lng = 0;
+  while (index < encoded.length) {
+    for (const axis of [0, 1]) {
+      let shift = 0;
+      let result = 0;
+      let byte;
+      do {
+        byte = encoded.charCodeAt(index++) - 63;
+        result |= (byte & 0x1f) << shift;
+        shift += 5;
+      } while (byte >= 0x20);
+      const delta = result & 1 ? ~(result >> 1) : result >> 1;
+      if (axis === 0) {
+        lat += delta;
+      } else {
+        lng += delta;
+      }
+    }
+    points.push({ lat: lat / 1e5, lng: lng / 1e5 });
+  }
+  return points;
+}
+
+function createSummaryPanel(data, route) {
+  const summaryPanel = document.createElement("div");
+  summaryPanel.className = "directions-panel";
+  document.getElementById("container").appendChild(summaryPanel);
+  let html = `<b>Route for vehicle ${route.vehicle}</b><br>`;
+  route.stops.forEach((node, i) => {
+    let details = "";
+    if (route.arrival) {
+      details += ` Time(${route.arrival[i][0]},${route.arrival[i][1]})`;
+    }
+    if (route.load) {
+      details += ` Load(${route.load[i]})`;
+    }
+    html += `${i}. ${data.names[node]}${details}<br>`;
+  });
+  summaryPanel.innerHTML = html;
+  return summaryPanel;
+}
+
+function renderRoute(data, route) {
+  const mapContainer = document.createElement("div");
+  mapContainer.id = `map-${route.vehicle}`;
+  mapContainer.className = "map-container";
+  document.getElementById("container").appendChild(mapContainer);
+
+  const map = new google.maps.Map(mapContainer, {
+    zoom: 13,
+    center: { lat: 30.7052, lng: 76.785 },
+  });
+  const names = route.stops.map((node) => data.names[node]);
+  const summaryPanel = createSummaryPanel(data, route);
+
+  geocodeAddress(names[0], (startLocation) => {
+    if (startLocation) {
+      createCustomMarker(startLocation, "DEPOT").setMap(map);
+    } else {
+      console.error("Unable to geocode start location:", names[0]);
+    }
+  });
+
+  // Split long routes into consecutive requests sharing their end stops,
+  // keeping the solver's visiting order.
+  const step = MAX_WAYPOINTS + 1;
+  for (let first = 0; first < names.length - 1; first += step) {
+    const chunk = names.slice(first, first + step + 1);
+    calculateAndDisplayRoute(map, chunk, summaryPanel);
+  }
+}
+
+function calculateAndDisplayRoute(map, names, summaryPanel) {
+  const directionsService = new google.maps.DirectionsService();
+  const directionsRenderer = new google.maps.DirectionsRenderer({
+    map,
+    suppressMarkers: true,
+    preserveViewport: false,
+  });
+  directionsService
+    .route({
+      origin: names[0],
+      destination: names[names.length - 1],
+      waypoints: names.slice(1, -1).map((location) => ({
+        location,
+        stopover: true,
+      })),
+      optimizeWaypoints: false,
+      travelMode: google.maps.TravelMode.DRIVING,
+    })
+    .then((response) => {
+      directionsRenderer.setDirections(response);
+      const legs = response.routes[0].legs;
+      for (let i = 0; i < legs.length - 1; i++) {
+        createCustomMarker(legs[i].end_location, "WAYPOINT").setMap(map);
+      }
+      for (const leg of legs) {
+        summaryPanel.innerHTML +=
+          `${leg.start_address} to ${leg.end_address}: ${leg.distance.text}<br>`;
+      }
+    })
+    .catch((e) => console.error("Directions request failed due to " + e));
+}
+
+function createCustomMarker(position, label, fillColor) {
+  return new google.maps.Marker({
+    position,
+    label: {
+      text: label,
+      color: "BLACK", // Label text color
+    },
+    icon: {
+      path: google.maps.SymbolPath.CIRCLE,
+      scale: 10,
+      // Custom color for waypoints
+      fillColor: fillColor || (label === "DEPOT" ? "pink" : "blue"),
+      fillOpacity: 1,
+      strokeWeight: 1,
+      strokeColor: "white", // Set the stroke color
+    },
+    map: null, // Set map property to the map object when placing on the map
+  });
+}
+
+function geocodeAddress(locationName, callback) {
+  const geocoder = new google.maps.Geocoder();
+  geocoder.geocode({ address: locationName }, (results, status) => {
+    if (status === "OK") {
+      callback(results[0].geometry.location);
+    } else {
+      console.error(
+        "Geocode was not successful for the following reason:",
+        status
+      );
+      callback(null);
+    }
+  });
+}
+
+window.initMap = initMap;
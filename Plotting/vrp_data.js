@@ -0,0 +1,10 @@
+window.MAP_DATA = {"variant": "vrp",
+"names": ["Dtdc Courier Service Aerocity mohali", "Mahendra Chaudhary Zoological Park, Chhat Bir Zoo, Zirakpur", "Radisson Hotel Chandigarh Zirakpur", "Plaksha University", "Bestech Square Mall", "JLPL Falcon View", "Mohali IT City Park", "Amity University, Mohali", "Sharon Resort", "La Palacio Luxury Banquet & Lawns - Wedding Palace in Zirakpur", "Strawberry Global Smart School", "Akm Resorts", "Gurdwara Dushat Daman Durali", "Jayant education", "The Mohali Club || Wyndham Chandigarh Mohali", "The Amaltas Farms", "Singh Sheeda Gurdwara Sahib"],
+"routes": [
+{"vehicle":0,"stops":[0,6,0]},
+{"vehicle":1,"stops":[0,1,2,11,0]},
+{"vehicle":4,"stops":[0,4,14,5,0]},
+{"vehicle":5,"stops":[0,9,8,0]},
+{"vehicle":6,"stops":[0,10,13,15,0]},
+{"vehicle":7,"stops":[0,3,12,16,7,0]}
+]};
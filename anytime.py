@@ -0,0 +1,225 @@
+#! /usr/bin/env python3
+"""Anytime solving: improving solutions as soon as they are found.
+
+`anytime_solve` starts the search in a background thread and returns an
+AnytimeSearch, which is iterated (or async-iterated) to receive every
+improving solution as a dict {elapsed, objective, routes}, where routes are
+node sequences without depots, in the format of routing_model.get_routes and
+write_plan. Besides the time and solution limits of the search parameters,
+the search stops when
+
+- no solution improved for `stagnation` seconds,
+- a solution reaches an objective of `target` or better (the script's
+  --gap sets it from bounds.variant_bound),
+- `cancel()` is called, or the iteration is abandoned (break/close).
+
+    search = anytime_solve(data, manager, routing, search_parameters,
+                           stagnation=10)
+    for improvement in search:
+        dispatch(improvement['routes'])
+
+Leaving a `for` loop early cancels the search. An `async for` loop is only
+finalized later by the event loop, so call `cancel()` before breaking out
+of one.
+
+Run as a script to print the improvements of a problem variant live:
+
+    ./anytime.py cvrptw --stagnation 5 --target 2500000
+    ./anytime.py cvrp --gap 5
+"""
+import argparse
+import asyncio
+import math
+import queue
+import threading
+import time
+
+from routing_model import VARIANTS, load_variant, solve_model, write_plan
+
+_DONE = object()
+
+
+def current_routes(manager, routing):
+    """Node sequence of every vehicle in the solution being accepted.
+
+    Only valid inside search callbacks, where the variables are bound.
+    """
+    routes = []
+    for vehicle_id in range(routing.vehicles()):
+        index = routing.NextVar(routing.Start(vehicle_id)).Value()
+        route = []
+        while not routing.IsEnd(index):
+            route.append(manager.IndexToNode(index))
+            index = routing.NextVar(index).Value()
+        routes.append(route)
+    return routes
+
+
+class AnytimeSearch:
+    """A search running in a background thread, iterated for improvements.
+
+    After the iteration ends, `solution` holds the final assignment (None if
+    no solution was found) and `stop_reason` why the search stopped early
+    ('stagnation', 'target', 'cancelled'), or None if it ran to its limits.
+    """
+
+    def __init__(self, data, manager, routing, search_parameters, plan=None,
+                 stagnation=None, target=None):
+        self.manager = manager
+        self.routing = routing
+        self.stagnation = stagnation
+        self.target = target
+        self.solution = None
+        self.stop_reason = None
+        self.best = None
+        self.improvements = queue.Queue()
+        self.cancelled = threading.Event()
+        self.start = time.perf_counter()
+        self.last_improvement = self.start
+        routing.AddAtSolutionCallback(self.at_solution)
+        # Polled by the search between moves; returning True stops it.
+        routing.AddSearchMonitor(routing.solver().CustomLimit(self.should_stop))
+        self.thread = threading.Thread(
+            target=self.run, args=(data, search_parameters, plan), daemon=True)
+        self.thread.start()
+
+    def run(self, data, search_parameters, plan):
+        try:
+            self.solution = solve_model(data, self.manager, self.routing,
+                                        search_parameters, plan)
+            self.improvements.put(_DONE)
+        except BaseException as e:
+            self.improvements.put(e)
+
+    def at_solution(self):
+        objective = self.routing.CostVar().Max()
+        if self.best is not None and objective >= self.best:
+            return
+        self.best = objective
+        self.last_improvement = time.perf_counter()
+        self.improvements.put({
+            'elapsed': round(self.last_improvement - self.start, 4),
+            'objective': objective,
+            'routes': current_routes(self.manager, self.routing),
+        })
+
+    def should_stop(self):
+        if self.cancelled.is_set():
+            self.stop_reason = self.stop_reason or 'cancelled'
+            return True
+        if self.target is not None and self.best is not None \
+                and self.best <= self.target:
+            self.stop_reason = 'target'
+            return True
+        if self.stagnation is not None and self.best is not None \
+                and time.perf_counter() - self.last_improvement > self.stagnation:
+            self.stop_reason = 'stagnation'
+            return True
+        return False
+
+    def cancel(self):
+        """Stops the search at its next check; safe from any thread."""
+        self.cancelled.set()
+
+    def wait(self):
+        """Waits for the search thread and returns the final assignment."""
+        self.thread.join()
+        return self.solution
+
+    def _received(self, item):
+        if item is _DONE:
+            return False
+        if isinstance(item, BaseException):
+            raise item
+        return True
+
+    def __iter__(self):
+        try:
+            while True:
+                item = self.improvements.get()
+                if not self._received(item):
+                    return
+                yield item
+        finally:
+            self.cancel()
+            self.thread.join()
+
+    async def __aiter__(self):
+        try:
+            while True:
+                item = await asyncio.to_thread(self.improvements.get)
+                if not self._received(item):
+                    return
+                yield item
+        finally:
+            self.cancel()
+            await asyncio.to_thread(self.thread.join)
+
+
+def anytime_solve(data, manager, routing, search_parameters, plan=None,
+                  stagnation=None, target=None):
+    """Starts solving in the background; iterate the result for improvements.
+
+    The model must not be closed yet. `plan` warm-starts the search as in
+    routing_model.solve_model.
+    """
+    return AnytimeSearch(data, manager, routing, search_parameters, plan,
+                         stagnation, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('variant', choices=VARIANTS)
+    parser.add_argument('--stagnation', type=float, metavar='SECONDS',
+                        help='stop after this long without improvement')
+    parser.add_argument('--target', type=int, metavar='OBJECTIVE',
+                        help='stop once the objective is this low')
+    parser.add_argument('--gap', type=float, metavar='PERCENT',
+                        help='stop once within this gap of the lower bound')
+    parser.add_argument('--time-limit', type=int, metavar='SECONDS',
+                        help='override the search time limit')
+    parser.add_argument('--save-plan', metavar='PLAN',
+                        help='write the best plan as a JSON plan')
+    args = parser.parse_args()
+    if args.gap is not None and not 0 <= args.gap < 100:
+        parser.error("--gap must be at least 0 and below 100")
+
+    module = load_variant(args.variant)
+    data = module.create_data_model()
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    if args.time_limit:
+        search_parameters.time_limit.seconds = args.time_limit
+
+    target = bound = None
+    if args.gap is not None:
+        from bounds import format_gap, variant_bound
+        bound = variant_bound(module, data)['bound']
+        print(f"Lower bound: {bound}")
+        # objective - bound <= gap * objective
+        target = math.floor(bound / (1 - args.gap / 100))
+    if args.target is not None:
+        target = args.target if target is None else max(target, args.target)
+
+    search = anytime_solve(data, manager, routing, search_parameters,
+                           stagnation=args.stagnation, target=target)
+    best = None
+    try:
+        for best in search:
+            used = sum(1 for route in best['routes'] if route)
+            gap = '' if bound is None else '  ' + format_gap(best['objective'], bound)
+            print(f"{best['elapsed']:9.3f}s  objective {best['objective']}  "
+                  f"vehicles {used}{gap}", flush=True)
+    except KeyboardInterrupt:
+        print("Cancelled.")
+    if best is None:
+        print("No solution found !")
+        return
+    print(f"Stopped: {search.stop_reason or 'search limit reached'}")
+    if args.save_plan:
+        write_plan(args.save_plan, best['routes'])
+
+
+if __name__ == '__main__':
+    main()
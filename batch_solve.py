@@ -0,0 +1,125 @@
+#! /usr/bin/env python3
+"""Batch solver for streams of routing instances.
+
+Reads one JSON instance per line and solves them across a process pool,
+writing one JSON result line per instance as soon as it finishes:
+
+    ./batch_solve.py instances.jsonl --workers 8 --time-limit 30 > results.jsonl
+
+An instance line looks like
+
+    {"id": "depot-7", "variant": "cvrptw", "time_limit": 30,
+     "data": {"time_matrix": "depot-7/time_matrix.bin",
+              "time_windows": [[0, 600], ...], "demands": [0, 4, ...],
+              "vehicle_capacities": [20, ...], "num_vehicles": 10, "depot": 0},
+     "warm_start": {"0": [3, 1], ...}}
+
+`variant` is one of vrp, cvrp, vrptw, cvrptw and `data` holds the same keys
+as the matching script's create_data_model. Matrices are given inline or as
+a path to a binary or text matrix file. `time_limit` and `warm_start` are
+optional.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from matrix_store import read_matrix
+from presolve import InfeasibleInstance
+from routing_model import get_routes, load_variant, plan_routes, solve_model
+
+MATRIX_KEYS = ('distance_matrix', 'time_matrix')
+
+
+def load_instance_data(data):
+    """Resolves matrix file references in an instance's data."""
+    data = dict(data)
+    for key in MATRIX_KEYS:
+        if isinstance(data.get(key), str):
+            data[key] = read_matrix(data[key])
+    return data
+
+
+def solve_instance(instance, default_time_limit):
+    """Solves one instance and returns its result; runs in a worker.
+
+    `instance` is a dict or its JSON line; a line that does not parse gives
+    an error result like any other failing instance.
+    """
+    start = time.time()
+    result = {'id': None, 'variant': None}
+    try:
+        if isinstance(instance, str):
+            instance = json.loads(instance)
+        result.update(id=instance.get('id'), variant=instance.get('variant'))
+        module = load_variant(instance['variant'])
+        data = load_instance_data(instance['data'])
+        manager, routing = module.build_model(data)
+        search_parameters = module.create_search_parameters()
+        search_parameters.time_limit.seconds = instance.get(
+            'time_limit', default_time_limit)
+        plan = instance.get('warm_start')
+        if plan is not None:
+            plan = plan_routes(plan, data['num_vehicles'])
+        solution = solve_model(data, manager, routing, search_parameters, plan)
+        if solution:
+            result.update(status='solved',
+                          objective=solution.ObjectiveValue(),
+                          routes=get_routes(manager, routing, solution))
+        else:
+            result.update(status='no_solution')
+    except InfeasibleInstance as e:
+        result.update(status='infeasible', reasons=e.reasons)
+    except Exception as e:
+        result.update(status='error', error=f'{type(e).__name__}: {e}',
+                      traceback=traceback.format_exc())
+    result['seconds'] = round(time.time() - start, 3)
+    return result
+
+
+def solve_batch(lines, workers=None, time_limit=30):
+    """Solves a stream of JSON instance lines, yielding results as they finish.
+
+    At most twice as many instances as workers are read ahead, so arbitrarily
+    long streams are solved in constant memory.
+    """
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for line in lines:
+            if not line.strip():
+                continue
+            pending.add(pool.submit(solve_instance, line, time_limit))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('instances', help="JSONL file of instances, '-' for stdin")
+    parser.add_argument('-o', '--output', help='JSONL results file (default stdout)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--time-limit', type=int, default=30,
+                        help='default per-instance time limit in seconds')
+    args = parser.parse_args()
+
+    source = sys.stdin if args.instances == '-' else open(args.instances)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    with source, output:
+        for result in solve_batch(source, args.workers, args.time_limit):
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+
+
+if __name__ == '__main__':
+    main()
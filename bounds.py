@@ -0,0 +1,262 @@
+#! /usr/bin/env python3
+"""Lower bounds on the objective, to report the optimality gap of a solve.
+
+Every bound is a relaxation of the routing models, computed in NumPy /
+SciPy from the cost matrix, so any solution costs at least as much:
+
+- vehicles: the fewest vehicles whose capacities cover the total demand;
+- degree: every customer is entered and left once, and at least that many
+  of them are entered from and left to the depot;
+- assignment: the same as a linear assignment problem over the customers
+  and one depot copy per vehicle (depot copies past the minimum vehicle
+  count may stay unused), solved exactly with linear_sum_assignment;
+- lp: the assignment relaxation as an LP, strengthened by rounded capacity
+  cuts (every group of customers is left at least ceil(demand / largest
+  capacity) times) separated on the connected components of the solution.
+
+Arcs that no feasible route can use (two demands over the largest capacity
+and, with time windows, presolve's infeasible arcs) are excluded. The
+assignment bound is skipped above ASSIGNMENT_NODES and the LP above
+LP_NODES, and both need scipy; the degree bound is always available and
+works through the matrix in row chunks. The gap is reported as
+(objective - bound) / objective.
+
+    ./bounds.py cvrp
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment, linprog
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+except ImportError:  # only the degree bound is available
+    linear_sum_assignment = None
+
+from presolve import presolve, shortest_from, shortest_to
+from routing_model import VARIANTS, cost_matrix, load_variant
+
+CHUNK_CELLS = 1 << 22
+ASSIGNMENT_NODES = 2000
+LP_NODES = 50
+LP_ROUNDS = 50
+
+
+def minimum_vehicles(data):
+    """The fewest vehicles whose capacities sum to the total demand (one
+    without demands)."""
+    if 'demands' not in data:
+        return 1
+    total = int(np.sum(data['demands']))
+    capacities = np.sort(np.asarray(data['vehicle_capacities'], dtype=np.int64))[::-1]
+    return max(1, min(int(np.searchsorted(np.cumsum(capacities), total)) + 1,
+                      len(capacities)))
+
+
+def removed_arcs(data, max_waiting=None, horizon=None):
+    """Returns {node: successors} of presolve's infeasible arcs.
+
+    Only instances with time windows have them, and only when both the
+    waiting limit and the horizon are known.
+    """
+    if 'time_windows' in data and max_waiting is not None and horizon is not None:
+        return dict(presolve(data, max_waiting, horizon)[1])
+    return {}
+
+
+def allowed_arcs(data, removed, start=0, stop=None):
+    """Returns the boolean mask of the arcs from nodes start:stop that a
+    feasible route may use; `removed` is the removed_arcs mapping."""
+    n = len(cost_matrix(data))
+    stop = n if stop is None else stop
+    depot = data['depot']
+    allowed = np.ones((stop - start, n), dtype=bool)
+    allowed[np.arange(stop - start), np.arange(start, stop)] = False
+    if 'demands' in data:
+        demands = np.asarray(data['demands'], dtype=np.int64)
+        pair = demands[start:stop, None] + demands[None, :] > max(data['vehicle_capacities'])
+        pair[:, depot] = False
+        if start <= depot < stop:
+            pair[depot - start] = False
+        allowed &= ~pair
+    for node, successors in removed.items():
+        if start <= node < stop:
+            allowed[node - start, successors] = False
+    return allowed
+
+
+def degree_bound(costs, data, removed, vehicles):
+    """Cheapest way to leave, or to enter, every customer once with at least
+    `vehicles` customers going to, or coming from, the depot."""
+    n = len(costs)
+    depot = data['depot']
+    cheapest_out = np.empty(n, dtype=np.int64)
+    cheapest_in = np.full(n, np.iinfo(np.int64).max)
+    rows = max(1, CHUNK_CELLS // n)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        block = np.where(allowed_arcs(data, removed, start, stop),
+                         np.asarray(costs[start:stop], dtype=np.int64),
+                         np.iinfo(np.int64).max)
+        cheapest_out[start:stop] = block.min(axis=1)
+        np.minimum(cheapest_in, block.min(axis=0), out=cheapest_in)
+    customers = np.delete(np.arange(n), depot)
+    bounds = []
+    for cheapest, to_depot in ((cheapest_out, costs[customers, depot]),
+                               (cheapest_in, costs[depot, customers])):
+        # Customers linked to the depot pay that arc instead of their cheapest.
+        extra = np.sort(np.asarray(to_depot, dtype=np.int64) - cheapest[customers])
+        bounds.append(int(cheapest[customers].sum() + extra[:vehicles].sum()))
+    return max(bounds)
+
+
+def assignment_bound(costs, allowed, depot, vehicles, num_vehicles):
+    """Optimal assignment of a successor to every customer and depot copy.
+
+    Returns None when the assignment is infeasible.
+    """
+    n = len(costs)
+    customers = np.delete(np.arange(n), depot)
+    c, m = len(customers), min(num_vehicles, n - 1)
+    matrix = np.full((c + m, c + m), np.inf)
+    block = np.asarray(costs, dtype=np.float64)[np.ix_(customers, customers)]
+    matrix[:c, :c] = np.where(allowed[np.ix_(customers, customers)], block, np.inf)
+    matrix[:c, c:] = np.asarray(costs[customers, depot], dtype=np.float64)[:, None]
+    matrix[c:, :c] = np.asarray(costs[depot, customers], dtype=np.float64)[None, :]
+    # A depot copy past the minimum vehicle count maps to itself when unused.
+    unused = np.arange(c + min(vehicles, m), c + m)
+    matrix[unused, unused] = 0
+    try:
+        rows, cols = linear_sum_assignment(matrix)
+    except ValueError:
+        return None
+    return int(round(matrix[rows, cols].sum()))
+
+
+def lp_bound(costs, allowed, data, vehicles, rounds=LP_ROUNDS):
+    """LP relaxation with rounded capacity cuts; None if it is infeasible."""
+    n = len(costs)
+    depot = data['depot']
+    demands = np.asarray(data.get('demands', np.zeros(n)), dtype=np.int64)
+    capacity = max(data.get('vehicle_capacities', [max(1, int(demands.sum()))]))
+    tails, heads = np.nonzero(allowed)
+    arcs = np.arange(len(tails))
+    objective = np.asarray(costs, dtype=np.float64)[tails, heads]
+    customers = np.delete(np.arange(n), depot)
+    row = np.full(n, -1)
+    row[customers] = np.arange(len(customers))
+    # Every customer is left once and entered once.
+    leaving, entering = tails != depot, heads != depot
+    equalities = coo_matrix(
+        (np.ones(leaving.sum() + entering.sum()),
+         (np.concatenate([row[tails[leaving]], len(customers) + row[heads[entering]]]),
+          np.concatenate([arcs[leaving], arcs[entering]]))),
+        shape=(2 * len(customers), len(arcs))).tocsr()
+    # Between `vehicles` and num_vehicles routes leave the depot.
+    depot_out = (tails == depot).astype(np.float64)
+    cuts = [-depot_out, depot_out]
+    limits = [-vehicles, data['num_vehicles']]
+    for _ in range(rounds):
+        result = linprog(objective, A_ub=np.vstack(cuts), b_ub=limits,
+                         A_eq=equalities, b_eq=np.ones(2 * len(customers)),
+                         bounds=(0, 1), method='highs')
+        if result.status != 0:
+            return None
+        x = result.x
+        support = (x > 1e-6) & leaving & entering
+        graph = coo_matrix((x[support], (row[tails[support]], row[heads[support]])),
+                           shape=(len(customers), len(customers)))
+        count, labels = connected_components(graph, directed=True, connection='weak')
+        component = np.full(n, -1)
+        component[customers] = labels
+        added = 0
+        for label in range(count):
+            members = component == label
+            crossing = members[tails] & ~members[heads]
+            needed = max(1, math.ceil(demands[members].sum() / capacity))
+            if x[crossing].sum() < needed - 1e-6:
+                cuts.append(-crossing.astype(np.float64))
+                limits.append(-needed)
+                added += 1
+        if not added:
+            break
+    return math.ceil(result.fun - 1e-6)
+
+
+def lower_bound(data, max_waiting=None, horizon=None, span_cost=0,
+                lp_nodes=LP_NODES):
+    """Returns {'bound', 'vehicles', 'degree', 'assignment', 'lp', 'span'}.
+
+    'bound' bounds the objective from below: the best of the arc cost
+    bounds, plus `span_cost` times a bound on the longest route when the
+    model has a global span cost on the arc costs. Bounds that were skipped
+    (too large, or scipy missing) are None.
+    """
+    costs = np.asarray(cost_matrix(data))
+    depot = data['depot']
+    n = len(costs)
+    vehicles = minimum_vehicles(data)
+    removed = removed_arcs(data, max_waiting, horizon)
+    result = {'vehicles': vehicles, 'assignment': None, 'lp': None, 'span': None}
+    result['degree'] = degree_bound(costs, data, removed, vehicles)
+    small = n - 1 + min(data['num_vehicles'], n - 1) <= ASSIGNMENT_NODES
+    if linear_sum_assignment is not None and small:
+        allowed = allowed_arcs(data, removed)
+        result['assignment'] = assignment_bound(costs, allowed, depot, vehicles,
+                                                data['num_vehicles'])
+        if n - 1 <= lp_nodes:
+            result['lp'] = lp_bound(costs, allowed, data, vehicles)
+    arc_cost = max(result[key] for key in ('degree', 'assignment', 'lp')
+                   if result[key] is not None)
+    result['bound'] = arc_cost
+    if span_cost:
+        # The longest route reaches the farthest customer and back, and is at
+        # least the average route.
+        round_trip = shortest_from(costs, depot) + shortest_to(costs, depot)
+        result['span'] = max(int(round_trip.max()),
+                             math.ceil(arc_cost / data['num_vehicles']))
+        result['bound'] = arc_cost + span_cost * result['span']
+    return result
+
+
+def optimality_gap(objective, bound):
+    """Relative gap (objective - bound) / objective, in percent."""
+    return 100 * (objective - bound) / objective if objective else 0.0
+
+
+def format_gap(objective, bound):
+    return f"lower bound {bound}, gap {optimality_gap(objective, bound):.2f}%"
+
+
+def variant_bound(module, data, lp_nodes=LP_NODES):
+    """lower_bound with a solver module's waiting limit, horizon and span cost."""
+    return lower_bound(data,
+                       data.get('max_waiting', getattr(module, 'MAX_WAITING', None)),
+                       data.get('horizon', getattr(module, 'HORIZON', None)),
+                       getattr(module, 'SPAN_COST', 0), lp_nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('variant', choices=VARIANTS)
+    parser.add_argument('--lp-nodes', type=int, default=LP_NODES,
+                        help='largest instance the LP bound is computed for')
+    args = parser.parse_args()
+
+    module = load_variant(args.variant)
+    data = module.create_data_model()
+    start = time.perf_counter()
+    result = variant_bound(module, data, args.lp_nodes)
+    elapsed = 1000 * (time.perf_counter() - start)
+    for key in ('vehicles', 'degree', 'assignment', 'lp', 'span'):
+        if result[key] is not None:
+            print(f"{key:>10}: {result[key]}")
+    print(f"Lower bound: {result['bound']} ({elapsed:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
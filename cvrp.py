@@ -1,16 +1,22 @@
 #! /usr/bin/env python3
 """Capacited Vehicles Routing Problem (CVRP)."""
 
+import sys
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 from route_matrices import LOCATION
+from matrix_store import load_matrix
+from profiler import enable_profiling, stage
+from routing_model import (objective_line, register_transit_matrix,
+                           register_unary_vector, solve_and_report,
+                           solver_arg_parser)
+from solution_extract import extract_solution
 
 def create_data_model():
     """Stores the data for the problem."""
     data = {}
-    with open("distance_matrix.txt") as f:
-        data["distance_matrix"] = [
-            [int(num) for num in line.split('\t')] for line in f.readlines()]
+    data["distance_matrix"] = load_matrix("distance_matrix")
     data["demands"] = [0, 12, 10, 20, 12, 15, 13, 18, 15, 12, 14, 16, 12, 13, 12, 11, 20]
     data["vehicle_capacities"] = [15, 35, 10, 25, 25, 40, 25, 25, 20, 30]
     data["num_vehicles"] = 10
@@ -18,40 +24,31 @@ def create_data_model():
     return data
 
 
-def print_solution(data, manager, routing, solution):
+def print_solution(data, manager, routing, solution, result=None, bound=None):
     """Prints solution on console."""
-    print(f"Objective: {solution.ObjectiveValue()}")
+    if result is None:
+        result = extract_solution(data, manager, routing, solution)
+    print(objective_line(result["objective"], bound))
     total_distance = 0
     total_load = 0
-    for vehicle_id in range(data["num_vehicles"]):
-        index = routing.Start(vehicle_id)
-        plan_output = f"Route for vehicle {vehicle_id}:\n"
-        route_distance = 0
-        route_load = 0
-        while not routing.IsEnd(index):
-            node_index = manager.IndexToNode(index)
-            route_load += data["demands"][node_index]
-            plan_output += f"{LOCATION[node_index]} Load({route_load}) -> "
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
-            route_distance += routing.GetArcCostForVehicle(
-                previous_index, index, vehicle_id
-            )
-        plan_output += f" {LOCATION[manager.IndexToNode(index)]} ({route_load})\n"
-        plan_output += f"Distance of the route: {route_distance}m\n"
-        plan_output += f"Load of the route: {route_load}\n"
-        print(plan_output)
+    for route in result["routes"]:
+        nodes, load = route["nodes"], route["load"]
+        stops = "".join(f"{LOCATION[node]} Load({node_load}) -> "
+                        for node, node_load in zip(nodes[:-1], load[:-1]))
+        route_distance = int(route["arc_cost"].sum())
+        route_load = int(load[-2])
+        print(f"Route for vehicle {route['vehicle']}:\n"
+              f"{stops} {LOCATION[nodes[-1]]} ({route_load})\n"
+              f"Distance of the route: {route_distance}m\n"
+              f"Load of the route: {route_load}\n")
         total_distance += route_distance
         total_load += route_load
     print(f"Total distance of all routes: {total_distance}m")
     print(f"Total load of all routes: {total_load}")
 
 
-def main():
-    """Solve the CVRP problem."""
-    # Instantiate the data problem.
-    data = create_data_model()
-
+def build_model(data):
+    """Builds the routing index manager and routing model."""
     # Create the routing index manager.
     manager = pywrapcp.RoutingIndexManager(
         len(data["distance_matrix"]), data["num_vehicles"], data["depot"]
@@ -60,36 +57,30 @@ def main():
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    # Create and register a transit callback.
-    def distance_callback(from_index, to_index):
-        """Returns the distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["distance_matrix"][from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
-
-    # Define cost of each arc.
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-
-    # Add Capacity constraint.
-    def demand_callback(from_index):
-        """Returns the demand of the node."""
-        # Convert from routing variable Index to demands NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        return data["demands"][from_node]
-
-    demand_callback_index = routing.RegisterUnaryTransitCallback(
-        demand_callback)
-    routing.AddDimensionWithVehicleCapacity(
-        demand_callback_index,
-        0,  # null capacity slack
-        data["vehicle_capacities"],  # vehicle maximum capacities
-        True,  # start cumul to zero
-        "Capacity",
-    )
+    with stage("distance transit"):
+        # Register the distance matrix as a transit evaluated natively.
+        transit_callback_index = register_transit_matrix(
+            routing, data["distance_matrix"])
+
+        # Define cost of each arc.
+        routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
+    with stage("capacity"):
+        # Add Capacity constraint.
+        demand_callback_index = register_unary_vector(routing, data["demands"])
+        routing.AddDimensionWithVehicleCapacity(
+            demand_callback_index,
+            0,  # null capacity slack
+            data["vehicle_capacities"],  # vehicle maximum capacities
+            True,  # start cumul to zero
+            "Capacity",
+        )
+
+    return manager, routing
+
+
+def create_search_parameters():
+    """Returns the search parameters used to solve the problem."""
     # Setting first solution heuristic.
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
     search_parameters.time_limit.seconds = 50
@@ -97,15 +88,24 @@ def main():
     search_parameters.first_solution_strategy = (
         routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
     )
+    return search_parameters
 
-    # Solve the problem.
-    solution = routing.SolveWithParameters(search_parameters)
 
-    # Print solution on console.
-    if solution:
-        print_solution(data, manager, routing, solution)
-    else:
-        print("No Soln")
+def main(argv=None):
+    """Solve the CVRP problem."""
+    args = solver_arg_parser(__doc__).parse_args(argv)
+    profiler = enable_profiling() if args.profile else None
+    # Instantiate the data problem.
+    with stage("matrix load"):
+        data = create_data_model()
+
+    with stage("model build"):
+        manager, routing = build_model(data)
+    # Solve the problem, then print and save the solution as asked.
+    solve_and_report(sys.modules[__name__], args, data, manager, routing,
+                     create_search_parameters())
+    if profiler:
+        profiler.write(args.profile)
 
 
 if __name__ == "__main__":
@@ -1,17 +1,29 @@
 #! /usr/bin/env python
+import sys
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 from route_matrices import LOCATION
+from matrix_store import load_matrix
+from profiler import enable_profiling, stage
+from presolve import InfeasibleInstance, presolve, remove_arcs
+from routing_model import (objective_line, register_transit_matrix,
+                           register_unary_vector, solve_and_report,
+                           solver_arg_parser)
+from solution_extract import extract_solution
+from time_slices import anchored_time_matrix, load_time_slices
+
+# Default time dimension limits, unless the instance sets its own.
+MAX_WAITING = 1500  # longest wait at a location
+HORIZON = 2500  # latest return to the depot
 
 
 def create_data_model():
     """Stores the data for the problem."""
     data = {}
 
-    # Read time matrix from file
-    with open("time_matrix.txt", "r") as f:
-        data["time_matrix"] = [
-            [int(num) for num in line.split("\t")] for line in f.readlines()]
+    # Read time matrix from the shared matrix store
+    data['time_matrix'] = load_matrix('time_matrix')
 
     # Time windows for each location
     data['time_windows'] = [
@@ -34,6 +46,14 @@ def create_data_model():
         (400, 1000),  # 16
     ]
 
+    # With time-dependent travel times, each location's row is taken from
+    # the time slice in which its window opens.
+    time_slices = load_time_slices('time_matrix')
+    if time_slices is not None:
+        slices, slice_length = time_slices
+        data['time_matrix'] = anchored_time_matrix(
+            slices, slice_length, [early for early, _ in data['time_windows']])
+
     # Weights/demands for each node
     data['demands'] = [0, 4, 5, 9, 5, 5, 3,
                        3, 8, 4, 8, 1, 6, 3, 2, 7, 2]
@@ -49,7 +69,7 @@ def create_data_model():
     return data
 
 
-def print_solution(data, manager, routing, solution):
+def print_solution(data, manager, routing, solution, result=None, bound=None):
     """
     Prints the solution of the Capacitated Vehicle Routing Problem with Time Windows (CVRPTW) on the console.
 
@@ -58,144 +78,147 @@ def print_solution(data, manager, routing, solution):
         manager (ortools.constraint_solver.RoutingIndexManager): The index manager for the routing model.
         routing (ortools.constraint_solver.RoutingModel): The routing model.
         solution (ortools.constraint_solver.RoutingModel): The solution of the routing model.
+        result (dict, optional): The solution already extracted by extract_solution.
+        bound (int, optional): A lower bound on the objective, to print the optimality gap.
 
     Returns:
         None
     """
-    print(f'Objective: {solution.ObjectiveValue()}')
-
-    # Get the time dimension from the routing model
-    time_dimension = routing.GetDimensionOrDie('Time')
+    if result is None:
+        result = extract_solution(data, manager, routing, solution)
+    print(objective_line(result['objective'], bound))
 
     total_time = 0
 
-    # Iterate over each vehicle
-    for vehicle_id in range(data['num_vehicles']):
-        index = routing.Start(vehicle_id)
-        plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-        route_load = 0
-
-        # Iterate over each node in the route
-        while not routing.IsEnd(index):
-            time_var = time_dimension.CumulVar(index)
-            node_index = manager.IndexToNode(index)
-            route_load += data['demands'][node_index]
-            plan_output += '{0} Time({1},{2}) Load({3}) -> '.format(
-                LOCATION[node_index], solution.Min(time_var),
-                solution.Max(time_var), route_load)
-            index = solution.Value(routing.NextVar(index))
-
-        # Get the details of the last node in the route
-        time_var = time_dimension.CumulVar(index)
-        node_index = manager.IndexToNode(index)
-        route_load += data['demands'][node_index]
-        plan_output += '{0} Time({1},{2}) Load({3})\n'.format(LOCATION[node_index],
-                                                              solution.Min(
-                                                                  time_var),
-                                                              solution.Max(
-                                                                  time_var),
-                                                              route_load)
-        plan_output += 'Time of the route: {}min\n'.format(
-            solution.Min(time_var))
-        plan_output += 'Load of the route: {}\n'.format(route_load)
-        print(plan_output)
-        total_time += solution.Min(time_var)
+    # Format each vehicle's route from the extracted arrays
+    for route in result['routes']:
+        stops = ' -> '.join(
+            '{0} Time({1},{2}) Load({3})'.format(LOCATION[node], early, late, load)
+            for node, early, late, load in zip(
+                route['nodes'], route['arrival_min'], route['arrival_max'],
+                route['load']))
+        route_time = int(route['arrival_min'][-1])
+        print('Route for vehicle {}:\n{}\n'
+              'Time of the route: {}min\n'
+              'Load of the route: {}\n'.format(route['vehicle'], stops,
+                                                 route_time, route['load'][-1]))
+        total_time += route_time
 
     print('Total time of all routes: {}min'.format(total_time))
 
 
-"""Solve the VRP with time windows."""
-# Instantiate the data problem.
-data = create_data_model()
-
-# Create the routing index manager
-# The inputs to RoutingIndexManager are:
-#   The number of locations (including the depot)
-#   The number of vehicles in the problem
-#   The node corresponding to the depot
-manager = pywrapcp.RoutingIndexManager(
-    len(data['time_matrix']), data['num_vehicles'], data['depot'])
-
-# Create Routing Model.
-routing = pywrapcp.RoutingModel(manager)
-
-# Create and register a transit callback.
-
-
-def time_callback(from_index, to_index):
-    """Returns the travel time between the two nodes."""
-    # Convert from routing variable Index to time matrix NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['time_matrix'][from_node][to_node]
-
-
-transit_callback_index = routing.RegisterTransitCallback(time_callback)
-
-# Define cost of each arc.
-routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-
-# Add Time Windows constraint.
-time = 'Time'
-routing.AddDimension(
-    transit_callback_index,
-    1500,  # allow waiting time (1440 as it means the whole day in minutes)
-    2500,  # maximum time per vehicle (all times are assumed to be in minutes)
-    False,  # Don't force start cumul to zero.
-    time)
-time_dimension = routing.GetDimensionOrDie(time)
-
-# Add time window constraints for each location except depot.
-for location_idx, time_window in enumerate(data['time_windows']):
-    if location_idx == data['depot']:
-        continue
-    index = manager.NodeToIndex(location_idx)
-    time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
-
-# Add time window constraints for each vehicle start node.
-depot_idx = data['depot']
-for vehicle_id in range(data['num_vehicles']):
-    index = routing.Start(vehicle_id)
-    time_dimension.CumulVar(index).SetRange(
-        data['time_windows'][depot_idx][0],
-        data['time_windows'][depot_idx][1])
-
-# Instantiate route start and end times to produce feasible times.
-for i in range(data['num_vehicles']):
-    routing.AddVariableMinimizedByFinalizer(
-        time_dimension.CumulVar(routing.Start(i)))
-    routing.AddVariableMinimizedByFinalizer(
-        time_dimension.CumulVar(routing.End(i)))
-
-# Add Capacity constraint.
-
-
-def demand_callback(from_index):
-    """Returns the demand of the node."""
-    # Convert from routing variable Index to demands NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    return data['demands'][from_node]
-
-
-demand_callback_index = routing.RegisterUnaryTransitCallback(
-    demand_callback)
-routing.AddDimensionWithVehicleCapacity(
-    demand_callback_index,
-    0,  # null capacity slack
-    data['vehicle_capacities'],  # vehicle maximum capacities
-    True,  # start cumul to zero
-    'Capacity')
-
-# Setting first solution heuristic.
-search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-search_parameters.first_solution_strategy = (
-    routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION)
-
-# Solve the problem.
-solution = routing.SolveWithParameters(search_parameters)
-
-# Print solution on console.
-if solution:
-    print_solution(data, manager, routing, solution)
-else:
-    print("No solution found !")
+def build_model(data):
+    """Builds the routing index manager and routing model."""
+    # Create the routing index manager
+    # The inputs to RoutingIndexManager are:
+    #   The number of locations (including the depot)
+    #   The number of vehicles in the problem
+    #   The node corresponding to the depot
+    manager = pywrapcp.RoutingIndexManager(
+        len(data['time_matrix']), data['num_vehicles'], data['depot'])
+
+    # Create Routing Model.
+    routing = pywrapcp.RoutingModel(manager)
+
+    with stage('presolve'):
+        # Presolve: tighten the time windows and drop the arcs no feasible
+        # route can use. Raises InfeasibleInstance when the instance has no
+        # solution.
+        max_waiting = data.get('max_waiting', MAX_WAITING)
+        horizon = data.get('horizon', HORIZON)
+        windows, arcs = presolve(data, max_waiting, horizon)
+        remove_arcs(manager, routing, arcs)
+
+    with stage('time dimension'):
+        # Register the time matrix as a transit evaluated natively.
+        transit_callback_index = register_transit_matrix(routing, data['time_matrix'])
+
+        # Define cost of each arc: travel time, or distance when the instance
+        # provides a separate distance matrix.
+        if 'distance_matrix' in data:
+            routing.SetArcCostEvaluatorOfAllVehicles(
+                register_transit_matrix(routing, data['distance_matrix']))
+        else:
+            routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+        # Add Time Windows constraint.
+        time = 'Time'
+        routing.AddDimension(
+            transit_callback_index,
+            # allow waiting time (1440 as it means the whole day in minutes)
+            max_waiting,
+            # maximum time per vehicle (all times are assumed to be in minutes)
+            horizon,
+            False,  # Don't force start cumul to zero.
+            time)
+        time_dimension = routing.GetDimensionOrDie(time)
+
+    with stage('time windows'):
+        # Add the presolved time window constraints for each location except depot.
+        for location_idx, time_window in enumerate(windows):
+            if location_idx == data['depot']:
+                continue
+            index = manager.NodeToIndex(location_idx)
+            time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
+
+        # Add time window constraints for each vehicle start node.
+        depot_idx = data['depot']
+        for vehicle_id in range(data['num_vehicles']):
+            index = routing.Start(vehicle_id)
+            time_dimension.CumulVar(index).SetRange(
+                data['time_windows'][depot_idx][0],
+                data['time_windows'][depot_idx][1])
+
+        # Instantiate route start and end times to produce feasible times.
+        for i in range(data['num_vehicles']):
+            routing.AddVariableMinimizedByFinalizer(
+                time_dimension.CumulVar(routing.Start(i)))
+            routing.AddVariableMinimizedByFinalizer(
+                time_dimension.CumulVar(routing.End(i)))
+
+    with stage('capacity'):
+        # Add Capacity constraint.
+        demand_callback_index = register_unary_vector(routing, data['demands'])
+        routing.AddDimensionWithVehicleCapacity(
+            demand_callback_index,
+            0,  # null capacity slack
+            data['vehicle_capacities'],  # vehicle maximum capacities
+            True,  # start cumul to zero
+            'Capacity')
+
+    return manager, routing
+
+
+def create_search_parameters():
+    """Returns the search parameters used to solve the problem."""
+    # Setting first solution heuristic.
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION)
+    return search_parameters
+
+
+def main(argv=None):
+    """Solve the VRP with time windows."""
+    args = solver_arg_parser(
+        'Capacitated Vehicle Routing Problem with Time Windows (CVRPTW).').parse_args(argv)
+    profiler = enable_profiling() if args.profile else None
+    # Instantiate the data problem.
+    with stage('matrix load'):
+        data = create_data_model()
+
+    try:
+        with stage('model build'):
+            manager, routing = build_model(data)
+    except InfeasibleInstance as e:
+        print(f'No solution found ! The instance is infeasible:\n{e}')
+        return
+    # Solve the problem, then print and save the solution as asked.
+    solve_and_report(sys.modules[__name__], args, data, manager, routing,
+                     create_search_parameters())
+    if profiler:
+        profiler.write(args.profile)
+
+
+if __name__ == '__main__':
+    main()
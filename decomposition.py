@@ -0,0 +1,290 @@
+#! /usr/bin/env python3
+"""Cluster-first, route-second decomposition for very large instances.
+
+Customers are partitioned into clusters (sweep or k-means on coordinates,
+optionally weighted by time-window midpoints, or k-medoids on the time
+matrix when there are no coordinates). Vehicles are shared out in
+proportion to cluster demand, every cluster is solved as its own routing
+model in a worker process, and the routes are stitched into one plan.
+A boundary repair pass then pairs up neighbouring clusters and re-solves
+each pair warm-started from the stitched routes, so customers near a
+cluster border can move to the better route.
+
+    ./decomposition.py generated/instances.jsonl --clusters 16 --time-limit 30
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_solve import load_instance_data
+from presolve import InfeasibleInstance
+from routing_model import cost_matrix, get_routes, load_variant, solve_model
+
+METHODS = ('sweep', 'kmeans', 'medoids')
+
+
+def sweep_clusters(data, num_clusters):
+    """Splits customers into angular sectors around the depot of equal demand."""
+    points = np.asarray(data['coordinates'], dtype=float)
+    customers = np.array([n for n in range(len(points)) if n != data['depot']])
+    offsets = points[customers] - points[data['depot']]
+    order = customers[np.argsort(np.arctan2(offsets[:, 1], offsets[:, 0]))]
+    demands = np.asarray(data.get('demands', np.ones(len(points))), dtype=float)
+    cumulative = np.cumsum(demands[order] + 1e-9)
+    labels = np.minimum((cumulative / cumulative[-1] * num_clusters).astype(int),
+                        num_clusters - 1)
+    return [order[labels == k] for k in range(num_clusters) if np.any(labels == k)]
+
+
+def kmeans_clusters(data, num_clusters, window_weight=0.0, iterations=50, seed=0):
+    """Lloyd's k-means on coordinates, plus the scaled window midpoint."""
+    points = np.asarray(data['coordinates'], dtype=float)
+    customers = np.array([n for n in range(len(points)) if n != data['depot']])
+    features = points[customers]
+    if window_weight and 'time_windows' in data:
+        windows = np.asarray(data['time_windows'], dtype=float)[customers]
+        midpoints = windows.mean(axis=1)
+        spread = features.std() / max(midpoints.std(), 1e-9)
+        features = np.column_stack((features, window_weight * spread * midpoints))
+    rng = np.random.default_rng(seed)
+    centers = features[rng.choice(len(features), num_clusters, replace=False)]
+    for _ in range(iterations):
+        distances = ((features[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        moved = np.array([features[labels == k].mean(axis=0) if np.any(labels == k)
+                          else centers[k] for k in range(num_clusters)])
+        if np.allclose(moved, centers):
+            break
+        centers = moved
+    return [customers[labels == k] for k in range(num_clusters) if np.any(labels == k)]
+
+
+def medoid_clusters(data, num_clusters, iterations=20, seed=0):
+    """k-medoids on the symmetrized time matrix, for instances without coordinates."""
+    matrix = np.asarray(data['time_matrix'], dtype=float)
+    customers = np.array([n for n in range(len(matrix)) if n != data['depot']])
+    travel = matrix[np.ix_(customers, customers)]
+    travel = travel + travel.T
+    rng = np.random.default_rng(seed)
+    medoids = rng.choice(len(customers), num_clusters, replace=False)
+    for _ in range(iterations):
+        labels = travel[:, medoids].argmin(axis=1)
+        updated = medoids.copy()
+        for k in range(num_clusters):
+            members = np.flatnonzero(labels == k)
+            if len(members):
+                updated[k] = members[travel[np.ix_(members, members)].sum(axis=1).argmin()]
+        if np.array_equal(updated, medoids):
+            break
+        medoids = updated
+    labels = travel[:, medoids].argmin(axis=1)
+    return [customers[labels == k] for k in range(num_clusters) if np.any(labels == k)]
+
+
+def make_clusters(data, num_clusters, method='sweep', window_weight=0.0):
+    """Partitions the customers into at most `num_clusters` clusters.
+
+    There are never more clusters than customers, nor than vehicles, so
+    every cluster can be given a vehicle.
+    """
+    num_customers = len(cost_matrix(data)) - 1
+    num_clusters = max(1, min(num_clusters, num_customers, data['num_vehicles']))
+    if 'coordinates' not in data:
+        method = 'medoids'
+    if method == 'sweep':
+        return sweep_clusters(data, num_clusters)
+    if method == 'kmeans':
+        return kmeans_clusters(data, num_clusters, window_weight)
+    return medoid_clusters(data, num_clusters)
+
+
+def allocate_vehicles(data, clusters):
+    """Assigns vehicles to clusters in proportion to cluster demand.
+
+    Vehicles go largest first: one to each cluster, most demanding cluster
+    first, then each to the cluster whose demand is least covered. Raises
+    ValueError when there are more clusters than vehicles.
+    """
+    if len(clusters) > data['num_vehicles']:
+        raise ValueError(f"{len(clusters)} clusters but only "
+                         f"{data['num_vehicles']} vehicles")
+    demands = np.asarray(data.get('demands', np.ones(len(cost_matrix(data)))))
+    capacities = data.get('vehicle_capacities', [1] * data['num_vehicles'])
+    needed = np.array([demands[c].sum() for c in clusters], dtype=float)
+    covered = np.zeros(len(clusters))
+    allocation = [[] for _ in clusters]
+    for rank, vehicle_id in enumerate(np.argsort(capacities)[::-1]):
+        if rank < len(clusters):
+            served = np.array([len(vehicles) > 0 for vehicles in allocation])
+            k = int(np.argmax(np.where(served, -np.inf, needed)))
+        else:
+            k = int(np.argmin(covered / np.maximum(needed, 1)))
+        allocation[k].append(int(vehicle_id))
+        covered[k] += capacities[vehicle_id]
+    return allocation
+
+
+def subproblem(data, nodes, vehicles):
+    """Restricts an instance to `nodes` (depot first) and `vehicles`."""
+    nodes = [int(n) for n in nodes]
+    sub = {key: value for key, value in data.items()
+           if key in ('horizon', 'max_waiting', 'scale')}
+    for key in ('distance_matrix', 'time_matrix'):
+        if key in data:
+            sub[key] = np.asarray(data[key])[np.ix_(nodes, nodes)]
+    for key in ('time_windows', 'demands'):
+        if key in data:
+            sub[key] = [data[key][n] for n in nodes]
+    if 'vehicle_capacities' in data:
+        sub['vehicle_capacities'] = [data['vehicle_capacities'][v] for v in vehicles]
+    sub['num_vehicles'] = len(vehicles)
+    sub['depot'] = 0
+    sub['location_ids'] = nodes
+    return sub
+
+
+def solve_subproblem(variant, sub, time_limit, plan=None):
+    """Solves one cluster; returns routes in the parent's node IDs."""
+    module = load_variant(variant)
+    try:
+        manager, routing = module.build_model(sub)
+    except InfeasibleInstance:
+        return None
+    search_parameters = module.create_search_parameters()
+    search_parameters.time_limit.seconds = time_limit
+    solution = solve_model(sub, manager, routing, search_parameters, plan)
+    if not solution:
+        return None
+    nodes = sub['location_ids']
+    return [[nodes[n] for n in route]
+            for route in get_routes(manager, routing, solution)]
+
+
+def plan_cost(data, routes):
+    """Total arc cost of depot-to-depot routes."""
+    costs = cost_matrix(data)
+    depot = data['depot']
+    total = 0
+    for route in routes:
+        stops = [depot] + list(route) + [depot]
+        total += sum(int(costs[a][b]) for a, b in zip(stops, stops[1:]))
+    return total
+
+
+def pair_neighbours(clusters, data):
+    """Greedily pairs every cluster with its nearest unpaired cluster."""
+    if 'coordinates' in data:
+        points = np.asarray(data['coordinates'], dtype=float)
+        centers = np.array([points[c].mean(axis=0) for c in clusters])
+        gaps = np.sqrt(((centers[:, None] - centers[None, :]) ** 2).sum(axis=2))
+    else:
+        matrix = np.asarray(data['time_matrix'], dtype=float)
+        gaps = np.array([[matrix[np.ix_(a, b)].mean() for b in clusters]
+                         for a in clusters])
+    np.fill_diagonal(gaps, np.inf)
+    unpaired = set(range(len(clusters)))
+    pairs = []
+    for a in np.argsort(gaps.min(axis=1)):
+        if a not in unpaired:
+            continue
+        unpaired.discard(a)
+        if not unpaired:
+            break
+        b = min(unpaired, key=lambda b: gaps[a, b])
+        unpaired.discard(b)
+        pairs.append((int(a), int(b)))
+    return pairs
+
+
+def solve_decomposed(variant, data, num_clusters, method='sweep', time_limit=30,
+                     repair_time_limit=None, window_weight=0.0, workers=None):
+    """Solves `data` by clusters and returns a result dict.
+
+    The result holds the routes per vehicle, the total arc cost, the nodes
+    left unserved by failed clusters and the wall time of each phase.
+    """
+    workers = workers or os.cpu_count()
+    repair_time_limit = repair_time_limit or max(1, time_limit // 2)
+    start = time.perf_counter()
+    clusters = make_clusters(data, num_clusters, method, window_weight)
+    allocation = allocate_vehicles(data, clusters)
+    depot = data['depot']
+    subs = [subproblem(data, [depot] + list(c), vehicles)
+            for c, vehicles in zip(clusters, allocation)]
+    routes = [[] for _ in range(data['num_vehicles'])]
+    unserved = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        solved = list(pool.map(solve_subproblem, [variant] * len(subs), subs,
+                               [time_limit] * len(subs)))
+        for cluster, vehicles, sub_routes in zip(clusters, allocation, solved):
+            if sub_routes is None:
+                unserved.extend(int(n) for n in cluster)
+                continue
+            for vehicle_id, route in zip(vehicles, sub_routes):
+                routes[vehicle_id] = route
+        solve_seconds = time.perf_counter() - start
+        stitched_cost = plan_cost(data, routes)
+
+        # Boundary repair: re-solve disjoint pairs of neighbouring clusters.
+        pairs = [(a, b) for a, b in pair_neighbours(clusters, data)
+                 if solved[a] is not None and solved[b] is not None]
+        jobs = []
+        for a, b in pairs:
+            vehicles = allocation[a] + allocation[b]
+            nodes = [depot] + list(clusters[a]) + list(clusters[b])
+            plan = [routes[v] for v in vehicles]
+            jobs.append((vehicles, subproblem(data, nodes, vehicles), plan))
+        repaired = pool.map(solve_subproblem, [variant] * len(jobs),
+                            [job[1] for job in jobs],
+                            [repair_time_limit] * len(jobs),
+                            [job[2] for job in jobs])
+        for (vehicles, sub, plan), new_routes in zip(jobs, repaired):
+            if new_routes is not None and plan_cost(data, new_routes) < plan_cost(data, plan):
+                for vehicle_id, route in zip(vehicles, new_routes):
+                    routes[vehicle_id] = route
+    return {
+        'routes': routes,
+        'cost': plan_cost(data, routes),
+        'stitched_cost': stitched_cost,
+        'unserved': unserved,
+        'clusters': len(clusters),
+        'solve_seconds': round(solve_seconds, 3),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('instances', help="batch JSONL file, '-' for stdin")
+    parser.add_argument('--clusters', type=int, default=8)
+    parser.add_argument('--method', choices=METHODS, default='sweep')
+    parser.add_argument('--window-weight', type=float, default=0.0,
+                        help='k-means weight of the time-window midpoint')
+    parser.add_argument('--time-limit', type=int, default=30,
+                        help='per-cluster time limit in seconds')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    source = sys.stdin if args.instances == '-' else open(args.instances)
+    with source:
+        for line in source:
+            if not line.strip():
+                continue
+            instance = json.loads(line)
+            data = load_instance_data(instance['data'])
+            result = solve_decomposed(instance['variant'], data, args.clusters,
+                                      args.method, args.time_limit,
+                                      window_weight=args.window_weight,
+                                      workers=args.workers)
+            result['id'] = instance.get('id')
+            print(json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
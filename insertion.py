@@ -0,0 +1,219 @@
+#! /usr/bin/env python3
+"""Incremental order insertion into a live plan.
+
+A LivePlan keeps the current CVRPTW plan in array form: per route the stop
+sequence (depots included), the earliest arrival at every stop, the latest
+arrival that keeps every later stop in its window, and the load prefix
+sums. A new order is answered without a re-solve: every insertion position
+of every route is checked against windows, capacities and waiting in one
+vectorized pass, the cheapest feasible one is applied, and only the
+affected arrivals and latest times of that route are propagated.
+
+Vehicles leave the depot when it opens, except that an order inserted as
+a route's first stop may leave later instead of waiting. Waiting is bounded
+at the inserted stop and its successor only.
+
+    ./cvrptw.py --save-plan plan.json
+    ./insertion.py cvrptw plan.json 7 12 --save-plan updated.json
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from routing_model import cost_matrix, load_variant, read_plan, write_plan
+
+Insertion = namedtuple('Insertion', 'vehicle position delta arrival')
+
+
+class LivePlan:
+    """A plan that accepts new orders by cheapest feasible insertion.
+
+    `routes` are node sequences without depots, one per vehicle, as returned
+    by routing_model.get_routes. Without `max_waiting` and `horizon` the
+    instance's values are used, and neither is bounded if the instance has
+    none.
+    """
+
+    def __init__(self, data, routes, max_waiting=None, horizon=None):
+        self.time = np.asarray(data['time_matrix'])
+        self.cost = np.asarray(cost_matrix(data))
+        self.windows = np.array(data['time_windows'], dtype=np.int64)
+        self.demands = np.array(data.get('demands', np.zeros(len(self.time))),
+                                dtype=np.int64)
+        self.capacities = np.array(
+            data.get('vehicle_capacities', [np.iinfo(np.int64).max] * data['num_vehicles']),
+            dtype=np.int64)
+        self.depot = data['depot']
+        self.max_waiting = (max_waiting if max_waiting is not None
+                            else data.get('max_waiting', np.iinfo(np.int64).max))
+        self.horizon = (horizon if horizon is not None
+                        else data.get('horizon', np.iinfo(np.int64).max // 2))
+        self.stops = []
+        self.arrival = []
+        self.latest = []
+        self.load = []
+        for vehicle_id in range(data['num_vehicles']):
+            route = routes[vehicle_id] if vehicle_id < len(routes) else []
+            stops = np.array([self.depot] + list(route) + [self.depot], dtype=np.int64)
+            self.stops.append(stops)
+            # Sentinels no propagated value can equal, so nothing stops early.
+            self.arrival.append(np.full(len(stops), -1, dtype=np.int64))
+            self.latest.append(np.full(len(stops), np.iinfo(np.int64).min))
+            self.forward(vehicle_id, 0)
+            self.backward(vehicle_id, len(stops) - 1)
+            self.load.append(np.cumsum(self.demands[stops]))
+        self.flatten()
+
+    @property
+    def routes(self):
+        return [stops[1:-1].tolist() for stops in self.stops]
+
+    def forward(self, vehicle_id, first):
+        """Recomputes earliest arrivals from stop `first` on, stopping as soon
+        as an arrival is unchanged."""
+        stops, arrival = self.stops[vehicle_id], self.arrival[vehicle_id]
+        if first == 0:
+            arrival[0] = self.windows[self.depot][0]
+            first = 1
+        for k in range(first, len(stops)):
+            value = max(arrival[k - 1] + self.time[stops[k - 1], stops[k]],
+                        self.windows[stops[k]][0])
+            if k > first and value == arrival[k]:
+                break
+            arrival[k] = value
+
+    def backward(self, vehicle_id, last):
+        """Recomputes latest arrivals from stop `last` back, stopping as soon
+        as a latest arrival is unchanged."""
+        stops, latest = self.stops[vehicle_id], self.latest[vehicle_id]
+        if last == len(stops) - 1:
+            latest[last] = self.horizon
+            last -= 1
+        for k in range(last, -1, -1):
+            value = min(latest[k + 1] - self.time[stops[k], stops[k + 1]],
+                        self.windows[stops[k]][1])
+            if k < last and value == latest[k]:
+                break
+            latest[k] = value
+
+    def flatten(self):
+        """Lays out every arc of every route as flat arrays for evaluation."""
+        self.arc_from = np.concatenate([stops[:-1] for stops in self.stops])
+        self.arc_to = np.concatenate([stops[1:] for stops in self.stops])
+        self.arc_vehicle = np.concatenate(
+            [np.full(len(stops) - 1, v) for v, stops in enumerate(self.stops)])
+        self.arc_position = np.concatenate(
+            [np.arange(len(stops) - 1) for stops in self.stops])
+        self.arc_departure = np.concatenate([a[:-1] for a in self.arrival])
+        self.arc_latest = np.concatenate([latest[1:] for latest in self.latest])
+        self.route_load = np.array([load[-1] for load in self.load])
+
+    def best_insertion(self, node):
+        """Returns the cheapest feasible Insertion of node, or None.
+
+        `position` is the index in the depot-less route, `delta` the cost
+        increase and `arrival` the earliest arrival at the node.
+        """
+        early, late = self.windows[node]
+        travel_in = self.time[self.arc_from, node]
+        travel_out = self.time[node, self.arc_to]
+        reached = self.arc_departure + travel_in
+        arrival = np.maximum(reached, early)
+        # A new first stop is reached as late as the depot allows leaving.
+        first = self.arc_position == 0
+        reached[first] = np.minimum(
+            np.maximum(reached[first], early),
+            self.windows[self.depot][1] + travel_in[first])
+        reached_next = arrival + travel_out
+        next_early = self.windows[self.arc_to, 0]
+        feasible = ((arrival <= late)
+                    & (np.maximum(reached_next, next_early) <= self.arc_latest)
+                    & (arrival - reached <= self.max_waiting)
+                    & (next_early - reached_next <= self.max_waiting)
+                    & (self.route_load[self.arc_vehicle] + self.demands[node]
+                       <= self.capacities[self.arc_vehicle]))
+        if not feasible.any():
+            return None
+        delta = (self.cost[self.arc_from, node].astype(np.int64)
+                 + self.cost[node, self.arc_to] - self.cost[self.arc_from, self.arc_to])
+        delta = np.where(feasible, delta, np.iinfo(np.int64).max)
+        best = int(np.argmin(delta))
+        return Insertion(int(self.arc_vehicle[best]), int(self.arc_position[best]),
+                         int(delta[best]), int(arrival[best]))
+
+    def insert(self, node, vehicle_id, position):
+        """Inserts node at `position` of a vehicle's depot-less route and
+        updates that route's arrivals, latest arrivals and loads."""
+        k = position + 1
+        self.stops[vehicle_id] = np.insert(self.stops[vehicle_id], k, node)
+        self.arrival[vehicle_id] = np.insert(self.arrival[vehicle_id], k, 0)
+        self.latest[vehicle_id] = np.insert(self.latest[vehicle_id], k, 0)
+        load = self.load[vehicle_id]
+        self.load[vehicle_id] = np.insert(load + np.where(
+            np.arange(len(load)) >= k, self.demands[node], 0), k,
+            load[k - 1] + self.demands[node])
+        self.forward(vehicle_id, k)
+        self.backward(vehicle_id, k)
+        self.flatten()
+
+    def add_order(self, node, time_window=None, demand=None):
+        """Inserts a new order at its cheapest feasible position.
+
+        The node's time window and demand can be set for orders the instance
+        data does not know yet. Returns the Insertion applied, or None when
+        no route can take the order.
+        """
+        if time_window is not None:
+            self.windows[node] = time_window
+        if demand is not None:
+            self.demands[node] = demand
+        insertion = self.best_insertion(node)
+        if insertion is not None:
+            self.insert(node, insertion.vehicle, insertion.position)
+        return insertion
+
+    def etas(self, vehicle_id):
+        """Earliest arrival at every stop of a route, depots included."""
+        return list(zip(self.stops[vehicle_id].tolist(),
+                        self.arrival[vehicle_id].tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('variant', choices=('vrptw', 'cvrptw'))
+    parser.add_argument('plan', help='JSON plan written by --save-plan')
+    parser.add_argument('nodes', type=int, nargs='+', help='orders to insert')
+    parser.add_argument('--save-plan', metavar='PLAN',
+                        help='write the updated plan')
+    args = parser.parse_args()
+
+    module = load_variant(args.variant)
+    data = module.create_data_model()
+    plan = read_plan(args.plan)
+    inserted = {node for route in plan for node in route}
+    live = LivePlan(data, [[node for node in route if node not in args.nodes]
+                           for route in plan],
+                    data.get('max_waiting', module.MAX_WAITING),
+                    data.get('horizon', module.HORIZON))
+    for node in args.nodes:
+        if node in inserted:
+            print(f"Node {node} was in the plan: removed and re-inserted")
+        start = time.perf_counter()
+        insertion = live.add_order(node)
+        elapsed = 1000 * (time.perf_counter() - start)
+        if insertion is None:
+            print(f"Node {node}: no feasible insertion ({elapsed:.2f} ms)")
+            continue
+        print(f"Node {node}: vehicle {insertion.vehicle}, position "
+              f"{insertion.position}, cost +{insertion.delta} ({elapsed:.2f} ms)")
+        print("  ETAs: " + " -> ".join(
+            f"{stop}@{arrival}" for stop, arrival in live.etas(insertion.vehicle)))
+    if args.save_plan:
+        write_plan(args.save_plan, live.routes)
+
+
+if __name__ == '__main__':
+    main()
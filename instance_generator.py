@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+"""Reproducible synthetic CVRPTW instances for scaling tests.
+
+Instances are written in the batch solver's JSONL format, with the travel
+matrices stored as binary matrix files next to it, so every solver and
+benchmark can load them unchanged:
+
+    ./instance_generator.py --nodes 100 1000 20000 --layout clustered \
+        --windows tight --out generated > generated/instances.jsonl
+
+Coordinates are in meters and travel times in seconds. The matrices are
+computed in row chunks straight into the memory-mapped files, so even
+20,000 nodes need only a few tens of megabytes of working memory.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from matrix_store import create_matrix
+
+LAYOUTS = ('random', 'clustered', 'mixed')
+WINDOWS = {
+    # (min width, max width) in seconds
+    'tight': (900, 1800),
+    'loose': (3600, 14400),
+}
+# Same kind of mixed fleet as cvrptw.py, repeated as needed.
+CAPACITY_PROFILE = (20, 20, 5, 20, 20, 20, 10)
+CHUNK_CELLS = 1 << 22
+
+
+def generate_coordinates(rng, num_nodes, layout, area):
+    """Returns (num_nodes, 2) coordinates with the depot at the center."""
+    points = rng.uniform(0, area, (num_nodes, 2))
+    if layout in ('clustered', 'mixed'):
+        num_clusters = max(3, num_nodes // 100)
+        centers = rng.uniform(0.1 * area, 0.9 * area, (num_clusters, 2))
+        members = rng.integers(0, num_clusters, num_nodes)
+        clustered = rng.normal(centers[members], 0.03 * area)
+        if layout == 'clustered':
+            points = clustered
+        else:
+            points = np.where(rng.random(num_nodes)[:, None] < 0.5,
+                              clustered, points)
+    points = np.clip(points, 0, area)
+    points[0] = area / 2
+    return points
+
+
+def fill_travel_matrices(coordinates, distance, duration, speed,
+                         asymmetry, seed):
+    """Fills distance and time matrices row chunk by row chunk.
+
+    Travel time from i to j is distance / speed scaled by a factor drawn
+    from [1, 1 + asymmetry), independently for each direction, so the time
+    matrix is asymmetric whenever asymmetry > 0.
+    """
+    num_nodes = len(coordinates)
+    rows = max(1, CHUNK_CELLS // num_nodes)
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    for start in range(0, num_nodes, rows):
+        stop = min(start + rows, num_nodes)
+        block = np.hypot(x[start:stop, None] - x[None, :],
+                         y[start:stop, None] - y[None, :])
+        distance[start:stop] = np.rint(block)
+        # Chunk sizes depend only on num_nodes, so seeding per chunk keeps
+        # the matrices reproducible.
+        factor = 1 + asymmetry * np.random.default_rng(
+            [seed, start]).random(block.shape)
+        duration[start:stop] = np.rint(block / speed * factor)
+    diagonal = np.arange(num_nodes)
+    distance[diagonal, diagonal] = 0
+    duration[diagonal, diagonal] = 0
+
+
+def generate_instance(num_nodes, layout='random', windows='loose',
+                      capacities=CAPACITY_PROFILE, asymmetry=0.2,
+                      area=50000, speed=10.0, horizon=8 * 3600, seed=0,
+                      directory=None):
+    """Generates one CVRPTW instance.
+
+    Returns a data dict in the solvers' format. With a directory the travel
+    matrices are written there as binary matrix files and memory-mapped,
+    otherwise they are built in memory.
+    """
+    rng = np.random.default_rng([seed, num_nodes])
+    coordinates = generate_coordinates(rng, num_nodes, layout, area)
+    shape = (num_nodes, num_nodes)
+    if directory is None:
+        distance = np.empty(shape, dtype=np.int32)
+        duration = np.empty(shape, dtype=np.int32)
+    else:
+        os.makedirs(directory, exist_ok=True)
+        distance = create_matrix(os.path.join(directory, 'distance_matrix.bin'),
+                                 shape, 'm')
+        duration = create_matrix(os.path.join(directory, 'time_matrix.bin'),
+                                 shape, 's')
+    fill_travel_matrices(coordinates, distance, duration, speed, asymmetry, seed)
+
+    # Windows are centred where the customer can be reached from the depot
+    # and the vehicle can still get back before the horizon.
+    outbound = np.asarray(duration[0], dtype=np.int64)
+    inbound = np.asarray(duration[:, 0], dtype=np.int64)
+    width = rng.integers(*WINDOWS[windows], num_nodes)
+    latest_center = np.maximum(outbound, horizon - inbound - width // 2)
+    center = rng.integers(outbound, latest_center + 1)
+    opens = np.clip(center - width // 2, outbound, horizon)
+    closes = np.clip(center + width // 2, opens, horizon)
+    opens[0], closes[0] = 0, horizon
+
+    demands = rng.integers(1, 11, num_nodes)
+    demands[0] = 0
+    vehicle_capacities = []
+    while sum(vehicle_capacities) < 1.3 * demands.sum():
+        vehicle_capacities.append(
+            int(capacities[len(vehicle_capacities) % len(capacities)]))
+
+    if directory is not None:
+        distance.flush()
+        duration.flush()
+    return {
+        'coordinates': coordinates,
+        'distance_matrix': distance,
+        'time_matrix': duration,
+        'time_windows': list(zip(opens.tolist(), closes.tolist())),
+        'demands': demands.tolist(),
+        'vehicle_capacities': vehicle_capacities,
+        'num_vehicles': len(vehicle_capacities),
+        'depot': 0,
+        'horizon': horizon,
+        'max_waiting': horizon,
+    }
+
+
+def instance_line(instance_id, data, directory, variant='cvrptw'):
+    """Returns a batch solver instance referencing the matrix files."""
+    data = dict(data)
+    data['coordinates'] = data['coordinates'].round(1).tolist()
+    data['distance_matrix'] = os.path.join(directory, 'distance_matrix.bin')
+    data['time_matrix'] = os.path.join(directory, 'time_matrix.bin')
+    return {'id': instance_id, 'variant': variant, 'data': data}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--layout', choices=LAYOUTS, default='mixed')
+    parser.add_argument('--windows', choices=WINDOWS, default='loose')
+    parser.add_argument('--capacities', type=int, nargs='+',
+                        default=list(CAPACITY_PROFILE),
+                        help='fleet capacity profile, repeated as needed')
+    parser.add_argument('--asymmetry', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='generated')
+    args = parser.parse_args()
+
+    for num_nodes in args.nodes:
+        instance_id = f'{args.layout}-{args.windows}-{num_nodes}-s{args.seed}'
+        directory = os.path.join(args.out, instance_id)
+        data = generate_instance(num_nodes, args.layout, args.windows,
+                                 args.capacities, args.asymmetry,
+                                 seed=args.seed, directory=directory)
+        print(json.dumps(instance_line(instance_id, data, directory)), flush=True)
+
+
+if __name__ == '__main__':
+    main()
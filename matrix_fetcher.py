@@ -0,0 +1,218 @@
+#! /usr/bin/env python3
+"""Concurrent Distance Matrix fetch engine.
+
+Blocks are fetched from a thread pool; geocodes and leg geometries for the
+map exporter go through the same engine. Each worker thread keeps its own
+keep-alive `requests.Session`, every attempt takes a token from a shared
+token bucket set to the provider's QPS, and throttled or failed requests are
+retried with jittered exponential backoff.
+"""
+import json
+import random
+import threading
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Google Distance Matrix API defaults.
+DISTANCE_MATRIX_URL = 'https://maps.googleapis.com/maps/api/distancematrix/json'
+GEOCODE_URL = 'https://maps.googleapis.com/maps/api/geocode/json'
+DIRECTIONS_URL = 'https://maps.googleapis.com/maps/api/directions/json'
+PROVIDER_QPS = 50
+RETRY_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+RETRY_HTTP_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header, given either as a number of
+    seconds or as an HTTP date; 0 when it cannot be parsed."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+class MatrixFetchError(Exception):
+    """Raised when some matrix cells could not be fetched.
+
+    `failed` holds (origin, destination, reason) tuples in location indices.
+    """
+
+    def __init__(self, failed):
+        self.failed = failed
+        super().__init__(f"{len(failed)} matrix cells could not be fetched")
+
+
+class MatrixFetcher:
+    """Fetches Distance Matrix blocks concurrently."""
+
+    def __init__(self, API_key, base_url=DISTANCE_MATRIX_URL, qps=PROVIDER_QPS,
+                 workers=8, retries=5, backoff=0.5, timeout=30, mode='driving',
+                 departure_time=None):
+        self.API_key = API_key
+        self.base_url = base_url
+        self.mode = mode
+        # Unix time of departure; blocks then report traffic-aware durations.
+        self.departure_time = departure_time
+        self.bucket = TokenBucket(qps)
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.attempts = 0
+
+    def session(self):
+        """Returns the keep-alive session owned by the calling thread."""
+        if not hasattr(self.local, 'session'):
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(pool_maxsize=1))
+            session.mount('https://', HTTPAdapter(pool_maxsize=1))
+            self.local.session = session
+        return self.local.session
+
+    def sleep_before_retry(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, honouring Retry-After."""
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        if retry_after:
+            delay = max(delay, retry_after_seconds(retry_after))
+        time.sleep(delay)
+
+    def fetch_block(self, origins, destinations):
+        """Fetches one Distance Matrix block.
+
+        Addresses are expected to be URL-encoded already, as in
+        `route_matrices.create_data`.
+        """
+        url = (f'{self.base_url}?origins={"|".join(origins)}'
+               f'&destinations={"|".join(destinations)}'
+               f'&mode={self.mode}&key={self.API_key}&units=metric')
+        if self.departure_time is not None:
+            url += f'&departure_time={int(self.departure_time)}'
+        return self.fetch_url(url)
+
+    def fetch_url(self, url):
+        """Fetches one API URL, retrying throttled and transient failures."""
+        reason = None
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            with self.lock:
+                self.attempts += 1
+            retry_after = None
+            try:
+                reply = self.session().get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                reason = f'{type(e).__name__}: {e}'
+            else:
+                if reply.status_code == 200:
+                    try:
+                        response = json.loads(reply.content)
+                    except ValueError:
+                        # A truncated or non-JSON body (e.g. a proxy error
+                        # page) is treated as a transient failure.
+                        reason = 'invalid JSON response'
+                        if attempt < self.retries:
+                            self.sleep_before_retry(attempt)
+                        continue
+                    status = response.get('status', 'OK')
+                    if status == 'OK':
+                        return response
+                    reason = status
+                    if status not in RETRY_STATUSES:
+                        break
+                else:
+                    reason = f'HTTP {reply.status_code}'
+                    retry_after = reply.headers.get('Retry-After')
+                    if reply.status_code not in RETRY_HTTP_CODES:
+                        break
+            if attempt < self.retries:
+                self.sleep_before_retry(attempt, retry_after)
+        raise MatrixFetchError([(None, None, reason)])
+
+    def geocode(self, address):
+        """Returns the (lat, lng) of a plain-text address."""
+        response = self.fetch_url(
+            f'{GEOCODE_URL}?address={quote(address)}&key={self.API_key}')
+        location = response['results'][0]['geometry']['location']
+        return location['lat'], location['lng']
+
+    def leg_polyline(self, origin, destination):
+        """Returns the encoded overview polyline of the route between two
+        (lat, lng) points."""
+        response = self.fetch_url(
+            f'{DIRECTIONS_URL}?origin={origin[0]},{origin[1]}'
+            f'&destination={destination[0]},{destination[1]}'
+            f'&mode={self.mode}&key={self.API_key}')
+        return response['routes'][0]['overview_polyline']['points']
+
+    def fetch_each(self, function, items):
+        """Calls function(*item) for every item from the thread pool.
+
+        Yields (item, result, reason) as calls complete; result is None
+        and reason explains why when the call failed.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(function, *item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except MatrixFetchError as e:
+                    yield futures[future], None, e.failed[0][2]
+
+    def fetch(self, locations, blocks):
+        """Fetches all blocks and yields them as they complete.
+
+        Yields (origin_ids, destination_ids, response, reason) where
+        response is None and reason explains why when the block failed.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self.fetch_block,
+                            [locations[o] for o in origin_ids],
+                            [locations[d] for d in destination_ids]):
+                (origin_ids, destination_ids)
+                for origin_ids, destination_ids in blocks}
+            for future in as_completed(futures):
+                origin_ids, destination_ids = futures[future]
+                try:
+                    yield origin_ids, destination_ids, future.result(), None
+                except MatrixFetchError as e:
+                    yield origin_ids, destination_ids, None, e.failed[0][2]
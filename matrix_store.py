@@ -0,0 +1,146 @@
+#! /usr/bin/env python3
+"""Compact binary matrix store shared by all solvers.
+
+A matrix file is an 8-byte magic, a little-endian uint32 header length, a
+JSON header (shape, dtype, units, location IDs) padded to 64 bytes, and the
+raw row-major cells. `load_matrix` memory-maps the cells so opening even a
+very large matrix costs no parsing and only the pages actually read.
+Time-dependent matrices are stored the same way as a T x N x N stack of
+time slices, with the slice length recorded in the header (see
+time_slices.py).
+
+Run as a script to convert the text matrices next to it:
+
+    ./matrix_store.py distance_matrix.txt time_matrix.txt
+"""
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b'CVRPMTX1'
+ALIGNMENT = 64
+UNITS = {'distance_matrix': 'm', 'time_matrix': 's'}
+
+
+def _header_bytes(header):
+    raw = json.dumps(header).encode()
+    size = len(MAGIC) + 4 + len(raw)
+    raw += b' ' * (-size % ALIGNMENT)
+    return MAGIC + struct.pack('<I', len(raw)) + raw
+
+
+def create_matrix(path, shape, units, locations=None, dtype='int32',
+                  slice_length=None):
+    """Creates a matrix file and returns a writable memmap of its cells.
+
+    `slice_length` marks a stack of time slices: the first axis is the
+    departure slot, each slot covering that many time units.
+    """
+    header = {'shape': list(shape), 'dtype': np.dtype(dtype).str,
+              'units': units, 'locations': locations}
+    if slice_length is not None:
+        header['slice_length'] = slice_length
+    raw = _header_bytes(header)
+    with open(path, 'wb') as f:
+        f.write(raw)
+    return np.memmap(path, dtype=header['dtype'], mode='r+',
+                     offset=len(raw), shape=tuple(shape))
+
+
+def save_matrix(path, matrix, units, locations=None, dtype='int32',
+                slice_length=None):
+    """Writes a matrix (nested lists or array) to a binary matrix file."""
+    matrix = np.asarray(matrix, dtype=dtype)
+    cells = create_matrix(path, matrix.shape, units, locations, dtype,
+                          slice_length)
+    cells[:] = matrix
+    cells.flush()
+
+
+def read_header(path):
+    """Returns (header, data_offset) of a binary matrix file."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary matrix file")
+        (length,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(length))
+    return header, len(MAGIC) + 4 + length
+
+
+def open_matrix(path, mode='r'):
+    """Memory-maps the cells of a binary matrix file."""
+    header, offset = read_header(path)
+    return np.memmap(path, dtype=header['dtype'], mode=mode,
+                     offset=offset, shape=tuple(header['shape']))
+
+
+def read_text_matrix(path, dtype='int32'):
+    """Parses a tab-separated text matrix into an array."""
+    return np.loadtxt(path, dtype=dtype, delimiter='\t', ndmin=2)
+
+
+def convert_text(txt_path, path=None, units=None, locations=None):
+    """Converts a tab-separated text matrix to a binary matrix file.
+
+    Rows are streamed into the memmap so the text is never held in memory.
+    """
+    name = os.path.splitext(txt_path)[0]
+    path = path or name + '.bin'
+    units = units or UNITS.get(os.path.basename(name))
+    with open(txt_path) as f:
+        first = [int(num) for num in f.readline().split('\t')]
+        cells = create_matrix(path, (len(first), len(first)), units, locations)
+        cells[0] = first
+        for i, line in enumerate(f, 1):
+            cells[i] = [int(num) for num in line.split('\t')]
+    cells.flush()
+    return path
+
+
+def read_matrix(path):
+    """Opens a matrix file: memory-mapped if binary, parsed if text."""
+    if path.endswith('.txt'):
+        return read_text_matrix(path)
+    return open_matrix(path)
+
+
+def matrix_path(name, directory='.'):
+    """Returns the file load_matrix reads for a matrix name.
+
+    `<name>.bin` when it exists and is at least as recent as `<name>.txt`,
+    the text otherwise, so a text matrix written after the binary one (by
+    hand or by an older tool) is never shadowed by stale cells.
+    """
+    path = os.path.join(directory, name)
+    binary, text = path + '.bin', path + '.txt'
+    if os.path.exists(binary) and (not os.path.exists(text)
+                                   or os.path.getmtime(binary) >= os.path.getmtime(text)):
+        return binary
+    return text
+
+
+def load_matrix(name, directory='.'):
+    """Loads a matrix by name, e.g. "time_matrix", as an int32 array.
+
+    The file it is read from (see matrix_path) is reported on stderr.
+    """
+    path = matrix_path(name, directory)
+    print(f"Loading {name} from {path}", file=sys.stderr)
+    return read_matrix(path)
+
+
+def main():
+    from route_matrices import LOCATION
+    locations = [LOCATION[i] for i in sorted(LOCATION)]
+    for txt_path in sys.argv[1:] or ['distance_matrix.txt', 'time_matrix.txt']:
+        with open(txt_path) as f:
+            rows = sum(1 for _ in f)
+        names = locations if rows == len(locations) else None
+        print(f"{txt_path} -> {convert_text(txt_path, locations=names)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+"""Parallel portfolio solver.
+
+Runs one instance in several worker processes, each with a different
+first-solution strategy, local search metaheuristic and random seed, under a
+shared wall-clock budget, and keeps the best solution together with the
+configuration that produced it:
+
+    ./portfolio.py cvrptw --workers 32 --time-limit 60
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ortools.constraint_solver import routing_enums_pb2
+
+from presolve import InfeasibleInstance
+from routing_model import VARIANTS, get_routes, load_variant
+
+FIRST_SOLUTION_STRATEGIES = [
+    'PATH_CHEAPEST_ARC',
+    'PARALLEL_CHEAPEST_INSERTION',
+    'LOCAL_CHEAPEST_INSERTION',
+    'SAVINGS',
+    'GLOBAL_CHEAPEST_ARC',
+    'CHRISTOFIDES',
+    'PATH_MOST_CONSTRAINED_ARC',
+    'SEQUENTIAL_CHEAPEST_INSERTION',
+]
+METAHEURISTICS = [
+    'GUIDED_LOCAL_SEARCH',
+    'TABU_SEARCH',
+    'SIMULATED_ANNEALING',
+]
+
+
+def portfolio_configs(workers, seed=0):
+    """Returns `workers` (strategy, metaheuristic, seed) configs.
+
+    Strategies and metaheuristics are cycled independently, so neighbouring
+    workers differ in both and every pairing is covered before any repeats.
+    """
+    return [{'first_solution_strategy':
+             FIRST_SOLUTION_STRATEGIES[i % len(FIRST_SOLUTION_STRATEGIES)],
+             'local_search_metaheuristic': METAHEURISTICS[i % len(METAHEURISTICS)],
+             'seed': seed + i}
+            for i in range(workers)]
+
+
+def solve_config(variant, data, config, deadline):
+    """Solves the instance with one configuration; runs in a worker.
+
+    Failures are returned as results, with status 'infeasible' (and the
+    presolve reasons) or 'error'.
+    """
+    start = time.time()
+    result = {'config': config, 'objective': None, 'routes': None}
+    try:
+        solution, manager, routing = run_config(variant, data, config, deadline)
+        if solution:
+            result.update(status='solved', objective=solution.ObjectiveValue(),
+                          routes=get_routes(manager, routing, solution))
+        else:
+            result.update(status='no_solution')
+    except InfeasibleInstance as e:
+        result.update(status='infeasible', reasons=e.reasons)
+    except Exception as e:
+        result.update(status='error', error=f'{type(e).__name__}: {e}')
+    result['seconds'] = time.time() - start
+    return result
+
+
+def run_config(variant, data, config, deadline):
+    """Builds and solves the model; returns (solution, manager, routing)."""
+    module = load_variant(variant)
+    manager, routing = module.build_model(data)
+    search_parameters = module.create_search_parameters()
+    search_parameters.first_solution_strategy = getattr(
+        routing_enums_pb2.FirstSolutionStrategy,
+        config['first_solution_strategy'])
+    search_parameters.local_search_metaheuristic = getattr(
+        routing_enums_pb2.LocalSearchMetaheuristic,
+        config['local_search_metaheuristic'])
+    search_parameters.time_limit.FromMilliseconds(
+        max(1, int((deadline - time.time()) * 1000)))
+    # Seeds the randomized neighborhoods (e.g. random LNS) of the search.
+    routing.solver().ReSeed(config['seed'])
+    return routing.SolveWithParameters(search_parameters), manager, routing
+
+
+def solve_portfolio(variant, data, workers=None, time_limit=60, seed=0):
+    """Solves `data` with a portfolio of configurations in parallel.
+
+    Returns (best, results) where best is the result with the lowest
+    objective (None if no worker found a solution) and results holds every
+    worker's result. A worker that dies gives an 'error' result.
+    """
+    workers = workers or os.cpu_count()
+    deadline = time.time() + time_limit
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(solve_config, variant, data, config, deadline): config
+                   for config in portfolio_configs(workers, seed)}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'config': futures[future], 'objective': None,
+                                'routes': None, 'status': 'error',
+                                'error': f'{type(e).__name__}: {e}'})
+    solved = [r for r in results if r['objective'] is not None]
+    best = min(solved, key=lambda r: r['objective'], default=None)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('variant', choices=VARIANTS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--time-limit', type=int, default=60,
+                        help='wall-clock budget in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    module = load_variant(args.variant)
+    data = module.create_data_model()
+    best, results = solve_portfolio(args.variant, data, args.workers,
+                                    args.time_limit, args.seed)
+    infeasible = [r for r in results if r['status'] == 'infeasible']
+    if infeasible:
+        # Presolve proves it the same way in every worker: report it once.
+        print("No solution found ! The instance is infeasible:\n"
+              f"{InfeasibleInstance(infeasible[0]['reasons'])}")
+        return
+    for result in sorted(results, key=lambda r: (r['objective'] is None,
+                                                 r['objective'])):
+        config = result['config']
+        print(f"{str(result['objective']):>10}  "
+              f"{config['first_solution_strategy']} + "
+              f"{config['local_search_metaheuristic']} (seed {config['seed']})"
+              + (f": {result['error']}" if result['status'] == 'error' else ''))
+    if best is None:
+        print("No solution found !")
+        return
+
+    print(f"\nBest configuration: {best['config']}\n")
+    # Rebuild the winning plan in this process to print it.
+    manager, routing = module.build_model(data)
+    routing.CloseModelWithParameters(module.create_search_parameters())
+    solution = routing.ReadAssignmentFromRoutes(best['routes'], True)
+    module.print_solution(data, manager, routing, solution)
+
+
+if __name__ == '__main__':
+    main()
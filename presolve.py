@@ -0,0 +1,155 @@
+"""Presolve for the time-window models.
+
+Before the model is built, time windows are tightened by what is reachable
+from the depot and back within the horizon, and arcs that no feasible route
+can use are found with whole-matrix NumPy comparisons, so the search never
+has to try them. Instances that cannot be solved at all are reported node
+by node instead of running the full search for nothing.
+"""
+import numpy as np
+
+CHUNK_CELLS = 1 << 22
+
+
+class InfeasibleInstance(Exception):
+    """Raised when presolve proves an instance has no solution.
+
+    `reasons` is a list of (node, explanation); node is None for reasons
+    that concern the whole instance.
+    """
+
+    def __init__(self, reasons):
+        super().__init__('\n'.join(
+            f"{'instance' if node is None else f'node {node}'}: {why}"
+            for node, why in reasons))
+        self.reasons = reasons
+
+
+def _row_chunks(num_nodes):
+    rows = max(1, CHUNK_CELLS // num_nodes)
+    for start in range(0, num_nodes, rows):
+        yield start, min(start + rows, num_nodes)
+
+
+def shortest_from(matrix, source):
+    """Shortest travel times from `source`, by chunked Bellman-Ford passes.
+
+    Matrices that satisfy the triangle inequality settle after one pass.
+    """
+    num_nodes = len(matrix)
+    best = np.asarray(matrix[source], dtype=np.int64).copy()
+    best[source] = 0
+    for _ in range(num_nodes):
+        relaxed = best.copy()
+        for start, stop in _row_chunks(num_nodes):
+            block = np.asarray(matrix[start:stop], dtype=np.int64)
+            np.minimum(relaxed, (best[start:stop, None] + block).min(axis=0),
+                       out=relaxed)
+        if np.array_equal(relaxed, best):
+            break
+        best = relaxed
+    return best
+
+
+def shortest_to(matrix, target):
+    """Shortest travel times to `target`, by chunked Bellman-Ford passes."""
+    num_nodes = len(matrix)
+    best = np.asarray(matrix[:, target], dtype=np.int64).copy()
+    best[target] = 0
+    for _ in range(num_nodes):
+        relaxed = best.copy()
+        for start, stop in _row_chunks(num_nodes):
+            block = np.asarray(matrix[start:stop], dtype=np.int64)
+            relaxed[start:stop] = np.minimum(
+                relaxed[start:stop], (block + best[None, :]).min(axis=1))
+        if np.array_equal(relaxed, best):
+            break
+        best = relaxed
+    return best
+
+
+def tighten_windows(data, horizon):
+    """Returns (early, late) windows clipped to what the depot can reach.
+
+    A node cannot be served before the earliest depot departure plus the
+    shortest trip there, nor after the horizon minus the shortest trip back.
+    """
+    matrix = np.asarray(data['time_matrix'])
+    depot = data['depot']
+    windows = np.asarray(data['time_windows'], dtype=np.int64)
+    outbound = shortest_from(matrix, depot)
+    inbound = shortest_to(matrix, depot)
+    early = np.maximum(windows[:, 0], windows[depot, 0] + outbound)
+    late = np.minimum(windows[:, 1], horizon - inbound)
+    early[depot], late[depot] = windows[depot]
+    return early, late, outbound, inbound
+
+
+def infeasible_arcs(data, early, late, max_waiting):
+    """Yields (node, successors) for the arcs no feasible route can use.
+
+    An arc i -> j is infeasible when leaving i as early as possible still
+    misses j's window, when even the latest departure from i plus the
+    allowed waiting arrives before j opens, or when the two demands exceed
+    the largest vehicle capacity. Arcs from and to the depot are kept.
+    """
+    matrix = np.asarray(data['time_matrix'])
+    depot = data['depot']
+    num_nodes = len(matrix)
+    demands = capacity = None
+    if 'demands' in data:
+        demands = np.asarray(data['demands'], dtype=np.int64)
+        capacity = max(data['vehicle_capacities'])
+    for start, stop in _row_chunks(num_nodes):
+        block = np.asarray(matrix[start:stop], dtype=np.int64)
+        pruned = ((early[start:stop, None] + block > late[None, :])
+                  | (late[start:stop, None] + block + max_waiting < early[None, :]))
+        if demands is not None:
+            pruned |= demands[start:stop, None] + demands[None, :] > capacity
+        pruned[:, depot] = False
+        pruned[np.arange(stop - start), np.arange(start, stop)] = False
+        for row in np.flatnonzero(pruned.any(axis=1)):
+            node = start + row
+            if node != depot:
+                yield node, np.flatnonzero(pruned[row])
+
+
+def presolve(data, max_waiting, horizon):
+    """Tightens windows and finds infeasible arcs of a time-window instance.
+
+    Returns (windows, arcs): the tightened (early, late) window per node and
+    a list of (node, successors) arcs to remove. Raises InfeasibleInstance
+    with a per-node explanation when the instance cannot be solved.
+    """
+    early, late, outbound, inbound = tighten_windows(data, horizon)
+    depot = data['depot']
+    windows = data['time_windows']
+    reasons = []
+    for node in np.flatnonzero(early > late):
+        reasons.append((int(node), (
+            f"window {tuple(windows[node])} cannot be met: the earliest arrival "
+            f"from the depot is {windows[depot][0] + outbound[node]} and the "
+            f"vehicle must leave by {horizon - inbound[node]} to be back by "
+            f"the horizon {horizon}")))
+    if 'demands' in data:
+        demands = np.asarray(data['demands'])
+        capacities = data['vehicle_capacities']
+        for node in np.flatnonzero(demands > max(capacities)):
+            reasons.append((int(node), (
+                f"demand {demands[node]} exceeds the largest vehicle "
+                f"capacity {max(capacities)}")))
+        if demands.sum() > sum(capacities):
+            reasons.append((None, (
+                f"total demand {demands.sum()} exceeds the total vehicle "
+                f"capacity {sum(capacities)}")))
+    if reasons:
+        raise InfeasibleInstance(reasons)
+    return (list(zip(early.tolist(), late.tolist())),
+            list(infeasible_arcs(data, early, late, max_waiting)))
+
+
+def remove_arcs(manager, routing, arcs):
+    """Removes presolved infeasible arcs from the NextVar domains."""
+    for node, successors in arcs:
+        routing.NextVar(manager.NodeToIndex(int(node))).RemoveValues(
+            [manager.NodeToIndex(int(successor)) for successor in successors])
@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+"""Stage-level profiler for the solve pipeline.
+
+Code marks its stages with `with stage('model build'):`; stages nest, and
+each reports wall time, CPU time, peak Python allocations (tracemalloc) and
+the process RSS. Python allocations cover our own layer only, while RSS
+also includes what OR-tools allocates natively, so comparing the two shows
+on which side of the boundary a regression sits. Transit evaluations are
+not counted: the solvers register their matrices natively, so they run
+inside OR-tools where Python never sees them.
+
+Nothing is measured until `enable_profiling()` is called; every solver does
+that for `--profile REPORT`, which writes the report as JSON. Run as a
+script to print a saved report as a table:
+
+    ./cvrptw.py --profile profile.json
+    ./profiler.py profile.json
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+_profiler = None
+
+
+def _rss():
+    """Current resident set size in bytes (Linux), else None."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss():
+    """Peak resident set size of the process so far, in bytes, or None where
+    the resource module is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """Collects stage measurements."""
+
+    def __init__(self):
+        self.stages = []
+        self.open = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        path = '/'.join([s['name'] for s in self.open] + [name])
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        entry = {'name': name, 'peak': allocated}
+        self.open.append(entry)
+        record = {'stage': path}
+        self.stages.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, entry['peak'])
+            self.open.pop()
+            if self.open:
+                # Nested stages reset the peak; carry theirs up.
+                self.open[-1]['peak'] = max(self.open[-1]['peak'], peak)
+            rss, peak_rss = _rss(), _peak_rss()
+            record.update({
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'python_peak_mb': round((peak - allocated) / 2**20, 3),
+                'rss_mb': None if rss is None else round(rss / 2**20, 1),
+                'rss_peak_mb': None if peak_rss is None else round(peak_rss / 2**20, 1),
+            })
+
+    def report(self):
+        return {'stages': self.stages}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+
+def enable_profiling():
+    """Starts profiling for the rest of the process and returns the profiler."""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def stage(name):
+    """Context manager measuring a stage; a no-op unless profiling is on."""
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.stage(name)
+
+
+def main():
+    with open(sys.argv[1]) as f:
+        report = json.load(f)
+    print(f"{'stage':40} {'wall s':>9} {'cpu s':>9} {'py peak MB':>11} "
+          f"{'RSS MB':>8} {'RSS peak':>9}")
+    for s in report['stages']:
+        print(f"{s['stage']:40} {s['wall_s']:9.3f} {s['cpu_s']:9.3f} "
+              f"{s['python_peak_mb']:11.2f} {str(s['rss_mb']):>8} "
+              f"{str(s['rss_peak_mb']):>9}")
+
+
+if __name__ == '__main__':
+    main()
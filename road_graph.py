@@ -0,0 +1,132 @@
+#! /usr/bin/env python3
+"""Local road network matrix provider.
+
+Loads a road graph from an edge-list file, snaps locations to their nearest
+graph nodes and computes many-to-many distance and time matrices with
+multi-source Dijkstra (scipy.sparse.csgraph), one chunk of sources per
+worker process. The file has one record per line:
+
+    N <node id> <lat> <lng>
+    E <from id> <to id> <length m> <speed km/h>
+
+Edges are directed; list both directions for two-way streets. Distances
+are shortest path lengths and times fastest path durations, each plus the
+straight-line hop from the location to its snapped node.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from matrix_fetcher import MatrixFetchError
+
+EARTH_RADIUS = 6371008.8  # meters
+SNAP_SPEED = 15 / 3.6  # m/s for the hop between a location and the graph
+SOURCES_PER_TASK = 32
+
+
+class RoadGraph:
+    """A directed road graph with length and travel time edge weights."""
+
+    def __init__(self, node_ids, lat, lng, tails, heads, lengths, speeds):
+        self.node_ids = node_ids
+        self.lat = lat
+        self.lng = lng
+        self.lengths = self.weights(tails, heads, lengths)
+        self.times = self.weights(tails, heads, lengths / (speeds / 3.6))
+        self.origin_lat = np.radians(lat.mean())
+        self.tree = cKDTree(self.project(lat, lng))
+
+    def weights(self, tails, heads, values):
+        """Builds a sparse weight matrix, keeping the cheapest parallel edge."""
+        order = np.lexsort((values, heads, tails))
+        tails, heads, values = tails[order], heads[order], values[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (tails[1:] != tails[:-1]) | (heads[1:] != heads[:-1])
+        num_nodes = len(self.node_ids)
+        return csr_matrix((values[first], (tails[first], heads[first])),
+                          shape=(num_nodes, num_nodes))
+
+    def project(self, lat, lng):
+        """Equirectangular projection to meters, fine at city scale."""
+        return np.column_stack((
+            EARTH_RADIUS * np.radians(lng) * np.cos(self.origin_lat),
+            EARTH_RADIUS * np.radians(lat)))
+
+    def snap(self, lat, lng):
+        """Returns (graph nodes, hop distances in m) nearest to locations."""
+        hops, nodes = self.tree.query(self.project(np.asarray(lat),
+                                                   np.asarray(lng)))
+        return nodes, hops
+
+
+def load_road_graph(path):
+    """Reads an N/E edge-list file into a RoadGraph."""
+    node_ids, lat, lng = [], [], []
+    edges = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if fields[0] == 'N':
+                node_ids.append(fields[1])
+                lat.append(float(fields[2]))
+                lng.append(float(fields[3]))
+            elif fields[0] == 'E':
+                edges.append(fields[1:5])
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    tails = np.array([index[e[0]] for e in edges])
+    heads = np.array([index[e[1]] for e in edges])
+    lengths = np.array([float(e[2]) for e in edges])
+    speeds = np.array([float(e[3]) for e in edges])
+    return RoadGraph(node_ids, np.array(lat), np.array(lng),
+                     tails, heads, lengths, speeds)
+
+
+_worker_graph = None
+
+
+def _init_worker(lengths, times):
+    global _worker_graph
+    _worker_graph = (lengths, times)
+
+
+def _shortest_paths(sources, targets):
+    """Runs Dijkstra from a chunk of sources on both weights (in a worker)."""
+    lengths, times = _worker_graph
+    distance = dijkstra(lengths, indices=sources)[:, targets]
+    duration = dijkstra(times, indices=sources)[:, targets]
+    return distance, duration
+
+
+def get_road_matrices(graph, lat, lng, workers=None):
+    """Computes the distance (m) and time (s) matrices between locations.
+
+    Raises MatrixFetchError listing location pairs with no path.
+    """
+    nodes, hops = graph.snap(lat, lng)
+    unique_nodes, positions = np.unique(nodes, return_inverse=True)
+    chunks = [unique_nodes[i:i + SOURCES_PER_TASK]
+              for i in range(0, len(unique_nodes), SOURCES_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker,
+                             initargs=(graph.lengths, graph.times)) as pool:
+        results = list(pool.map(_shortest_paths, chunks,
+                                [unique_nodes] * len(chunks)))
+    distance = np.vstack([r[0] for r in results])[np.ix_(positions, positions)]
+    duration = np.vstack([r[1] for r in results])[np.ix_(positions, positions)]
+
+    distance += hops[:, None] + hops[None, :]
+    duration += (hops[:, None] + hops[None, :]) / SNAP_SPEED
+    np.fill_diagonal(distance, 0)
+    np.fill_diagonal(duration, 0)
+    unreachable = np.argwhere(~np.isfinite(distance) | ~np.isfinite(duration))
+    if len(unreachable):
+        raise MatrixFetchError([(int(o), int(d), 'unreachable')
+                                for o, d in unreachable])
+    return (np.rint(distance).astype(np.int32),
+            np.rint(duration).astype(np.int32))
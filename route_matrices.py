@@ -1,8 +1,15 @@
 #! /usr/bin/env python3
-import requests
+import argparse
+import csv
 import json
+import sys
+import time
 import urllib.request as urllib
 import os
+import numpy as np
+from matrix_fetcher import MatrixFetcher, MatrixFetchError
+from matrix_store import UNITS, create_matrix, read_text_matrix, save_matrix
+from travel_cache import TravelCache
 # The distances are in meters, and the times are in seconds in the matrices
 LOCATION={
     0: 'Dtdc Courier Service Aerocity mohali',
@@ -24,72 +31,206 @@ LOCATION={
     16: 'Singh Sheeda Gurdwara Sahib'
 }
 
+# URL-encoded address of every location, in location order.
+ADDRESSES = [r'Dtdc+Courier+Service+Aerocity+mohali',  # depot
+             r'Mahendra+Chaudhary+Zoological+Park,+Chhat+Bir+Zoo,+Zirakpur',
+             r'Radisson+Hotel+Chandigarh+Zirakpur',
+             r'Plaksha+University',
+             r'Bestech+Square+Mall',
+             r'JLPL+Falcon+View',
+             r'Mohali+IT+City+Park',
+             r'Amity+University,+Mohali',
+             r'Sharon+Resort',
+             r'La+Palacio+Luxury+Banquet+%26+Lawns+-+Wedding+Palace+in+Zirakpur',
+             r'Strawberry+Global+Smart+School',
+             r'Akm+Resorts',
+             r'Gurdwara+Dushat+Daman+Durali',
+             r'Jayant+education',
+             r'The+Mohali+Club+%7C%7C+Wyndham+Chandigarh+Mohali',
+             r"The+Amaltas+Farms",
+             r'Singh+Sheeda+Gurdwara+Sahib']
+
+
 def create_data():
     """Creates the data for route distances and times."""
     data = {}
     with open("API_KEY_HOLDER.env") as f:
         x = f.readline()
     data['API_key'] = x.strip()
-    data['locations'] = [r'Dtdc+Courier+Service+Aerocity+mohali',  # depot
-                         r'Mahendra+Chaudhary+Zoological+Park,+Chhat+Bir+Zoo,+Zirakpur',
-                         r'Radisson+Hotel+Chandigarh+Zirakpur',
-                         r'Plaksha+University',
-                         r'Bestech+Square+Mall',
-                         r'JLPL+Falcon+View',
-                         r'Mohali+IT+City+Park',
-                         r'Amity+University,+Mohali',
-                         r'Sharon+Resort',
-                         r'La+Palacio+Luxury+Banquet+%26+Lawns+-+Wedding+Palace+in+Zirakpur',
-                         r'Strawberry+Global+Smart+School',
-                         r'Akm+Resorts',
-                         r'Gurdwara+Dushat+Daman+Durali',
-                         r'Jayant+education',
-                         r'The+Mohali+Club+%7C%7C+Wyndham+Chandigarh+Mohali',
-                         r"The+Amaltas+Farms",
-                         r'Singh+Sheeda+Gurdwara+Sahib']
+    data['locations'] = list(ADDRESSES)
     return data
 
 
-def get_route_distances(data):
-    API_key = data["API_key"]
-    locations = data['locations']
-    num_locations = len(locations)
-    distance_matrix = []
+# Distance Matrix API limits for a single request.
+MAX_ELEMENTS = 100
+MAX_DIMENSION = 25
 
-    for origin in locations:
-        row_distances = []
-        for destination in locations:
-            if origin == destination:
-                # No need to calculate distance to the same location
-                row_distances.append(0)
+
+def plan_blocks(num_origins, num_destinations,
+                max_elements=MAX_ELEMENTS, max_dimension=MAX_DIMENSION):
+    """Tiles the origin x destination grid into blocks that fit in one request.
+
+    Returns a list of (origin_indices, destination_indices) range pairs.
+    """
+    rows = min(max_dimension, num_origins, max_elements)
+    cols = min(max_dimension, num_destinations, max(1, max_elements // rows))
+    blocks = []
+    for o in range(0, num_origins, rows):
+        for d in range(0, num_destinations, cols):
+            blocks.append((range(o, min(o + rows, num_origins)),
+                           range(d, min(d + cols, num_destinations))))
+    return blocks
+
+
+def estimate_requests(num_locations, max_elements=MAX_ELEMENTS,
+                      max_dimension=MAX_DIMENSION):
+    """Returns (requests, elements) needed to build the full matrices."""
+    blocks = plan_blocks(num_locations, num_locations,
+                         max_elements, max_dimension)
+    return len(blocks), count_elements(blocks)
+
+
+def count_elements(blocks):
+    return sum(len(o) * len(d) for o, d in blocks)
+
+
+def plan_pair_blocks(pairs, num_locations, max_elements=MAX_ELEMENTS,
+                     max_dimension=MAX_DIMENSION):
+    """Tiles an arbitrary set of (origin, destination) pairs into blocks.
+
+    Origins missing most of their row are fetched as full rows; the rest are
+    grouped by their exact set of missing destinations, so adding one
+    location costs its new row and column rather than the whole matrix.
+    """
+    missing = {}
+    for origin, destination in pairs:
+        missing.setdefault(origin, set()).add(destination)
+    groups = {}
+    heavy = sorted(o for o, destinations in missing.items()
+                   if 2 * len(destinations) >= num_locations - 1)
+    if heavy:
+        destinations = set().union(*(missing[o] for o in heavy))
+        groups[tuple(sorted(destinations))] = heavy
+    for origin in sorted(set(missing) - set(heavy)):
+        groups.setdefault(tuple(sorted(missing[origin])), []).append(origin)
+
+    blocks = []
+    for destinations, origins in groups.items():
+        for o, d in plan_blocks(len(origins), len(destinations),
+                                max_elements, max_dimension):
+            blocks.append(([origins[i] for i in o],
+                           [destinations[j] for j in d]))
+    return blocks
+
+
+def extract_matrix_block(response):
+    """Yields (row, col, distance, duration) for every element of a block.
+
+    Distance and duration are None when the element has no route. When the
+    block was requested with a departure time, duration is the duration in
+    traffic.
+    """
+    for i, row in enumerate(response.get('rows', [])):
+        for j, element in enumerate(row.get('elements', [])):
+            if element.get('status') == 'OK':
+                duration = element.get('duration_in_traffic', element['duration'])
+                yield i, j, element['distance']['value'], duration['value']
             else:
-                response = send_request(origin, destination, API_key)
-                distance = extract_route_distance(response)
-                row_distances.append(distance)
-        distance_matrix.append(row_distances)
+                yield i, j, None, None
 
-    return distance_matrix
 
+def get_route_matrices(data, fetcher=None, cache=None):
+    """Builds the distance and time matrices in a single block-batched pass.
 
-def get_route_times(data):
-    API_key = data["API_key"]
+    Blocks are fetched concurrently. With a TravelCache, fresh cached pairs
+    are reused and only missing or stale pairs are requested; fetched cells
+    are stored block by block. Raises MatrixFetchError listing every cell
+    that could not be fetched instead of leaving None in the matrices.
+    """
+    if fetcher is None:
+        fetcher = MatrixFetcher(data["API_key"])
     locations = data['locations']
     num_locations = len(locations)
-    time_matrix = []
+    distance_matrix = [[0] * num_locations for _ in range(num_locations)]
+    time_matrix = [[0] * num_locations for _ in range(num_locations)]
+    failed = []
 
-    for origin in locations:
-        row_times = []
-        for destination in locations:
+    if cache is None:
+        blocks = plan_blocks(num_locations, num_locations)
+    else:
+        known = cache.lookup(locations)
+        for (origin, destination), (distance, duration) in known.items():
+            distance_matrix[origin][destination] = distance
+            time_matrix[origin][destination] = duration
+        # Pairs journaled by an interrupted fetch go first, then whatever
+        # else is missing or stale.
+        pending = [(o, d) for o, d in cache.pending(locations) if (o, d) not in known]
+        if pending:
+            print(f"Resuming an interrupted fetch ({len(pending)} pairs pending)")
+        missing = pending + sorted(
+            {(o, d) for o in range(num_locations) for d in range(num_locations)
+             if o != d and (o, d) not in known} - set(pending))
+        blocks = plan_pair_blocks(missing, num_locations)
+        cache.begin(locations, missing)
+
+    print(f"Fetching {count_elements(blocks)} elements in {len(blocks)} requests")
+    for origin_ids, destination_ids, response, reason in fetcher.fetch(locations, blocks):
+        if response is None:
+            failed.extend((o, d, reason) for o in origin_ids
+                          for d in destination_ids if o != d)
+            continue
+        cells = []
+        for i, j, distance, duration in extract_matrix_block(response):
+            origin, destination = origin_ids[i], destination_ids[j]
             if origin == destination:
-                # No need to calculate time to the same location
-                row_times.append(0)
-            else:
-                response = send_request(origin, destination, API_key)
-                duration = extract_route_duration(response)
-                row_times.append(duration)
-        time_matrix.append(row_times)
+                # No need to calculate the route to the same location
+                continue
+            if distance is None:
+                failed.append((origin, destination, 'no route'))
+                continue
+            distance_matrix[origin][destination] = distance
+            time_matrix[origin][destination] = duration
+            cells.append((origin, destination, distance, duration))
+        if cache is not None:
+            cache.store(locations, cells)
+
+    if failed:
+        if cache is not None:
+            cache.abandon(locations, [(o, d) for o, d, _ in failed])
+        raise MatrixFetchError(failed)
+    return distance_matrix, time_matrix
+
+
+def get_time_slices(data, departures, out, fetcher=None):
+    """Fetches one traffic-aware time matrix per departure time into out.
+
+    `departures` are Unix times (in the future, as the provider requires)
+    and `out` is a T x N x N array such as a create_matrix memmap. The
+    travel cache holds static durations only, so every slice is fetched.
+    """
+    if fetcher is None:
+        fetcher = MatrixFetcher(data["API_key"])
+    for k, departure in enumerate(departures):
+        fetcher.departure_time = departure
+        print(f"Slice {k + 1}/{len(departures)}: departing at "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(departure))}")
+        out[k] = get_route_matrices(data, fetcher)[1]
+    return out
+
+
+def get_route_distances(data):
+    return get_route_matrices(data)[0]
+
+
+def get_route_times(data):
+    return get_route_matrices(data)[1]
 
-    return time_matrix
+
+def write_matrix(file, matrix):
+    """Saves a matrix as tab-separated rows."""
+    with open(file, "w") as f:
+        for row in matrix:
+            f.write("\t".join(str(v) for v in row) + "\n")
 
 
 def send_request(origin, destination, API_key):
@@ -128,29 +269,255 @@ def extract_route_duration(response):
     return None
 
 
+# Offline geodesic backend: haversine distances scaled by a road detour
+# factor, and times at a pace (seconds per geodesic meter), per region.
+EARTH_RADIUS = 6371008.8  # meters
+DEFAULT_FACTORS = {'detour': 1.3, 'pace': 1.3 / (30 / 3.6)}  # 30 km/h
+CHUNK_CELLS = 1 << 21
+
+
+def read_coordinates(file):
+    """Reads `lat,lng[,region]` rows, one per location in LOCATION order."""
+    with open(file) as f:
+        rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+    if rows and not rows[0][0].lstrip('-').replace('.', '', 1).isdigit():
+        rows = rows[1:]  # header
+    lat = np.array([float(row[0]) for row in rows])
+    lng = np.array([float(row[1]) for row in rows])
+    regions = np.array([row[2] if len(row) > 2 else 'all' for row in rows])
+    return lat, lng, regions
+
+
+def haversine_rows(lat, lng, start, stop):
+    """Great-circle distances in meters from locations start:stop to all."""
+    phi, lam = np.radians(lat), np.radians(lng)
+    dphi = phi[None, :] - phi[start:stop, None]
+    dlam = lam[None, :] - lam[start:stop, None]
+    h = (np.sin(dphi / 2) ** 2
+         + np.cos(phi[start:stop, None]) * np.cos(phi[None, :]) * np.sin(dlam / 2) ** 2)
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(h, 1)))
+
+
+def calibrate(lat, lng, regions, distance_matrix, time_matrix):
+    """Fits per-region detour and pace factors to real matrix cells.
+
+    Uses every off-diagonal cell of the real matrices (which cover the
+    first len(distance_matrix) locations) and fits each origin region by
+    least squares through the origin. Returns (factors, report) where
+    report holds the fit's cell count and mean absolute percentage errors.
+    Raises ValueError when there are fewer coordinates than matrix rows.
+    """
+    n = len(distance_matrix)
+    if len(time_matrix) != n:
+        raise ValueError(f"the distance matrix has {n} rows but the time "
+                         f"matrix has {len(time_matrix)}")
+    if len(lat) < n:
+        raise ValueError(f"{len(lat)} coordinates for {n} matrix rows")
+    geodesic = haversine_rows(lat[:n], lng[:n], 0, n)
+    real_distance = np.asarray(distance_matrix, dtype=float)
+    real_time = np.asarray(time_matrix, dtype=float)
+    usable = (geodesic > 0) & (real_distance > 0) & (real_time > 0)
+    factors, report = {}, {}
+    for region in np.unique(regions[:n]):
+        cells = usable & (regions[:n] == region)[:, None]
+        g, d, t = geodesic[cells], real_distance[cells], real_time[cells]
+        if not len(g):
+            continue
+        detour = (g * d).sum() / (g * g).sum()
+        pace = (g * t).sum() / (g * g).sum()
+        factors[region] = {'detour': detour, 'pace': pace}
+        report[region] = {
+            'cells': int(len(g)),
+            'detour': round(float(detour), 3),
+            'speed_kmh': round(float(detour / pace * 3.6), 1),
+            'distance_mape': round(float(100 * np.mean(np.abs(detour * g - d) / d)), 2),
+            'time_mape': round(float(100 * np.mean(np.abs(pace * g - t) / t)), 2),
+        }
+    return factors, report
+
+
+def get_geodesic_matrices(lat, lng, regions=None, factors=None,
+                          distance_out=None, time_out=None):
+    """Builds distance (m) and time (s) matrices from coordinates.
+
+    Rows are computed in chunks of about CHUNK_CELLS cells, so passing
+    memory-mapped outputs keeps memory flat even for 20k x 20k. Each row
+    uses the factors of its origin's region, falling back to the mean of
+    the calibrated regions (or DEFAULT_FACTORS) for unknown regions.
+    """
+    n = len(lat)
+    regions = np.full(n, 'all') if regions is None else regions
+    factors = factors or {}
+    fallback = DEFAULT_FACTORS
+    if factors:
+        fallback = {k: np.mean([f[k] for f in factors.values()])
+                    for k in DEFAULT_FACTORS}
+    detour = np.array([factors.get(r, fallback)['detour'] for r in regions])
+    pace = np.array([factors.get(r, fallback)['pace'] for r in regions])
+    if distance_out is None:
+        distance_out = np.empty((n, n), dtype=np.int32)
+    if time_out is None:
+        time_out = np.empty((n, n), dtype=np.int32)
+    rows = max(1, CHUNK_CELLS // n)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        geodesic = haversine_rows(lat, lng, start, stop)
+        distance_out[start:stop] = np.rint(geodesic * detour[start:stop, None])
+        time_out[start:stop] = np.rint(geodesic * pace[start:stop, None])
+    return distance_out, time_out
+
+
+# The offline backends never write the matrices the solvers load by default,
+# so a what-if run cannot silently replace the provider data.
+OFFLINE_NOTE = ("The solvers still load distance_matrix and time_matrix; reference "
+                "these files from a batch_solve.py instance to use them")
+
+
+def offline_paths(args):
+    """Returns the distance and time matrix paths an offline backend writes."""
+    prefix = args.backend + '_' if args.out is None else args.out
+    return prefix + "distance_matrix.bin", prefix + "time_matrix.bin"
+
+
+def geodesic_main(args):
+    lat, lng, regions = read_coordinates(args.coordinates)
+    factors = {}
+    if os.path.exists("distance_matrix.txt") and os.path.exists("time_matrix.txt"):
+        try:
+            factors, report = calibrate(lat, lng, regions,
+                                        read_text_matrix("distance_matrix.txt"),
+                                        read_text_matrix("time_matrix.txt"))
+        except ValueError as e:
+            sys.exit(f"Cannot calibrate {args.coordinates} against distance_matrix.txt "
+                     f"and time_matrix.txt: {e}")
+        print("Calibration against the provider matrices:")
+        for region, fit in report.items():
+            print(f"  {region}: {fit}")
+    else:
+        print("No provider matrices to calibrate against, using defaults")
+
+    n = len(lat)
+    names = [LOCATION.get(i, str(i)) for i in range(n)]
+    distance_path, time_path = offline_paths(args)
+    distance_out = create_matrix(distance_path, (n, n), UNITS['distance_matrix'], names)
+    time_out = create_matrix(time_path, (n, n), UNITS['time_matrix'], names)
+    get_geodesic_matrices(lat, lng, regions, factors, distance_out, time_out)
+    distance_out.flush()
+    time_out.flush()
+    print(f"Wrote {n}x{n} geodesic matrices to {distance_path} and {time_path}")
+    print(OFFLINE_NOTE)
+
+
+def road_main(args):
+    # scipy is only needed by this backend, so the solvers importing LOCATION
+    # from this module do not depend on it.
+    from road_graph import get_road_matrices, load_road_graph
+
+    lat, lng, _ = read_coordinates(args.coordinates)
+    try:
+        distance_matrix, time_matrix = get_road_matrices(
+            load_road_graph(args.road_graph), lat, lng)
+    except MatrixFetchError as e:
+        for origin, destination, reason in e.failed:
+            print(f"No path {origin} -> {destination}: {reason}")
+        sys.exit(f"{e}; matrices were not written")
+
+    n = len(lat)
+    names = [LOCATION.get(i, str(i)) for i in range(n)]
+    distance_path, time_path = offline_paths(args)
+    save_matrix(distance_path, distance_matrix, UNITS['distance_matrix'], names)
+    save_matrix(time_path, time_matrix, UNITS['time_matrix'], names)
+    print(f"Wrote {n}x{n} road matrices to {distance_path} and {time_path}")
+    print(OFFLINE_NOTE)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Builds the distance and time matrices.")
+    parser.add_argument('--backend', choices=('google', 'geodesic', 'road'), default='google')
+    parser.add_argument('--coordinates', help="lat,lng[,region] CSV for the offline backends")
+    parser.add_argument('--road-graph', help="N/E edge-list file for the road backend")
+    parser.add_argument('--out', metavar='PREFIX',
+                        help="prefix of the matrix files the offline backends write "
+                             "(default: the backend name and '_', e.g. "
+                             "geodesic_distance_matrix.bin)")
+    parser.add_argument('--slices', type=int,
+                        help="fetch this many traffic-aware time slices into "
+                             "time_matrix_slices.bin (google backend)")
+    parser.add_argument('--slice-minutes', type=int, default=15)
+    parser.add_argument('--day-start', metavar='"YYYY-MM-DD HH:MM"',
+                        help="local departure time of the first slice, i.e. "
+                             "time 0 of the time windows (default: tomorrow 00:00)")
+    args = parser.parse_args()
+    if args.backend != 'google' and not args.coordinates:
+        parser.error(f"the {args.backend} backend needs --coordinates")
+    if args.backend == 'geodesic':
+        geodesic_main(args)
+        return
+    if args.backend == 'road':
+        if not args.road_graph:
+            parser.error("the road backend needs --road-graph")
+        road_main(args)
+        return
+
     data = create_data()
+    if args.slices:
+        slices_main(args, data)
+        return
+
+    # Get the route distance and time matrices from the same responses,
+    # going to the network only for pairs missing from the cache
+    cache = TravelCache()
+    try:
+        distance_matrix, time_matrix = get_route_matrices(data, cache=cache)
+    except MatrixFetchError as e:
+        for origin, destination, reason in e.failed:
+            print(f"Failed {LOCATION[origin]} -> {LOCATION[destination]}: {reason}")
+        sys.exit(f"{e}; matrices were not written")
+    finally:
+        cache.close()
+    save_matrices(distance_matrix, time_matrix)
+
 
-    # Get and print the route distance matrix
-    distance_matrix = get_route_distances(data)
+def slices_main(args, data):
+    if args.day_start:
+        start = time.mktime(time.strptime(args.day_start, '%Y-%m-%d %H:%M'))
+    else:
+        tomorrow = time.localtime(time.time() + 86400)
+        start = time.mktime((tomorrow.tm_year, tomorrow.tm_mon, tomorrow.tm_mday,
+                             0, 0, 0, 0, 0, -1))
+    slice_length = args.slice_minutes * 60
+    departures = [start + k * slice_length for k in range(args.slices)]
+    n = len(data['locations'])
+    names = [LOCATION.get(i, str(i)) for i in range(n)]
+    out = create_matrix("time_matrix_slices.bin", (args.slices, n, n),
+                        UNITS['time_matrix'], names, slice_length=slice_length)
+    try:
+        get_time_slices(data, departures, out)
+    except MatrixFetchError as e:
+        for origin, destination, reason in e.failed:
+            print(f"Failed {LOCATION[origin]} -> {LOCATION[destination]}: {reason}")
+        os.remove("time_matrix_slices.bin")
+        sys.exit(f"{e}; time slices were not written")
+    out.flush()
+    print(f"Wrote {args.slices} time slices of {args.slice_minutes} minutes "
+          f"to time_matrix_slices.bin")
+
+
+def save_matrices(distance_matrix, time_matrix):
+    """Prints the matrices and saves them as text and to the binary store."""
     print("Route Distance Matrix:")
     for row_distances in distance_matrix:
-        print(row_distances)
+        print([int(d) for d in row_distances])
 
-    # Get and print the route time matrix
-    time_matrix = get_route_times(data)
     print("\nRoute Time Matrix:")
     for row_times in time_matrix:
-        print(row_times)
-
-    # Save the matrices to text files
-    with open("distance_matrix.txt", "w") as f:
-        for row_distances in distance_matrix:
-            f.write("\t".join(str(d) for d in row_distances) + "\n")
+        print([int(t) for t in row_times])
 
-    with open("time_matrix.txt", "w") as f:
-        for row_times in time_matrix:
-            f.write("\t".join(str(t) for t in row_times) + "\n")
+    write_matrix("distance_matrix.txt", distance_matrix)
+    write_matrix("time_matrix.txt", time_matrix)
+    names = [LOCATION.get(i, str(i)) for i in range(len(distance_matrix))]
+    save_matrix("distance_matrix.bin", distance_matrix, UNITS['distance_matrix'], names)
+    save_matrix("time_matrix.bin", time_matrix, UNITS['time_matrix'], names)
 
 
 if __name__ == '__main__':
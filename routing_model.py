@@ -0,0 +1,247 @@
+#! /usr/bin/env python3
+"""Helpers shared by the OR-tools routing model builders."""
+import argparse
+import importlib
+import json
+
+from profiler import stage
+from telemetry import record_telemetry
+
+# Problem variant -> solver module exposing create_data_model, build_model,
+# create_search_parameters and print_solution.
+VARIANTS = {
+    'vrp': 'vrp',
+    'cvrp': 'cvrp',
+    'vrptw': 'vrp_tw',
+    'cvrptw': 'cvrptw',
+}
+
+
+def load_variant(variant):
+    """Returns the solver module for a problem variant."""
+    return importlib.import_module(VARIANTS[variant])
+
+
+def register_transit_matrix(routing, matrix):
+    """Registers a node x node matrix as a transit evaluated inside OR-tools.
+
+    The matrix is indexed by node, not by routing variable index; OR-tools
+    performs the IndexToNode conversion itself, so no Python code runs
+    during the search.
+    """
+    rows = matrix.tolist() if hasattr(matrix, 'tolist') else matrix
+    return routing.RegisterTransitMatrix([[int(v) for v in row] for row in rows])
+
+
+def register_unary_vector(routing, vector):
+    """Registers a per-node vector (e.g. demands) as a unary transit."""
+    return routing.RegisterUnaryTransitVector([int(v) for v in vector])
+
+
+def register_transit_callback(routing, manager, evaluate):
+    """Registers evaluate(from_node, to_node) as a Python transit callback.
+
+    Only for costs that cannot be expressed as a matrix: every evaluation
+    crosses into Python.
+    """
+    def transit_callback(from_index, to_index):
+        return evaluate(manager.IndexToNode(from_index),
+                        manager.IndexToNode(to_index))
+
+    return routing.RegisterTransitCallback(transit_callback)
+
+
+def get_routes(manager, routing, solution):
+    """Returns the node sequence of every vehicle, depots excluded."""
+    routes = []
+    for vehicle_id in range(routing.vehicles()):
+        index = solution.Value(routing.NextVar(routing.Start(vehicle_id)))
+        route = []
+        while not routing.IsEnd(index):
+            route.append(manager.IndexToNode(index))
+            index = solution.Value(routing.NextVar(index))
+        routes.append(route)
+    return routes
+
+
+def solver_arg_parser(description):
+    """Returns the command line parser shared by the solver scripts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--warm-start', metavar='PLAN',
+                        help='re-optimize from a previous JSON plan')
+    parser.add_argument('--savings', action='store_true',
+                        help='start the search from a Clarke-Wright savings plan')
+    parser.add_argument('--save-plan', metavar='PLAN',
+                        help='write the solution as a JSON plan')
+    parser.add_argument('--telemetry', metavar='FILE',
+                        help='record every improving solution as JSONL')
+    parser.add_argument('--profile', metavar='REPORT',
+                        help='write a per-stage time and memory report (JSON)')
+    parser.add_argument('--save-solution', metavar='FILE',
+                        help='write the extracted solution arrays '
+                             '(.npz, JSON otherwise)')
+    parser.add_argument('--time-limit', type=int, metavar='SECONDS',
+                        help='override the search time limit')
+    parser.add_argument('--no-gap', action='store_true',
+                        help="don't compute a lower bound to report the "
+                             'optimality gap (bounds.py)')
+    return parser
+
+
+def objective_line(objective, bound=None):
+    """Returns the solvers' "Objective:" line, with the optimality gap when
+    a lower `bound` is given."""
+    if bound is None:
+        return f'Objective: {objective}'
+    from bounds import format_gap
+    return f'Objective: {objective} ({format_gap(objective, bound)})'
+
+
+def solve_and_report(module, args, data, manager, routing, search_parameters):
+    """Runs the end of a solver script's main for its parsed `args`.
+
+    Solves, warm-started from --warm-start or a savings plan with
+    --savings, then extracts the solution once for the module's
+    print_solution and --save-solution, and writes --save-plan.
+    """
+    # These modules import this one.
+    from savings import savings_routes
+    from solution_extract import extract_solution, save_solution
+
+    if args.time_limit:
+        search_parameters.time_limit.seconds = args.time_limit
+    plan = read_plan(args.warm_start) if args.warm_start else None
+    if plan is None and args.savings:
+        # The time-window solvers' waiting limit and horizon, as in bounds.
+        horizon = data.get('horizon', getattr(module, 'HORIZON', None))
+        max_waiting = data.get('max_waiting', getattr(module, 'MAX_WAITING', None))
+        plan = savings_routes(data, horizon=horizon, max_waiting=max_waiting)[0]
+    telemetry = record_telemetry(routing, args.telemetry) if args.telemetry else None
+    with stage('search'):
+        solution = solve_model(data, manager, routing, search_parameters, plan)
+    if telemetry:
+        telemetry.close()
+
+    if not solution:
+        print('No solution found !')
+        return
+    result = extract_solution(data, manager, routing, solution)
+    bound = None
+    if not args.no_gap:
+        from bounds import variant_bound
+        with stage('lower bound'):
+            bound = variant_bound(module, data)['bound']
+    with stage('output'):
+        module.print_solution(data, manager, routing, solution, result, bound)
+    with stage('export'):
+        if args.save_plan:
+            write_plan(args.save_plan, get_routes(manager, routing, solution))
+        if args.save_solution:
+            save_solution(args.save_solution, result)
+
+
+def read_plan(path):
+    """Reads a plan: a JSON object mapping vehicle -> node sequence."""
+    with open(path) as f:
+        return plan_routes(json.load(f))
+
+
+def plan_routes(plan, num_vehicles=0):
+    """Converts a vehicle -> node sequence mapping to a list of routes.
+
+    Every route stays on its vehicle: vehicles the mapping leaves out get an
+    empty route, and the list covers at least `num_vehicles` vehicles.
+    """
+    if isinstance(plan, dict):
+        routes = [[] for _ in range(max([num_vehicles] + [int(v) + 1 for v in plan]))]
+        for vehicle, route in plan.items():
+            routes[int(vehicle)] = route
+        return routes
+    return plan
+
+
+def write_plan(path, routes):
+    with open(path, 'w') as f:
+        json.dump({str(v): route for v, route in enumerate(routes)}, f)
+
+
+def cost_matrix(data):
+    """Returns the matrix the arc costs are taken from."""
+    if 'distance_matrix' in data:
+        return data['distance_matrix']
+    return data['time_matrix']
+
+
+def route_feasible(data, route, vehicle_id):
+    """Checks a depot-to-depot route against capacity and time windows."""
+    if 'demands' in data:
+        load = sum(data['demands'][node] for node in route)
+        if load > data['vehicle_capacities'][vehicle_id]:
+            return False
+    if 'time_windows' in data:
+        time_matrix = data['time_matrix']
+        previous = data['depot']
+        time = data['time_windows'][previous][0]
+        for node in route:
+            early, late = data['time_windows'][node]
+            time = max(time + int(time_matrix[previous][node]), early)
+            if time > late:
+                return False
+            previous = node
+    return True
+
+
+def repair_routes(data, plan):
+    """Adapts a previous plan to the current instance.
+
+    Plan entries are location IDs (`data['location_ids']` when present,
+    node indices otherwise). Unknown, duplicate and depot entries are
+    dropped, and nodes the plan does not visit are added at their cheapest
+    feasible position, or the cheapest position at all if none is feasible.
+    """
+    num_nodes = len(cost_matrix(data))
+    ids = data.get('location_ids', range(num_nodes))
+    node_of = {location_id: node for node, location_id in enumerate(ids)}
+    seen = {data['depot']}
+    routes = []
+    for vehicle_id in range(data['num_vehicles']):
+        route = []
+        for location_id in (plan[vehicle_id] if vehicle_id < len(plan) else []):
+            node = node_of.get(location_id)
+            if node is not None and node not in seen:
+                seen.add(node)
+                route.append(node)
+        routes.append(route)
+
+    costs = cost_matrix(data)
+    depot = data['depot']
+    for node in range(num_nodes):
+        if node in seen:
+            continue
+        best = None
+        for vehicle_id, route in enumerate(routes):
+            stops = [depot] + route + [depot]
+            for position in range(len(route) + 1):
+                before, after = stops[position], stops[position + 1]
+                delta = (int(costs[before][node]) + int(costs[node][after])
+                         - int(costs[before][after]))
+                candidate = route[:position] + [node] + route[position:]
+                key = (not route_feasible(data, candidate, vehicle_id), delta)
+                if best is None or key < best[0]:
+                    best = (key, vehicle_id, candidate)
+        routes[best[1]] = best[2]
+    return routes
+
+
+def solve_model(data, manager, routing, search_parameters, plan=None):
+    """Solves the model, warm-starting from a previous plan when given."""
+    if plan is None:
+        return routing.SolveWithParameters(search_parameters)
+    routing.CloseModelWithParameters(search_parameters)
+    initial_solution = routing.ReadAssignmentFromRoutes(
+        repair_routes(data, plan), True)
+    if initial_solution is None:
+        # The repaired plan still violates a constraint: search from scratch.
+        return routing.SolveWithParameters(search_parameters)
+    return routing.SolveFromAssignmentWithParameters(
+        initial_solution, search_parameters)
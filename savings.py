@@ -0,0 +1,256 @@
+#! /usr/bin/env python3
+"""Clarke-Wright savings construction.
+
+Builds a plan in well under a second for thousands of nodes: the savings
+s(i, j) = c(i, depot) + c(depot, j) - c(i, j) are computed in row blocks
+with NumPy, only the best `neighbours` per customer are kept, and routes
+are merged tail to head in order of decreasing saving while the routes
+can still be matched to the (heterogeneous) fleet by load and, with time
+windows, the merged route stays feasible. Feasibility of a merge is
+checked in O(1) from a summary per route: its travel time, its earliest
+end, and the range of arrival times at its head for which every stop is
+reached within its window and no wait exceeds the waiting limit. Merged
+routes are then assigned to vehicles best-fit by load.
+
+The plan can be used as it is, or as the initial solution of the search
+(`--savings` on every solver, routed through routing_model.solve_model, so
+nodes left out are repaired in):
+
+    ./savings.py cvrp
+    ./cvrp.py --savings
+"""
+import argparse
+import bisect
+import time
+
+import numpy as np
+
+from routing_model import VARIANTS, cost_matrix, load_variant
+
+NEIGHBOURS = 50
+CHUNK_CELLS = 1 << 22
+UNBOUNDED = np.iinfo(np.int64).max // 4
+
+
+def savings_candidates(costs, depot, neighbours=NEIGHBOURS):
+    """Returns (from_nodes, to_nodes) of the positive savings, best first.
+
+    Each customer keeps its `neighbours` best successors (all of them when
+    None).
+    """
+    n = len(costs)
+    customers = np.delete(np.arange(n), depot)
+    to_depot = np.asarray(costs[customers, depot], dtype=np.int64)
+    from_depot = np.asarray(costs[depot, customers], dtype=np.int64)
+    keep = len(customers) - 1
+    if neighbours is not None:
+        keep = min(neighbours, keep)
+    rows = max(1, CHUNK_CELLS // n)
+    sources, targets, values = [], [], []
+    for start in range(0, len(customers), rows):
+        block = np.arange(start, min(start + rows, len(customers)))
+        saving = (to_depot[block, None] + from_depot[None, :]
+                  - np.asarray(costs[np.ix_(customers[block], customers)], dtype=np.int64))
+        saving[np.arange(len(block)), block] = -1  # no saving from i to i
+        if keep < len(customers) - 1:
+            best = np.argpartition(-saving, keep - 1, axis=1)[:, :keep]
+        else:
+            best = np.broadcast_to(np.arange(len(customers)), saving.shape)
+        best_savings = np.take_along_axis(saving, best, axis=1)
+        positive = best_savings > 0
+        sources.append(customers[np.broadcast_to(block[:, None], best.shape)[positive]])
+        targets.append(customers[best[positive]])
+        values.append(best_savings[positive])
+    values = np.concatenate(values)
+    order = np.argsort(-values, kind='stable')
+    return np.concatenate(sources)[order], np.concatenate(targets)[order]
+
+
+class FleetLoads:
+    """Counts routes per capacity class to keep them assignable.
+
+    A route belongs to the class of the smallest capacity it fits. Routes
+    can be matched to vehicles when, for every class, no more routes need
+    at least that capacity than there are vehicles having it. The initial
+    single-customer routes may break this; merges are only refused when
+    they would take a class over its vehicle count.
+    """
+
+    def __init__(self, capacities):
+        self.levels = sorted(set(int(capacity) for capacity in capacities))
+        self.vehicles = [sum(1 for capacity in capacities if capacity >= level)
+                         for level in self.levels]
+        self.routes = [0] * len(self.levels)
+
+    def level(self, load):
+        return bisect.bisect_left(self.levels, load)
+
+    def add(self, load, count=1):
+        for k in range(self.level(load) + 1):
+            self.routes[k] += count
+
+    def can_merge(self, load_a, load_b):
+        level = self.level(load_a + load_b)
+        if level == len(self.levels):
+            return False
+        lowest = max(self.level(load_a), self.level(load_b)) + 1
+        return all(self.routes[k] < self.vehicles[k]
+                   for k in range(lowest, level + 1))
+
+
+def assign_vehicles(loads, capacities):
+    """Assigns routes to vehicles best-fit, heaviest route first.
+
+    Returns the vehicle of every route, or None for routes no free vehicle
+    can take.
+    """
+    free = sorted(range(len(capacities)), key=lambda v: capacities[v])
+    vehicles = [None] * len(loads)
+    for route in sorted(range(len(loads)), key=lambda r: -loads[r]):
+        for k, vehicle_id in enumerate(free):
+            if capacities[vehicle_id] >= loads[route]:
+                vehicles[route] = free.pop(k)
+                break
+    return vehicles
+
+
+def savings_routes(data, neighbours=NEIGHBOURS, horizon=None, max_waiting=None):
+    """Builds a plan with the savings algorithm.
+
+    Returns (routes, unassigned): one depot-less node sequence per vehicle,
+    and the nodes of merged routes no vehicle could take. The horizon bounds
+    the return to the depot and `max_waiting` every wait at a stop; both
+    default to the instance's and are unbounded when the instance has none.
+    """
+    costs = np.asarray(cost_matrix(data))
+    n = len(costs)
+    depot = data['depot']
+    demands = data.get('demands', [0] * n)
+    capacities = data.get('vehicle_capacities', [UNBOUNDED] * data['num_vehicles'])
+    windows = data.get('time_windows')
+    if windows is not None:
+        times = np.asarray(data['time_matrix'])
+        if horizon is None:
+            horizon = data.get('horizon', UNBOUNDED)
+        if max_waiting is None:
+            max_waiting = data.get('max_waiting', UNBOUNDED)
+        leave, leave_latest = windows[depot]
+        # Per route: travel time from head to tail, earliest arrival at the
+        # tail, and the earliest and latest arrival at the head that keep
+        # every stop in its window without waiting longer than allowed.
+        duration = [0] * n
+        earliest = [early for early, _ in windows]
+        first = [early - max_waiting for early, _ in windows]
+        latest = [late for _, late in windows]
+
+    # Every customer starts on its own route, identified by a member node.
+    route_of = list(range(n))
+    members = [[node] for node in range(n)]
+    head = list(range(n))
+    tail = list(range(n))
+    load = [int(demand) for demand in demands]
+    successor = [None] * n
+    fleet = FleetLoads(capacities)
+    for node in range(n):
+        if node != depot:
+            fleet.add(load[node])
+
+    sources, targets = savings_candidates(costs, depot, neighbours)
+    for i, j in zip(sources.tolist(), targets.tolist()):
+        a, b = route_of[i], route_of[j]
+        if a == b or tail[a] != i or head[b] != j:
+            continue
+        if not fleet.can_merge(load[a], load[b]):
+            continue
+        if windows is not None:
+            travel = int(times[i, j])
+            if earliest[a] + travel > latest[b]:
+                continue
+            merged_duration = duration[a] + travel + duration[b]
+            merged_earliest = max(earliest[a] + travel + duration[b], earliest[b])
+            merged_latest = min(latest[a], latest[b] - duration[a] - travel)
+            merged_first = first[a]
+            if earliest[a] + travel < first[b]:
+                # Arriving at b's head too early would wait too long there.
+                merged_first = max(first[a], first[b] - duration[a] - travel)
+            # The vehicle may leave the depot any time within its window.
+            to_head = int(times[depot, head[a]])
+            reach_head = max(leave + to_head, merged_first)
+            if reach_head > min(merged_latest, leave_latest + to_head):
+                continue
+            back = (max(reach_head + merged_duration, merged_earliest)
+                    + int(times[tail[b], depot]))
+            if back > horizon:
+                continue
+        # Relabel the smaller route into the larger one.
+        keep, gone = (a, b) if len(members[a]) >= len(members[b]) else (b, a)
+        for node in members[gone]:
+            route_of[node] = keep
+        members[keep].extend(members[gone])
+        members[gone] = []
+        head[keep], tail[keep] = head[a], tail[b]
+        fleet.add(load[a], -1)
+        fleet.add(load[b], -1)
+        load[keep] = load[a] + load[b]
+        fleet.add(load[keep])
+        if windows is not None:
+            duration[keep] = merged_duration
+            earliest[keep] = merged_earliest
+            first[keep] = merged_first
+            latest[keep] = merged_latest
+        successor[i] = j
+
+    merged = []
+    for route_id in range(n):
+        if route_id == depot or not members[route_id]:
+            continue
+        route = [head[route_id]]
+        while successor[route[-1]] is not None:
+            route.append(successor[route[-1]])
+        merged.append(route)
+
+    routes = [[] for _ in range(data['num_vehicles'])]
+    unassigned = []
+    vehicles = assign_vehicles([load[route_of[route[0]]] for route in merged],
+                               capacities)
+    for route, vehicle_id in zip(merged, vehicles):
+        if vehicle_id is None:
+            unassigned.extend(route)
+        else:
+            routes[vehicle_id] = route
+    return routes, unassigned
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('variant', choices=VARIANTS)
+    parser.add_argument('--neighbours', type=int, default=NEIGHBOURS,
+                        help='savings kept per customer (0 keeps all)')
+    args = parser.parse_args()
+
+    module = load_variant(args.variant)
+    data = module.create_data_model()
+    start = time.perf_counter()
+    routes, unassigned = savings_routes(
+        data, args.neighbours or None,
+        data.get('horizon', getattr(module, 'HORIZON', None)),
+        data.get('max_waiting', getattr(module, 'MAX_WAITING', None)))
+    print(f"Savings plan built in {1000 * (time.perf_counter() - start):.1f} ms")
+    if unassigned:
+        print(f"No vehicle left for nodes {unassigned}; "
+              f"./{module.__name__}.py --savings repairs them into the plan.")
+        return
+
+    manager, routing = module.build_model(data)
+    routing.CloseModelWithParameters(module.create_search_parameters())
+    solution = routing.ReadAssignmentFromRoutes(routes, True)
+    if solution is None:
+        print("The savings plan violates a constraint of the model; "
+              f"./{module.__name__}.py --savings repairs it.")
+        return
+    module.print_solution(data, manager, routing, solution)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+"""Reader for Solomon and Gehring-Homberger VRPTW instance files.
+
+Both collections share one plain-text format: a name line, a VEHICLE
+section with the fleet size and capacity, and a CUSTOMER table with
+coordinates, demand, ready time, due date and service time per node
+(node 0 is the depot).
+
+Euclidean distances are multiplied by SCALE and rounded so the solvers can
+work on integers; divide objectives by SCALE to compare with published
+results. Service time is folded into the time matrix as part of leaving
+the origin, i.e. time_matrix[i][j] = distance(i, j) + service(i).
+"""
+import numpy as np
+
+SCALE = 10
+
+
+def read_solomon(path, scale=SCALE):
+    """Reads an instance file into a data dict usable by every solver."""
+    with open(path) as f:
+        lines = [line.split() for line in f if line.strip()]
+    name = lines[0][0]
+    vehicle_row = next(i for i, line in enumerate(lines) if line[0] == 'VEHICLE')
+    num_vehicles, capacity = (int(v) for v in lines[vehicle_row + 2])
+    customer_row = next(i for i, line in enumerate(lines) if line[0] == 'CUSTOMER')
+    table = np.array([[float(v) for v in line]
+                      for line in lines[customer_row + 2:]])
+
+    coordinates = table[:, 1:3]
+    deltas = coordinates[:, None, :] - coordinates[None, :, :]
+    distance = np.rint(np.sqrt((deltas ** 2).sum(axis=2)) * scale).astype(np.int32)
+    service = np.rint(table[:, 6] * scale).astype(np.int32)
+    ready = np.rint(table[:, 4] * scale).astype(int)
+    due = np.rint(table[:, 5] * scale).astype(int)
+
+    time_matrix = distance + service[:, None]
+    np.fill_diagonal(time_matrix, 0)
+    horizon = int(due[0])
+    return {
+        'name': name,
+        'coordinates': coordinates,
+        'distance_matrix': distance,
+        'time_matrix': time_matrix,
+        'time_windows': list(zip(ready.tolist(), due.tolist())),
+        'demands': table[:, 3].astype(int).tolist(),
+        'vehicle_capacities': [capacity] * num_vehicles,
+        'num_vehicles': num_vehicles,
+        'depot': 0,
+        'horizon': horizon,
+        'max_waiting': horizon,
+        'scale': scale,
+    }
@@ -0,0 +1,132 @@
+"""Structured solution extraction.
+
+`extract_solution` reads a routing solution once and returns compact NumPy
+arrays per vehicle: the node sequence (start and end depot included), the
+arrival window at every stop when the model has a "Time" dimension, the
+cumulative load when the instance has demands, and the cost of every arc.
+The console printers and the JSON / npz writers are formatters on top.
+
+Every variable is read in one pass over all routing indices; routes, loads
+and arc costs are then assembled with array operations instead of walking
+each route through the solver.
+"""
+import json
+
+import numpy as np
+
+from profiler import stage
+from routing_model import cost_matrix
+
+ROUTE_ARRAYS = ('nodes', 'arrival_min', 'arrival_max', 'load', 'arc_cost')
+
+
+def extract_solution(data, manager, routing, solution, dimension='Time'):
+    """Returns {'objective': int, 'routes': [route dict per vehicle]}.
+
+    A route dict holds 'vehicle' and int64 arrays 'nodes', 'arc_cost' (one
+    entry per arc, so one shorter than 'nodes'), and when available
+    'arrival_min' / 'arrival_max' (the dimension's cumul range) and 'load'
+    (demand picked up so far, the current stop included).
+    """
+    with stage('extract'):
+        size = routing.Size()
+        num_indices = size + routing.vehicles()
+        successors = [solution.Value(routing.NextVar(index))
+                      for index in range(size)]
+        nodes_of = np.array([manager.IndexToNode(index)
+                             for index in range(num_indices)])
+        arrivals = None
+        if dimension in routing.GetAllDimensionNames():
+            time_dimension = routing.GetDimensionOrDie(dimension)
+            cumuls = [time_dimension.CumulVar(index)
+                      for index in range(num_indices)]
+            arrivals = (np.array([solution.Min(var) for var in cumuls]),
+                        np.array([solution.Max(var) for var in cumuls]))
+        costs = np.asarray(cost_matrix(data))
+        demands = np.asarray(data['demands']) if 'demands' in data else None
+
+        routes = []
+        for vehicle_id in range(routing.vehicles()):
+            index = routing.Start(vehicle_id)
+            indices = [index]
+            while index < size:
+                index = successors[index]
+                indices.append(index)
+            indices = np.array(indices)
+            nodes = nodes_of[indices]
+            route = {'vehicle': vehicle_id, 'nodes': nodes,
+                     'arc_cost': costs[nodes[:-1], nodes[1:]].astype(np.int64)}
+            if arrivals is not None:
+                route['arrival_min'] = arrivals[0][indices]
+                route['arrival_max'] = arrivals[1][indices]
+            if demands is not None:
+                route['load'] = np.cumsum(demands[nodes])
+            routes.append(route)
+        return {'objective': solution.ObjectiveValue(), 'routes': routes}
+
+
+def result_to_dict(result):
+    """Converts an extracted solution to plain JSON-serializable types."""
+    return {'objective': int(result['objective']),
+            'routes': [{key: (value.tolist() if isinstance(value, np.ndarray)
+                              else value)
+                        for key, value in route.items()}
+                       for route in result['routes']]}
+
+
+def write_json(path, result):
+    with open(path, 'w') as f:
+        json.dump(result_to_dict(result), f)
+
+
+def read_json(path):
+    with open(path) as f:
+        result = json.load(f)
+    for route in result['routes']:
+        for key in ROUTE_ARRAYS:
+            if key in route:
+                route[key] = np.array(route[key], dtype=np.int64)
+    return result
+
+
+def save_solution(path, result):
+    """Writes an extracted solution as npz or JSON, by file extension."""
+    if path.endswith('.npz'):
+        save_npz(path, result)
+    else:
+        write_json(path, result)
+
+
+def save_npz(path, result):
+    """Writes an extracted solution as concatenated arrays plus offsets.
+
+    Route v occupies [offsets[v], offsets[v + 1]) of every array; arc costs
+    are padded with a trailing 0 per route to share the offsets.
+    """
+    routes = result['routes']
+    offsets = np.cumsum([0] + [len(route['nodes']) for route in routes])
+    arrays = {'objective': np.int64(result['objective']),
+              'vehicles': np.array([route['vehicle'] for route in routes]),
+              'offsets': offsets}
+    for key in ROUTE_ARRAYS:
+        if routes and key in routes[0]:
+            parts = [route[key] for route in routes]
+            if key == 'arc_cost':
+                parts = [np.append(part, 0) for part in parts]
+            arrays[key] = np.concatenate(parts)
+    np.savez_compressed(path, **arrays)
+
+
+def load_npz(path):
+    """Reads a solution written by save_npz back into route dicts."""
+    with np.load(path) as arrays:
+        offsets = arrays['offsets']
+        routes = []
+        for v, vehicle_id in enumerate(arrays['vehicles']):
+            route = {'vehicle': int(vehicle_id)}
+            for key in ROUTE_ARRAYS:
+                if key in arrays:
+                    route[key] = arrays[key][offsets[v]:offsets[v + 1]]
+            route['arc_cost'] = route['arc_cost'][:-1]
+            routes.append(route)
+        return {'objective': int(arrays['objective']), 'routes': routes}
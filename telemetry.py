@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+"""Search convergence telemetry.
+
+`record_telemetry` hooks an at-solution callback into a routing model and
+writes one JSON line per improving solution: seconds since the search
+started, objective, vehicles used and dropped nodes. Every solver takes
+`--telemetry FILE` to turn it on. Run as a script to summarize or plot
+recorded runs (plotting needs matplotlib):
+
+    ./cvrp.py --telemetry cvrp.jsonl
+    ./telemetry.py cvrp.jsonl vrp_tw.jsonl --plot curves.png
+
+The summary lists when each run came within 5%, 1% and 0.1% of its final
+objective, which is the evidence for choosing a time limit.
+"""
+import argparse
+import json
+import time
+
+THRESHOLDS = (0.05, 0.01, 0.001)
+
+
+class Telemetry:
+    """Records the improving solutions of one search."""
+
+    def __init__(self, routing, path=None):
+        self.routing = routing
+        self.records = []
+        self.file = open(path, 'w') if path else None
+        self.has_disjunctions = routing.GetNumberOfDisjunctions() > 0
+        self.start = time.perf_counter()
+        routing.AddAtSolutionCallback(self.at_solution)
+
+    def at_solution(self):
+        objective = self.routing.CostVar().Max()
+        if self.records and objective >= self.records[-1]['objective']:
+            return
+        elapsed = time.perf_counter() - self.start
+        routing = self.routing
+        vehicles = sum(
+            1 for vehicle_id in range(routing.vehicles())
+            if not routing.IsEnd(routing.NextVar(routing.Start(vehicle_id)).Value()))
+        dropped = 0
+        if self.has_disjunctions:
+            dropped = sum(1 for index in range(routing.Size())
+                          if not routing.IsStart(index)
+                          and routing.NextVar(index).Value() == index)
+        record = {'elapsed': round(elapsed, 4), 'objective': objective,
+                  'vehicles': vehicles, 'dropped': dropped}
+        self.records.append(record)
+        if self.file:
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def record_telemetry(routing, path=None):
+    """Attaches a Telemetry recorder to a routing model before it is solved."""
+    return Telemetry(routing, path)
+
+
+def read_telemetry(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def time_to_quality(records, thresholds=THRESHOLDS):
+    """Returns {threshold: seconds until within threshold of the final
+    objective}."""
+    final = records[-1]['objective']
+    reached = {}
+    for threshold in thresholds:
+        for record in records:
+            if record['objective'] <= final * (1 + threshold):
+                reached[threshold] = record['elapsed']
+                break
+    return reached
+
+
+def plot_curves(runs, path):
+    """Plots objective against time for {label: records} to an image file."""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        raise SystemExit("Plotting needs matplotlib: pip install matplotlib")
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for label, records in runs.items():
+        ax.step([r['elapsed'] for r in records],
+                [r['objective'] for r in records], where='post', label=label)
+    ax.set_xlabel('seconds')
+    ax.set_ylabel('objective')
+    ax.set_xscale('symlog', linthresh=1)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('runs', nargs='+', help='telemetry JSONL files')
+    parser.add_argument('--plot', metavar='IMAGE',
+                        help='write time-to-quality curves')
+    args = parser.parse_args()
+
+    runs = {path: read_telemetry(path) for path in args.runs}
+    for path, records in runs.items():
+        if not records:
+            print(f"{path}: no solution")
+            continue
+        last = records[-1]
+        reached = time_to_quality(records)
+        print(f"{path}: {len(records)} improvements, final {last['objective']} "
+              f"at {last['elapsed']}s; " + ', '.join(
+                  f"within {100 * t:g}% at {s}s" for t, s in reached.items()))
+    if args.plot:
+        plot_curves({path: records for path, records in runs.items() if records},
+                    args.plot)
+
+
+if __name__ == '__main__':
+    main()
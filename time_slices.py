@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+"""Time-dependent travel times.
+
+Time slices are a T x N x N int32 stack in the binary matrix store
+(`time_matrix_slices.bin`): slice k holds the travel times of trips
+departing in [k * slice_length, (k + 1) * slice_length) on the time
+windows' clock, and departures past the last slice use the last one.
+`./route_matrices.py --slices 96 --slice-minutes 15` fetches them.
+
+Routing transits cannot depend on the cumul they start from, so the model
+sees a departure-anchored matrix instead: row i is the row of node i in the
+slice of i's anchor departure. `anchored_time_matrix` gathers those N rows
+out of the memmap and registers natively like any static matrix;
+`register_time_dependent_transit` looks every cell up in the memmap from a
+Python callback instead, without building anything. `solve_time_dependent`
+re-anchors each node at its departure in the previous solution and
+re-solves, warm-started, until no node changes slice.
+
+Run as a script to summarize a slice file:
+
+    ./time_slices.py time_matrix_slices.bin
+"""
+import os
+import sys
+
+import numpy as np
+
+from matrix_store import open_matrix, read_header
+from routing_model import get_routes, register_transit_callback, solve_model
+from solution_extract import extract_solution
+
+
+def load_time_slices(name='time_matrix', directory='.'):
+    """Memory-maps `<name>_slices.bin`.
+
+    Returns (slices, slice_length), or None when there is no slice file.
+    """
+    path = os.path.join(directory, name + '_slices.bin')
+    if not os.path.exists(path):
+        return None
+    header, _ = read_header(path)
+    return open_matrix(path), header['slice_length']
+
+
+def departure_slots(slices, slice_length, departures):
+    """Slice index of every departure time, clipped to the last slice."""
+    slots = np.asarray(departures, dtype=np.int64) // slice_length
+    return np.clip(slots, 0, len(slices) - 1)
+
+
+def anchored_time_matrix(slices, slice_length, departures):
+    """N x N travel times with row i taken from the slice of departures[i].
+
+    Only the N anchored rows of the stack are read.
+    """
+    slots = departure_slots(slices, slice_length, departures)
+    return np.asarray(slices[slots, np.arange(len(slots))])
+
+
+def register_time_dependent_transit(routing, manager, slices, slice_length,
+                                    departures):
+    """Registers the anchored travel times as a Python transit callback.
+
+    Each evaluation is a single cell lookup in the memmap, so nothing is
+    copied up front, at the price of a Python call per evaluation.
+    """
+    slots = departure_slots(slices, slice_length, departures).tolist()
+
+    def time_dependent(from_node, to_node):
+        return int(slices[slots[from_node], from_node, to_node])
+
+    return register_transit_callback(routing, manager, time_dependent)
+
+
+def route_arrivals(data, slices, slice_length, route):
+    """Arrival times along a route under the time-dependent travel times.
+
+    The route is a node sequence without depots; the vehicle leaves the
+    depot when it opens and waits at every early arrival. Returns the
+    arrivals at each stop and back at the depot.
+    """
+    windows = data['time_windows']
+    depot = data['depot']
+    previous = depot
+    time = windows[depot][0]
+    arrivals = []
+    for node in list(route) + [depot]:
+        slot = min(time // slice_length, len(slices) - 1)
+        time = max(time + int(slices[slot, previous, node]), windows[node][0])
+        arrivals.append(time)
+        previous = node
+    return arrivals
+
+
+def late_stops(data, slices, slice_length, routes):
+    """Counts the stops reached after their window closes when the routes
+    are driven with time-dependent travel times."""
+    windows = data['time_windows']
+    late = 0
+    for route in routes:
+        arrivals = route_arrivals(data, slices, slice_length, route)
+        late += sum(1 for node, time in zip(route, arrivals)
+                    if time > windows[node][1])
+    return late
+
+
+def solve_time_dependent(module, data, search_parameters, slices,
+                         slice_length, rounds=3):
+    """Solves with departure-anchored travel times, re-anchoring each round.
+
+    The first round anchors every node at its window opening. Returns
+    (round_data, manager, routing, solution) of the last round, whose
+    'time_matrix' is the anchored matrix the solution was found with.
+    """
+    departures = [early for early, _ in data['time_windows']]
+    plan = None
+    for _ in range(rounds):
+        slots = departure_slots(slices, slice_length, departures)
+        round_data = dict(data, time_matrix=anchored_time_matrix(
+            slices, slice_length, departures))
+        manager, routing = module.build_model(round_data)
+        solution = solve_model(round_data, manager, routing,
+                               search_parameters, plan)
+        if not solution:
+            break
+        plan = get_routes(manager, routing, solution)
+        for route in extract_solution(round_data, manager, routing,
+                                      solution)['routes']:
+            for node, arrival in zip(route['nodes'][1:-1],
+                                     route['arrival_min'][1:-1]):
+                departures[node] = int(arrival)
+        if np.array_equal(
+                slots, departure_slots(slices, slice_length, departures)):
+            break
+    return round_data, manager, routing, solution
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'time_matrix_slices.bin'
+    header, _ = read_header(path)
+    slices = open_matrix(path)
+    length = header['slice_length']
+    off_diagonal = ~np.eye(slices.shape[1], dtype=bool)
+    base = slices[0][off_diagonal].mean()
+    print(f"{len(slices)} slices of {length} {header['units']} "
+          f"for {slices.shape[1]} locations")
+    for k, cells in enumerate(slices):
+        mean = cells[off_diagonal].mean()
+        print(f"{k * length:>8}  mean {mean:10.1f}  x{mean / base:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+"""Persistent per-pair travel cache backed by SQLite.
+
+Every cell is keyed by (origin, destination, metric, mode) and carries its
+own expiry time, so the matrices can be rebuilt from disk and only missing
+or stale pairs go to the network. Geocoded coordinates per address and
+encoded leg polylines per (origin, destination, mode) are cached the same
+way for the map exporter. Pairs that are about to be fetched are
+written to a journal first and removed in the same transaction that stores
+their values (or, when the provider fails them, once the failure is
+known), so a fetch killed halfway resumes with only the pairs that never
+landed.
+"""
+import sqlite3
+import time
+
+CACHE_FILE = "travel_cache.sqlite"
+DEFAULT_TTL = 30 * 24 * 3600  # seconds
+METRICS = ('distance', 'duration')
+
+
+class TravelCache:
+    """Caches distance and duration between addresses."""
+
+    def __init__(self, path=CACHE_FILE, ttl=DEFAULT_TTL, mode='driving'):
+        self.ttl = ttl
+        self.mode = mode
+        self.db = sqlite3.connect(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS travel (
+                origin TEXT, destination TEXT, metric TEXT, mode TEXT,
+                value INTEGER, expires REAL,
+                PRIMARY KEY (origin, destination, metric, mode));
+            CREATE TABLE IF NOT EXISTS journal (
+                origin TEXT, destination TEXT, mode TEXT,
+                PRIMARY KEY (origin, destination, mode));
+            CREATE TABLE IF NOT EXISTS geocode (
+                name TEXT PRIMARY KEY, lat REAL, lng REAL, expires REAL);
+            CREATE TABLE IF NOT EXISTS geometry (
+                origin TEXT, destination TEXT, mode TEXT,
+                polyline TEXT, expires REAL,
+                PRIMARY KEY (origin, destination, mode));
+            CREATE TEMP TABLE wanted (name TEXT PRIMARY KEY, idx INTEGER);
+        """)
+
+    def lookup(self, locations):
+        """Returns {(origin_idx, destination_idx): (distance, duration)} for
+        every pair of `locations` with both metrics cached and fresh."""
+        with self.db:
+            self.db.execute("DELETE FROM wanted")
+            self.db.executemany("INSERT OR IGNORE INTO wanted VALUES (?, ?)",
+                                ((name, i) for i, name in enumerate(locations)))
+        rows = self.db.execute("""
+            SELECT o.idx, d.idx, t.metric, t.value FROM travel t
+            JOIN wanted o ON t.origin = o.name
+            JOIN wanted d ON t.destination = d.name
+            WHERE t.mode = ? AND t.expires > ?""", (self.mode, time.time()))
+        found = {}
+        for origin, destination, metric, value in rows:
+            found.setdefault((origin, destination), {})[metric] = value
+        return {pair: (values['distance'], values['duration'])
+                for pair, values in found.items() if len(values) == len(METRICS)}
+
+    def begin(self, locations, pairs):
+        """Journals the pairs a fetch is about to request."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO journal VALUES (?, ?, ?)",
+                ((locations[o], locations[d], self.mode) for o, d in pairs))
+
+    def pending(self, locations):
+        """Returns the (origin_idx, destination_idx) pairs of `locations` that
+        an interrupted fetch journaled but never stored or failed."""
+        with self.db:
+            self.db.execute("DELETE FROM wanted")
+            self.db.executemany("INSERT OR IGNORE INTO wanted VALUES (?, ?)",
+                                ((name, i) for i, name in enumerate(locations)))
+        return self.db.execute("""
+            SELECT o.idx, d.idx FROM journal j
+            JOIN wanted o ON j.origin = o.name
+            JOIN wanted d ON j.destination = d.name
+            WHERE j.mode = ?""", (self.mode,)).fetchall()
+
+    def abandon(self, locations, pairs):
+        """Clears (origin_idx, destination_idx) pairs whose fetch failed from
+        the journal; they are simply missing on the next run."""
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM journal WHERE origin = ? AND destination = ?"
+                " AND mode = ?",
+                ((locations[o], locations[d], self.mode) for o, d in pairs))
+
+    def store(self, locations, cells):
+        """Stores (origin_idx, destination_idx, distance, duration) cells and
+        clears them from the journal in a single transaction."""
+        expires = time.time() + self.ttl
+        with self.db:
+            for origin, destination, distance, duration in cells:
+                names = (locations[origin], locations[destination])
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO travel VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*names, 'distance', self.mode, distance, expires),
+                     (*names, 'duration', self.mode, duration, expires)])
+                self.db.execute(
+                    "DELETE FROM journal WHERE origin = ? AND destination = ?"
+                    " AND mode = ?", (*names, self.mode))
+
+    def coordinates(self, names):
+        """Returns {name: (lat, lng)} for the names geocoded and fresh."""
+        now = time.time()
+        found = {}
+        for name in set(names):
+            row = self.db.execute(
+                "SELECT lat, lng FROM geocode WHERE name = ? AND expires > ?",
+                (name, now)).fetchone()
+            if row:
+                found[name] = row
+        return found
+
+    def store_coordinates(self, coordinates):
+        """Stores a {name: (lat, lng)} mapping."""
+        expires = time.time() + self.ttl
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+                ((name, lat, lng, expires)
+                 for name, (lat, lng) in coordinates.items()))
+
+    def polylines(self, legs):
+        """Returns {(origin, destination): encoded polyline} for the
+        (origin name, destination name) legs cached and fresh."""
+        now = time.time()
+        found = {}
+        for origin, destination in set(legs):
+            row = self.db.execute(
+                "SELECT polyline FROM geometry WHERE origin = ? AND"
+                " destination = ? AND mode = ? AND expires > ?",
+                (origin, destination, self.mode, now)).fetchone()
+            if row:
+                found[origin, destination] = row[0]
+        return found
+
+    def store_polylines(self, polylines):
+        """Stores a {(origin, destination): encoded polyline} mapping."""
+        expires = time.time() + self.ttl
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO geometry VALUES (?, ?, ?, ?, ?)",
+                ((origin, destination, self.mode, polyline, expires)
+                 for (origin, destination), polyline in polylines.items()))
+
+    def close(self):
+        self.db.close()
@@ -1,46 +1,45 @@
 #! /usr/bin/env python3
+import sys
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 from route_matrices import LOCATION
+from matrix_store import load_matrix
+from profiler import enable_profiling, stage
+from routing_model import (objective_line, register_transit_matrix,
+                           solve_and_report, solver_arg_parser)
+from solution_extract import extract_solution
+
+# Cost per meter of the longest route, added to the total distance.
+SPAN_COST = 100
+
 
 def create_data_model():
     """Stores the data for the problem."""
     data = {}
-    with open("distance_matrix.txt", "r") as f:
-        data["distance_matrix"] = [[int(num) for num in line.split("\t")] for line in f.readlines()]
+    data["distance_matrix"] = load_matrix("distance_matrix")
     data["num_vehicles"] = 8
     data["depot"] = 0
     return data
 
 
-def print_solution(data, manager, routing, solution):
+def print_solution(data, manager, routing, solution, result=None, bound=None):
     """Prints solution on console."""
-    print(f"Objective: {solution.ObjectiveValue()}")
+    if result is None:
+        result = extract_solution(data, manager, routing, solution)
+    print(objective_line(result["objective"], bound))
     max_route_distance = 0
-    for vehicle_id in range(data["num_vehicles"]):
-        index = routing.Start(vehicle_id)
-        plan_output = f"Route for vehicle {vehicle_id}:\n"
-        route_distance = 0
-        while not routing.IsEnd(index):
-            plan_output += f"{LOCATION[manager.IndexToNode(index)]} -> "
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
-            route_distance += routing.GetArcCostForVehicle(
-                previous_index, index, vehicle_id
-            )
-        plan_output += f"{LOCATION[manager.IndexToNode(index)]}\n"
-        plan_output += f"Distance of the route: {route_distance}m\n"
-        print(plan_output)
+    for route in result["routes"]:
+        stops = " -> ".join(LOCATION[node] for node in route["nodes"])
+        route_distance = int(route["arc_cost"].sum())
+        print(f"Route for vehicle {route['vehicle']}:\n{stops}\n"
+              f"Distance of the route: {route_distance}m\n")
         max_route_distance = max(route_distance, max_route_distance)
     print(f"Maximum of the route distances: {max_route_distance}m")
 
 
-
-def main():
-    """Entry point of the program."""
-    # Instantiate the data problem.
-    data = create_data_model()
-
+def build_model(data):
+    """Builds the routing index manager and routing model."""
     # Create the routing index manager.
     manager = pywrapcp.RoutingIndexManager(
         len(data["distance_matrix"]), data["num_vehicles"], data["depot"]
@@ -49,45 +48,55 @@ def main():
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    # Create and register a transit callback.
-    def distance_callback(from_index, to_index):
-        """Returns the distance between the two nodes."""
-        # Convert from routing variable Index to distance matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["distance_matrix"][from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
-
-    # Define cost of each arc.
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-
-    # Add Distance constraint.
-    dimension_name = "Distance"
-    routing.AddDimension(
-        transit_callback_index,
-        0,  # no slack
-        25000,  # vehicle maximum travel distance
-        True,  # start cumul to zero
-        dimension_name,
-    )
-    distance_dimension = routing.GetDimensionOrDie(dimension_name)
-    distance_dimension.SetGlobalSpanCostCoefficient(100)
+    with stage("distance transit"):
+        # Register the distance matrix as a transit evaluated natively.
+        transit_callback_index = register_transit_matrix(
+            routing, data["distance_matrix"])
+
+        # Define cost of each arc.
+        routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    with stage("distance dimension"):
+        # Add Distance constraint.
+        dimension_name = "Distance"
+        routing.AddDimension(
+            transit_callback_index,
+            0,  # no slack
+            25000,  # vehicle maximum travel distance
+            True,  # start cumul to zero
+            dimension_name,
+        )
+        distance_dimension = routing.GetDimensionOrDie(dimension_name)
+        distance_dimension.SetGlobalSpanCostCoefficient(SPAN_COST)
+
+    return manager, routing
 
+
+def create_search_parameters():
+    """Returns the search parameters used to solve the problem."""
     # Setting first solution heuristic.
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
     search_parameters.first_solution_strategy = (
         routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
     )
+    return search_parameters
 
-    # Solve the problem.
-    solution = routing.SolveWithParameters(search_parameters)
 
-    # Print solution on console.
-    if solution:
-        print_solution(data, manager, routing, solution)
-    else:
-        print("No solution found !")
+def main(argv=None):
+    """Entry point of the program."""
+    args = solver_arg_parser('Vehicles Routing Problem (VRP).').parse_args(argv)
+    profiler = enable_profiling() if args.profile else None
+    # Instantiate the data problem.
+    with stage("matrix load"):
+        data = create_data_model()
+
+    with stage("model build"):
+        manager, routing = build_model(data)
+    # Solve the problem, then print and save the solution as asked.
+    solve_and_report(sys.modules[__name__], args, data, manager, routing,
+                     create_search_parameters())
+    if profiler:
+        profiler.write(args.profile)
 
 
 if __name__ == "__main__":
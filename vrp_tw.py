@@ -1,17 +1,27 @@
 #! /usr/bin/env python3
 """Vehicles Routing Problem (VRP) with Time Windows."""
 
+import sys
+
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 from route_matrices import max_val,LOCATION
+from matrix_store import load_matrix
+from profiler import enable_profiling, stage
+from presolve import InfeasibleInstance, presolve, remove_arcs
+from routing_model import (objective_line, register_transit_matrix,
+                           solve_and_report, solver_arg_parser)
+from solution_extract import extract_solution
+
+# Default time dimension limits, unless the instance sets its own.
+MAX_WAITING = 400  # longest wait at a location
+HORIZON = 2500  # latest return to the depot
 
 
 def create_data_model():
     """Stores the data for the problem."""
     data = {}
-    with open("time_matrix.txt", "r") as f:
-        data["time_matrix"] = [[int(num)
-                                for num in line.split("\t")] for line in f]
+    data["time_matrix"] = load_matrix("time_matrix")
     data["time_windows"] = [
         (0, 600),   # depot
         (800, 1100),  # 1
@@ -37,38 +47,26 @@ def create_data_model():
     return data
 
 
-def print_solution(data, manager, routing, solution):
+def print_solution(data, manager, routing, solution, result=None, bound=None):
     """Prints solution on console."""
-    print(f"Objective: {solution.ObjectiveValue()}")
-    time_dimension = routing.GetDimensionOrDie("Time")
+    if result is None:
+        result = extract_solution(data, manager, routing, solution)
+    print(objective_line(result["objective"], bound))
     total_time = 0
-    for vehicle_id in range(data["num_vehicles"]):
-        index = routing.Start(vehicle_id)
-        plan_output = f"Route for vehicle {vehicle_id}:\n"
-        while not routing.IsEnd(index):
-            time_var = time_dimension.CumulVar(index)
-            plan_output += (
-                f"{LOCATION[manager.IndexToNode(index)]}"
-                f" Time({solution.Min(time_var)},{solution.Max(time_var)})"
-                " -> "
-            )
-            index = solution.Value(routing.NextVar(index))
-        time_var = time_dimension.CumulVar(index)
-        plan_output += (
-            f"{LOCATION[manager.IndexToNode(index)]}"
-            f" Time({solution.Min(time_var)},{solution.Max(time_var)})\n"
-        )
-        plan_output += f"Time of the route: {solution.Min(time_var)}min\n"
-        print(plan_output)
-        total_time += solution.Min(time_var)
+    for route in result["routes"]:
+        stops = " -> ".join(
+            f"{LOCATION[node]} Time({early},{late})"
+            for node, early, late in zip(
+                route["nodes"], route["arrival_min"], route["arrival_max"]))
+        route_time = int(route["arrival_min"][-1])
+        print(f"Route for vehicle {route['vehicle']}:\n{stops}\n"
+              f"Time of the route: {route_time}min\n")
+        total_time += route_time
     print(f"Total time of all routes: {total_time}min")
 
 
-def main():
-    """Solve the VRP with time windows."""
-    # Instantiate the data problem.
-    data = create_data_model()
-
+def build_model(data):
+    """Builds the routing index manager and routing model."""
     # Create the routing index manager.
     manager = pywrapcp.RoutingIndexManager(
         len(data["time_matrix"]), data["num_vehicles"], data["depot"]
@@ -77,51 +75,65 @@ def main():
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    # Create and register a transit callback.
-    def time_callback(from_index, to_index):
-        """Returns the travel time between the two nodes."""
-        # Convert from routing variable Index to time matrix NodeIndex.
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["time_matrix"][from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(time_callback)
-
-    # Define cost of each arc.
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-
-    # Add Time Windows constraint.
-    time = "Time"
-    routing.AddDimension(
-        transit_callback_index,
-        400,  # allow waiting time
-        2500,  # maximum time per vehicle
-        False,  # Don't force start cumul to zero.
-        time,
-    )
-    time_dimension = routing.GetDimensionOrDie(time)
-    # Add time window constraints for each location except depot.
-    for location_idx, time_window in enumerate(data["time_windows"]):
-        if location_idx == data["depot"]:
-            continue
-        index = manager.NodeToIndex(location_idx)
-        time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
-    # Add time window constraints for each vehicle start node.
-    depot_idx = data["depot"]
-    for vehicle_id in range(data["num_vehicles"]):
-        index = routing.Start(vehicle_id)
-        time_dimension.CumulVar(index).SetRange(
-            data["time_windows"][depot_idx][0], data["time_windows"][depot_idx][1]
+    with stage("presolve"):
+        # Presolve: tighten the time windows and drop the arcs no feasible
+        # route can use. Raises InfeasibleInstance when the instance has no
+        # solution.
+        max_waiting = data.get("max_waiting", MAX_WAITING)
+        horizon = data.get("horizon", HORIZON)
+        windows, arcs = presolve(data, max_waiting, horizon)
+        remove_arcs(manager, routing, arcs)
+
+    with stage("time dimension"):
+        # Register the time matrix as a transit evaluated natively.
+        transit_callback_index = register_transit_matrix(routing, data["time_matrix"])
+
+        # Define cost of each arc: travel time, or distance when the instance
+        # provides a separate distance matrix.
+        if "distance_matrix" in data:
+            routing.SetArcCostEvaluatorOfAllVehicles(
+                register_transit_matrix(routing, data["distance_matrix"]))
+        else:
+            routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+        # Add Time Windows constraint.
+        time = "Time"
+        routing.AddDimension(
+            transit_callback_index,
+            max_waiting,  # allow waiting time
+            horizon,  # maximum time per vehicle
+            False,  # Don't force start cumul to zero.
+            time,
         )
+    with stage("time windows"):
+        time_dimension = routing.GetDimensionOrDie(time)
+        # Add the presolved time window constraints for each location except depot.
+        for location_idx, time_window in enumerate(windows):
+            if location_idx == data["depot"]:
+                continue
+            index = manager.NodeToIndex(location_idx)
+            time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
+        # Add time window constraints for each vehicle start node.
+        depot_idx = data["depot"]
+        for vehicle_id in range(data["num_vehicles"]):
+            index = routing.Start(vehicle_id)
+            time_dimension.CumulVar(index).SetRange(
+                data["time_windows"][depot_idx][0], data["time_windows"][depot_idx][1]
+            )
 
-    # Instantiate route start and end times to produce feasible times.
-    for i in range(data["num_vehicles"]):
-        routing.AddVariableMinimizedByFinalizer(
-            time_dimension.CumulVar(routing.Start(i))
-        )
-        routing.AddVariableMinimizedByFinalizer(
-            time_dimension.CumulVar(routing.End(i)))
+        # Instantiate route start and end times to produce feasible times.
+        for i in range(data["num_vehicles"]):
+            routing.AddVariableMinimizedByFinalizer(
+                time_dimension.CumulVar(routing.Start(i))
+            )
+            routing.AddVariableMinimizedByFinalizer(
+                time_dimension.CumulVar(routing.End(i)))
+
+    return manager, routing
 
+
+def create_search_parameters():
+    """Returns the search parameters used to solve the problem."""
     # Setting first solution heuristic.
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
     search_parameters.time_limit.seconds = 120
@@ -129,15 +141,28 @@ def main():
     search_parameters.first_solution_strategy = (
         routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
     )
+    return search_parameters
 
-    # Solve the problem.
-    solution = routing.SolveWithParameters(search_parameters)
 
-    # Print solution on console.
-    if solution:
-        print_solution(data, manager, routing, solution)
-    else:
-        print("No solution found !")
+def main(argv=None):
+    """Solve the VRP with time windows."""
+    args = solver_arg_parser(__doc__).parse_args(argv)
+    profiler = enable_profiling() if args.profile else None
+    # Instantiate the data problem.
+    with stage("matrix load"):
+        data = create_data_model()
+
+    try:
+        with stage("model build"):
+            manager, routing = build_model(data)
+    except InfeasibleInstance as e:
+        print(f"No solution found ! The instance is infeasible:\n{e}")
+        return
+    # Solve the problem, then print and save the solution as asked.
+    solve_and_report(sys.modules[__name__], args, data, manager, routing,
+                     create_search_parameters())
+    if profiler:
+        profiler.write(args.profile)
 
 
 if __name__ == "__main__":